@@ -0,0 +1,94 @@
+'''
+Compares HTTP/1.1 and HTTP/2 for many concurrent calls of AsyncRestClient: the number of sockets
+opened and the latency percentiles.
+
+    python benchmarks/http2.py [--url URL] [--calls N] [--concurrency N]
+
+By default the HTTP/1.1 calls go to a local stub server and the HTTP/2 ones to a local HTTP/2
+stub server over TLS, both answering after the same latency. With --url both runs call that server,
+and the HTTP/2 run shows the fallback unless it supports HTTP/2. The h2 package must be installed
+(`pip install eway-rapid-python[http2]`), and trustme too for the local HTTP/2 server, whose certificate
+is issued on the fly.
+'''
+
+import asyncio
+import ssl
+import sys
+import time
+
+from argparse import ArgumentParser
+from os.path import dirname, join
+
+sys.path.insert(0, join(dirname(__file__), '..'))
+
+from eway.rapid.client import AsyncRestClient
+from eway.rapid.endpoint import GenericEndpoint
+from eway.rapid.testing import Http2StubServer, RapidStub, StubServer, constant_latency
+
+
+def percentile(latencies, ratio):
+    return latencies[min(len(latencies) - 1, int(len(latencies) * ratio))]
+
+
+async def run(url, http2, calls, concurrency, verify=True):
+    endpoint = GenericEndpoint().set_url(url)
+    latencies = []
+    sockets = 0
+
+    async with AsyncRestClient('api-key', 'api-password', endpoint, max_connections=concurrency, http2=http2, verify=verify) as client:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def call():
+            async with semaphore:
+                started = time.time()
+                await client.transparent_redirect_get_transaction_info('A1001')
+                latencies.append(time.time() - started)
+
+        tasks = [asyncio.ensure_future(call()) for _ in range(calls)]
+
+        while not all(task.done() for task in tasks):
+            pool = client._get_http()._transport._pool  # connections open at the moment
+            sockets = max(sockets, len(pool.connections))
+            await asyncio.sleep(0.001)
+
+        await asyncio.gather(*tasks)
+
+    latencies.sort()
+
+    return sockets, percentile(latencies, 0.5), percentile(latencies, 0.99)
+
+
+def main(argv=None):
+    parser = ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--url', help='endpoint URL, a local stub server by default')
+    parser.add_argument('--calls', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=200)
+    args = parser.parse_args(argv)
+
+    print('{:<10} {:>8} {:>10} {:>10}'.format('protocol', 'sockets', 'p50, ms', 'p99, ms'))
+
+    def report(name, url, verify=True):
+        sockets, p50, p99 = asyncio.run(run(url, name == 'HTTP/2', args.calls, args.concurrency, verify))
+        print('{:<10} {:>8} {:>10.1f} {:>10.1f}'.format(name, sockets, p50 * 1000, p99 * 1000))
+
+    if args.url:
+        for name in ('HTTP/1.1', 'HTTP/2'):
+            report(name, args.url)
+    else:
+        with StubServer(RapidStub(latency=constant_latency(0.01))) as server:
+            report('HTTP/1.1', server.url)
+
+        import trustme
+
+        ca = trustme.CA()
+        server_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        ca.issue_cert('127.0.0.1').configure_cert(server_context)
+        client_context = ssl.create_default_context()
+        ca.configure_trust(client_context)
+
+        with Http2StubServer(RapidStub(latency=constant_latency(0.01)), server_context, workers=args.concurrency) as server:
+            report('HTTP/2', server.url, client_context)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+'''
+Compares the memory taken by decoded response structs and their compact counterparts.
+
+    python benchmarks/model_memory.py [--count N]
+'''
+
+import json
+import sys
+import tracemalloc
+
+from argparse import ArgumentParser
+from os.path import dirname, join
+
+sys.path.insert(0, join(dirname(__file__), '..'))
+
+from eway.rapid.model import Customer, compact
+from eway.rapid.payment_method.transparent_redirect.response import AccessCodeResponse, TransactionInfo
+from eway.rapid.testing import RapidStub
+
+
+def sample_responses():
+    stub = RapidStub(seed=1)
+    request = {
+        'RedirectUrl': 'https://localhost/',
+        'Payment': {'TotalAmount': 4200, 'InvoiceNumber': 'INV-1', 'InvoiceReference': 'REF-1'},
+        'Customer': {'FirstName': 'Mr', 'LastName': 'Tester', 'Email': 'mrtester@example.com', 'City': 'Wellington'},
+        'Options': [{'Value': 'Option1'}, {'Value': 'Option2'}]
+    }
+    status, headers, access_code_response = stub.handle('POST', '/AccessCodes', body=json.dumps(request).encode('utf-8'))
+    access_code = json.loads(access_code_response.decode('utf-8'))['AccessCode']
+    status, headers, transaction_info = stub.handle('GET', '/AccessCode/{}'.format(access_code))
+
+    return access_code_response.decode('utf-8'), transaction_info.decode('utf-8')
+
+
+def measure(decode, payload, count):
+    payloads = [json.loads(payload) for _ in range(count)]
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    objects = [decode(item) for item in payloads]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    size = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+
+    del objects
+    return size / float(count)
+
+
+def main(argv=None):
+    parser = ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--count', type=int, default=10000, help='number of structs decoded per measurement')
+    count = parser.parse_args(argv).count
+
+    access_code_response, transaction_info = sample_responses()
+    customer = json.dumps(json.loads(access_code_response)['Customer'])
+
+    print('{:<22} {:>12} {:>12} {:>8}'.format('struct', 'regular, B', 'compact, B', 'saved'))
+
+    for name, cls, payload in (
+        ('Customer', Customer, customer),
+        ('AccessCodeResponse', AccessCodeResponse, access_code_response),
+        ('TransactionInfo', TransactionInfo, transaction_info)
+    ):
+        regular = measure(cls.from_json, payload, count)
+        packed = measure(compact(cls).from_json, payload, count)
+
+        print('{:<22} {:>12.0f} {:>12.0f} {:>7.0f}%'.format(name, regular, packed, 100 * (1 - packed / regular)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+'''
+Compares the response validation of RestClient with the previous implementation,
+which decoded and stripped the whole body before looking at it.
+
+    python benchmarks/response_validation.py [--number N]
+'''
+
+import json
+import sys
+import timeit
+
+from argparse import ArgumentParser
+from os.path import dirname, join
+
+sys.path.insert(0, join(dirname(__file__), '..'))
+
+from eway.rapid.client import RestClientMixin
+from eway.rapid.exception import ResponseError
+from eway.rapid.testing import RapidStub
+
+
+class Response(object):
+    encoding = 'utf-8'
+
+    def __init__(self, status_code, content, content_type):
+        self.status_code = status_code
+        self.content = content
+        self.headers = {'Content-Type': content_type}
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding)
+
+
+def decoding_validate(response):
+    txt = response.text.strip()
+
+    if response.status_code in [401, 403]:
+        raise ResponseError('S9993')
+
+    elif response.status_code == 404:
+        raise ResponseError('S9990')
+
+    elif response.status_code >= 500:
+        raise ResponseError('S9996')
+
+    elif len(txt) == 0:
+        raise ResponseError('S9902')
+
+    elif not txt.startswith(u'{') or not txt.strip().endswith(u'}'):
+        raise ResponseError('S9901')
+
+    return response.content
+
+
+def sample_responses():
+    stub = RapidStub(seed=1)
+    request = {
+        'RedirectUrl': 'https://localhost/',
+        'Payment': {'TotalAmount': 4200, 'InvoiceNumber': 'INV-1'},
+        'Options': [{'Value': 'Option1'}]
+    }
+    status, headers, success = stub.handle('POST', '/AccessCodes', body=json.dumps(request).encode('utf-8'))
+    error_page = b'<html><body>' + b'<p>Service Unavailable</p>\n' * 20000 + b'</body></html>\n'
+
+    return (
+        ('small success', Response(status, success, headers['Content-Type'])),
+        ('large 503 page', Response(503, error_page, 'text/html')),
+        ('large 200 page', Response(200, error_page, 'text/html')),
+    )
+
+
+def measure(validate, response, number):
+    def run():
+        try:
+            validate(response)
+        except ResponseError:
+            pass
+
+    return min(timeit.repeat(run, number=number, repeat=5)) / number * 1e6
+
+
+def main(argv=None):
+    parser = ArgumentParser(description='Compares the response validation of RestClient with the previous implementation')
+    parser.add_argument('--number', type=int, default=20000, help='number of validations of a small response per measurement, large ones are validated 100 times less')
+    number = parser.parse_args(argv).number
+
+    validate = RestClientMixin()._validate_response
+
+    print('{:<16} {:>10} {:>14} {:>12}'.format('response', 'size, B', 'decoding, us', 'raw, us'))
+
+    for name, response in sample_responses():
+        count = number if len(response.content) < 4096 else max(1, number // 100)
+
+        print('{:<16} {:>10} {:>14.2f} {:>12.2f}'.format(
+            name, len(response.content), measure(decoding_validate, response, count), measure(validate, response, count)
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+'''
+Measures the throughput of the whole TransparentRedirect stack (encoding, client, validation, decoding)
+through every transport. The in-process transport shows the overhead of the SDK alone, the others
+add a local stub server on top of it.
+
+    python benchmarks/transport.py [--number N]
+'''
+
+import sys
+import time
+
+from argparse import ArgumentParser
+from os.path import dirname, join
+
+sys.path.insert(0, join(dirname(__file__), '..'))
+
+from eway.rapid.client import InProcessTransport, RequestsTransport, RestClient, Urllib3Transport
+from eway.rapid.endpoint import GenericEndpoint
+from eway.rapid.model import Payment, RequestMethod, TransactionType
+from eway.rapid.payment_method.transparent_redirect import CreateAccessCodeRequest, TransparentRedirect
+from eway.rapid.testing import RapidStub, StubServer
+
+
+def measure(transport, url, number):
+    client = RestClient('api-key', 'api-password', GenericEndpoint().set_url(url), transport=transport)
+    method = TransparentRedirect(client)
+    request = CreateAccessCodeRequest(Payment(4200, InvoiceNumber='INV-1'), RequestMethod.ProcessPayment, TransactionType.Purchase, 'https://localhost/')
+    access_code = method.create_access_code(request).AccessCode
+
+    started = time.time()
+
+    for _ in range(number // 2):
+        method.create_access_code(request)
+        method.request_transaction_result(access_code)
+
+    elapsed = time.time() - started
+    client.close()
+
+    return elapsed / number * 1e6
+
+
+def main(argv=None):
+    parser = ArgumentParser(description='Measures the throughput of the whole TransparentRedirect stack through every transport')
+    parser.add_argument('--number', type=int, default=20000, help='number of in-process calls, the transports over the network make 10 times less')
+    number = parser.parse_args(argv).number
+
+    stub = RapidStub(seed=1)
+
+    print('{:<12} {:>12} {:>14}'.format('transport', 'call, us', 'calls/minute'))
+
+    def report(name, call_us):
+        print('{:<12} {:>12.1f} {:>14,.0f}'.format(name, call_us, 60e6 / call_us))
+
+    report('in-process', measure(InProcessTransport(stub.handle), 'https://api.sandbox.ewaypayments.com/', number))
+
+    with StubServer(stub) as server:
+        network_number = max(2, number // 10)
+
+        report('urllib3', measure(Urllib3Transport(), server.url, network_number))
+        report('requests', measure(RequestsTransport(), server.url, network_number))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+'''
+The module contains the in-process cache of transaction results.
+
+Once a transaction is processed its result never changes, so the web tier, webhook handlers
+and other services of an application may share one cache instead of each asking Rapid API
+for the same access code:
+
+    cache = ResultCache(maxsize=10000)
+    payment_method = TransparentRedirect(client, result_cache=cache)
+
+Only the results of processed transactions (approved or declined) are stored. Cached results are
+shared by all the callers, so they must not be modified.
+'''
+
+from collections import OrderedDict
+from threading import Lock
+
+try:
+    from time import monotonic
+except ImportError:
+    from time import time as monotonic
+
+
+# An Access Code can only be queried for one week after it has been created
+ACCESS_CODE_LIFETIME = 7 * 24 * 60 * 60
+
+
+def is_final(info):
+    '''
+    Checks whether a TransactionInfo describes a processed transaction, which is not going to change
+
+    Arguments:
+        info : .payment_method.transparent_redirect.response.TransactionInfo = transaction information
+    '''
+    return not info.Errors and info.TransactionID is not None and info.TransactionStatus is not None
+
+
+class ResultCache(object):
+    '''
+    Thread-safe LRU cache with entries expiring after a time to live
+
+    Attributes:
+        hits   : int = number of lookups answered from the cache
+        misses : int = number of lookups not found in the cache (or expired)
+    '''
+
+    hits = 0
+
+    misses = 0
+
+    def __init__(self, maxsize=10000, ttl=ACCESS_CODE_LIFETIME, clock=monotonic):
+        '''
+        Initializes the cache
+
+        Arguments:
+            maxsize : int               = maximum number of entries, the least recently used ones are evicted first
+            ttl     : float             = seconds an entry is kept for, default value is the lifetime of an access code
+            clock   : callable -> float = monotonic clock in seconds
+        '''
+        if maxsize < 1:
+            raise ValueError('maxsize must be a positive number')
+
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()  # key -> (expires at, value)
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        '''
+        Returns the value cached for the key, None if there is none
+
+        Arguments:
+            key : str = access code
+        '''
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None or entry[0] <= self._clock():
+                if entry is not None:
+                    del self._entries[key]
+
+                self.misses += 1
+                return None
+
+            _move_to_end(self._entries, key)
+            self.hits += 1
+
+            return entry[1]
+
+    def put(self, key, value):
+        '''
+        Caches the value for the key
+
+        Arguments:
+            key   : str = access code
+            value : ?   = value to be cached
+        '''
+        with self._lock:
+            entries = self._entries
+            entries.pop(key, None)
+            entries[key] = (self._clock() + self._ttl, value)
+
+            while len(entries) > self._maxsize:
+                entries.popitem(last=False)
+
+    def clear(self):
+        'Removes all the entries and resets the counters'
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def get_stats(self):
+        '''
+        Returns the counters of the cache: size, maxsize, hits, misses and hit_rate
+        '''
+        with self._lock:
+            lookups = self.hits + self.misses
+
+            return {
+                'size': len(self._entries),
+                'maxsize': self._maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': float(self.hits) / lookups if lookups else 0.0
+            }
+
+
+def _move_to_end(entries, key):
+    try:
+        entries.move_to_end(key)
+    except AttributeError:  # python 2
+        entries[key] = entries.pop(key)
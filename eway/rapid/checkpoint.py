@@ -0,0 +1,186 @@
+'''
+The module contains checkpoints recording the progress of long running bulk operations,
+such as reconciling the transaction results of a day, so that an interrupted run resumes
+where it stopped instead of repeating the calls already made.
+
+The progress is recorded as positions in the input, so a resumed run must be given the same
+input in the same order. A checkpoint keeps:
+ * position - number of the leading items of the input all processed
+ * done     - positions processed beyond that point
+
+An item far behind the others (e.g. a slow call) holds the position back while the later items keep
+completing, so the items are only started within a window ahead of the position, of 16 items per
+call in flight. The size of `done` is bounded by that window, whatever the length of the input.
+
+    checkpoint = FileCheckpoint('/var/lib/reconcile/2016-05-01.json')
+
+    for access_code, result in payment_method.request_transaction_results(access_codes, checkpoint=checkpoint):
+        ...
+
+Items are marked processed once the consumer asks for the next result, so an item being handled
+when the run is interrupted is processed again on resume.
+'''
+
+import json
+import os
+
+from itertools import islice
+
+
+class Checkpoint(object):
+    '''
+    Abstract checkpoint
+    '''
+
+    def load(self):
+        '''
+        Returns the recorded progress as a `(position, done)` pair, `(0, set())` if there is none
+        '''
+        raise TypeError('Method load has not been implemented')
+
+    def update(self, position, done):
+        '''
+        Records the progress, may defer persisting it until `flush` is called
+
+        Arguments:
+            position : int      = number of the leading items all processed
+            done     : set(int) = positions processed beyond `position`
+        '''
+        raise TypeError('Method update has not been implemented')
+
+    def flush(self):
+        '''
+        Persists the last progress recorded
+        '''
+        pass
+
+
+class MemoryCheckpoint(Checkpoint):
+    '''
+    Checkpoint keeping the progress in memory, for resuming within the same process
+    '''
+
+    def __init__(self):
+        self.position = 0
+        self.done = set()
+
+    def load(self):
+        return self.position, set(self.done)
+
+    def update(self, position, done):
+        self.position = position
+        self.done = set(done)
+
+
+class FileCheckpoint(Checkpoint):
+    '''
+    Checkpoint keeping the progress in a json file
+
+    The file is replaced atomically, so it is consistent even if the process is killed while saving.
+    '''
+
+    def __init__(self, path, save_every=100):
+        '''
+        Initializes the checkpoint
+
+        Arguments:
+            path       : str = path to the file, created on the first save
+            save_every : int = number of updates between the saves
+        '''
+        self._path = path
+        self._save_every = save_every
+        self._updates = 0
+        self._progress = None
+
+    def load(self):
+        try:
+            with open(self._path, 'r') as checkpoint_file:
+                data = json.load(checkpoint_file)
+        except (IOError, OSError):
+            return 0, set()
+
+        return data['position'], set(data['done'])
+
+    def update(self, position, done):
+        self._progress = (position, frozenset(done))
+        self._updates += 1
+
+        if self._updates >= self._save_every:
+            self.flush()
+
+    def flush(self):
+        if self._progress is None:
+            return
+
+        position, done = self._progress
+        temporary_path = '{}.tmp'.format(self._path)
+
+        with open(temporary_path, 'w') as checkpoint_file:
+            json.dump({'position': position, 'done': sorted(done)}, checkpoint_file)
+
+        _replace(temporary_path, self._path)
+        self._updates = 0
+
+    def remove(self):
+        '''
+        Removes the file, e.g. once the run is complete
+        '''
+        self._progress = None
+
+        if os.path.exists(self._path):
+            os.remove(self._path)
+
+
+_replace = getattr(os, 'replace', os.rename)  # python 2 has no os.replace, rename is atomic on POSIX
+
+_WINDOW_PER_CALL = 16
+
+
+class _Progress(object):
+    '''
+    Tracks the positions processed while reading items from the input
+    '''
+
+    def __init__(self, checkpoint, max_concurrency=None):
+        '''
+        Arguments:
+            checkpoint      : Checkpoint = checkpoint of the progress
+            max_concurrency : int        = number of calls kept in flight, the window of the items
+                                           which may be started is not limited if not set
+        '''
+        self._checkpoint = checkpoint
+        self._position, self._done = checkpoint.load()
+        self._window = max_concurrency * _WINDOW_PER_CALL if max_concurrency else None
+
+    def pending(self, items):
+        '''
+        Yields `(position, item)` pairs of the items not processed yet
+        '''
+        position = self._position
+        done = frozenset(self._done)
+
+        for item in islice(items, position, None):
+            if position not in done:
+                yield position, item
+
+            position += 1
+
+    def admits(self, pending_item):
+        '''
+        Checks whether a `(position, item)` pair yielded by `pending` may be started now,
+        i.e. it is within the window ahead of the leading items all processed
+        '''
+        return self._window is None or pending_item[0] < self._position + self._window
+
+    def complete(self, position):
+        done = self._done
+        done.add(position)
+
+        while self._position in done:
+            done.remove(self._position)
+            self._position += 1
+
+        self._checkpoint.update(self._position, done)
+
+    def flush(self):
+        self._checkpoint.flush()
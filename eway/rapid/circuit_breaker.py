@@ -0,0 +1,283 @@
+'''
+The module contains the circuit breaker guarding an endpoint of Rapid API.
+
+While the gateway is healthy the circuit is closed and all the requests go through. The breaker
+keeps the outcomes and latencies of the calls made within a rolling window. Once the share of
+failed (or slow) calls reaches its threshold the circuit opens and requests fail fast with
+`ResponseError('S9992')` instead of blocking on a degraded gateway.
+
+After a cool-down period the circuit becomes half-open and lets a small share of the requests
+through. Every successful probe doubles that share until the circuit closes again, a failed
+probe opens it for another cool-down period.
+
+    endpoint = ProductionEndpoint().set_circuit_breaker(CircuitBreaker(failure_rate_threshold=0.5))
+    ...
+    endpoint.get_circuit_breaker().get_state()  # 'closed', 'open' or 'half_open'
+'''
+
+import random
+
+from collections import deque
+from threading import Lock
+
+try:
+    from time import monotonic
+except ImportError:
+    from time import time as monotonic
+
+from .exception import TRANSIENT_CODES, EwayError, ResponseError
+
+try:
+    from asyncio import CancelledError
+    _CANCELLATIONS = (CancelledError, GeneratorExit)
+except ImportError:
+    _CANCELLATIONS = (GeneratorExit,)
+
+
+class CircuitBreaker(object):
+    '''
+    Circuit breaker tracking the error rate and the latency of the calls to an endpoint
+    '''
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    # Errors telling that the gateway is unhealthy, other errors are caused by the requests themselves
+    FAILURE_CODES = TRANSIENT_CODES
+
+    def __init__(self, failure_rate_threshold=0.5, minimum_calls=20, window=60.0, slow_call_duration=None, slow_call_rate_threshold=0.8,
+                 open_duration=30.0, probe_ratio=0.1, max_samples=1000, seed=None, clock=monotonic):
+        '''
+        Initializes the breaker
+
+        Arguments:
+            failure_rate_threshold   : float            = share of failed calls opening the circuit
+            minimum_calls            : int              = number of calls in the window required before the circuit may open
+            window                   : float            = duration of the rolling window in seconds
+            slow_call_duration       : float            = calls taking longer (seconds) are slow, slow calls are not tracked if not set
+            slow_call_rate_threshold : float            = share of slow calls opening the circuit
+            open_duration            : float            = seconds the circuit stays open before probing the endpoint
+            probe_ratio              : float            = share of the requests let through when the circuit becomes half-open
+            max_samples              : int              = maximum number of calls kept in the window
+            seed                     : int              = seed of the probe sampling, for reproducible runs
+            clock                    : callable -> float = monotonic clock in seconds
+        '''
+        if not 0 < probe_ratio <= 1:
+            raise ValueError('probe_ratio must be within (0, 1]')
+
+        self._failure_rate_threshold = failure_rate_threshold
+        self._minimum_calls = minimum_calls
+        self._window = window
+        self._slow_call_duration = slow_call_duration
+        self._slow_call_rate_threshold = slow_call_rate_threshold
+        self._open_duration = open_duration
+        self._probe_ratio = probe_ratio
+        self._clock = clock
+        self._random = random.Random(seed)
+        self._lock = Lock()
+
+        self._max_samples = max_samples
+        self._samples = deque()  # (finished at, latency, failed, slow)
+        self._failures = 0
+        self._slow_calls = 0
+
+        self._state = self.CLOSED
+        self._opened_at = None
+        self._admit_ratio = 1.0
+        self._probes = 0
+
+    def get_state(self):
+        '''
+        Returns the current state of the circuit: CircuitBreaker.CLOSED, OPEN or HALF_OPEN
+        '''
+        with self._lock:
+            return self._current_state(self._clock())
+
+    def is_open(self):
+        'Returns True if the circuit rejects all the requests'
+        return self.get_state() == self.OPEN
+
+    def get_stats(self):
+        '''
+        Returns a snapshot of the circuit state and of the calls within the rolling window:
+            state          : str   = CircuitBreaker.CLOSED, OPEN or HALF_OPEN
+            admit_ratio    : float = share of the requests let through
+            calls          : int   = number of calls in the window
+            failure_rate   : float = share of failed calls
+            slow_call_rate : float = share of slow calls
+            p50, p95, p99  : float = latency percentiles in seconds, None if there were no calls
+        '''
+        with self._lock:
+            now = self._clock()
+            state = self._current_state(now)
+            self._prune(now)
+
+            calls = len(self._samples)
+            latencies = sorted(sample[1] for sample in self._samples)
+
+            stats = {
+                'state': state,
+                'admit_ratio': 0.0 if state == self.OPEN else self._admit_ratio,
+                'calls': calls,
+                'failure_rate': float(self._failures) / calls if calls else 0.0,
+                'slow_call_rate': float(self._slow_calls) / calls if calls else 0.0
+            }
+
+        for name, percentile in (('p50', 0.50), ('p95', 0.95), ('p99', 0.99)):
+            stats[name] = latencies[min(calls - 1, int(percentile * calls))] if calls else None
+
+        return stats
+
+    def call(self):
+        '''
+        Asks for a permission to make a call, raises `ResponseError('S9992')` if the circuit does not allow it.
+        Returns a context manager recording the outcome and the latency of the call:
+
+            with breaker.call():
+                ...
+        '''
+        with self._lock:
+            now = self._clock()
+            state = self._current_state(now)
+
+            if state == self.OPEN:
+                raise ResponseError('S9992')  # Error connecting to Rapid gateway
+
+            probe = state == self.HALF_OPEN
+
+            if probe:
+                if self._probes and self._random.random() >= self._admit_ratio:
+                    raise ResponseError('S9992')  # Error connecting to Rapid gateway
+
+                self._probes += 1
+
+        return _Call(self, now, probe)
+
+    def record(self, started, finished, failed, probe=False):
+        '''
+        Records the outcome of a call
+
+        Arguments:
+            started  : float = clock value when the call started
+            finished : float = clock value when the call finished
+            failed   : bool  = whether the call failed because of the endpoint
+            probe    : bool  = whether the call was let through by the half-open circuit
+        '''
+        latency = finished - started
+        slow = self._slow_call_duration is not None and latency > self._slow_call_duration
+
+        with self._lock:
+            if probe:
+                self._probes = max(0, self._probes - 1)
+
+            state = self._current_state(finished)
+
+            if state == self.HALF_OPEN and probe:
+                if failed or slow:
+                    self._open(finished)
+                    return
+
+                self._admit_ratio = min(1.0, self._admit_ratio * 2)
+
+                if self._admit_ratio >= 1.0:
+                    self._close()
+
+                return
+
+            if state != self.CLOSED:
+                return  # a late call made before the circuit opened
+
+            self._samples.append((finished, latency, failed, slow))
+            self._failures += failed
+            self._slow_calls += slow
+            self._prune(finished)
+
+            calls = len(self._samples)
+
+            if calls >= self._minimum_calls and (
+                self._failures >= self._failure_rate_threshold * calls or
+                (self._slow_call_duration is not None and self._slow_calls >= self._slow_call_rate_threshold * calls)
+            ):
+                self._open(finished)
+
+    def cancel(self, probe=False):
+        '''
+        Forgets a call cancelled before its outcome was known, e.g. the slower request of a hedged call
+
+        Arguments:
+            probe : bool = whether the call was let through by the half-open circuit
+        '''
+        if probe:
+            with self._lock:
+                self._probes = max(0, self._probes - 1)
+
+    def reset(self):
+        'Closes the circuit and forgets all the calls'
+        with self._lock:
+            self._close()
+
+    def _current_state(self, now):
+        if self._state == self.OPEN and now - self._opened_at >= self._open_duration:
+            self._state = self.HALF_OPEN
+            self._admit_ratio = self._probe_ratio
+            self._probes = 0
+
+        return self._state
+
+    def _open(self, now):
+        self._state = self.OPEN
+        self._opened_at = now
+        self._clear()
+
+    def _close(self):
+        self._state = self.CLOSED
+        self._opened_at = None
+        self._admit_ratio = 1.0
+        self._probes = 0
+        self._clear()
+
+    def _clear(self):
+        self._samples.clear()
+        self._failures = 0
+        self._slow_calls = 0
+
+    def _prune(self, now):
+        samples = self._samples
+        horizon = now - self._window
+
+        while samples and (samples[0][0] < horizon or len(samples) > self._max_samples):
+            finished, latency, failed, slow = samples.popleft()
+            self._failures -= failed
+            self._slow_calls -= slow
+
+
+class _Call(object):
+    '''
+    A call permitted by a circuit breaker
+    '''
+
+    __slots__ = ('_breaker', '_started', '_probe')
+
+    def __init__(self, breaker, started, probe):
+        self._breaker = breaker
+        self._started = started
+        self._probe = probe
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if isinstance(exc_value, _CANCELLATIONS):
+            self._breaker.cancel(self._probe)  # says nothing about the endpoint
+            return False
+
+        if exc_value is None:
+            failed = False
+        elif isinstance(exc_value, EwayError):
+            failed = exc_value._code in self._breaker.FAILURE_CODES
+        else:
+            failed = True
+
+        self._breaker.record(self._started, self._breaker._clock(), failed, self._probe)
+        return False
@@ -0,0 +1,658 @@
+'''
+The module with classes implementing different protocols available in eWAY Rapid API v3.
+Those are defined by the specification:
+ * RestClient - REST(JSON)
+ * SOAP
+ * HTTP POST (JSON or XML)
+ * RPC (XML or JSON)
+
+The idea of a Client class is to work with Request and Response objects on the interface level,
+however encode/decode them internally into necessary specific data (json, xml or anything else).
+
+AsyncRestClient implements the REST(JSON) protocol for asyncio applications (Python 3.5+, requires httpx).
+'''
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from logging import getLogger
+from sys import version_info
+from threading import BoundedSemaphore, Event, Lock, Thread, current_thread
+from time import sleep
+
+try:
+    from time import monotonic
+except ImportError:
+    from time import time as monotonic
+
+from ..codec import get_codec
+from ..exception import RequestTimeoutError, ResponseError
+from ..observer import CallTimings, ObservableMixin, timed
+from .dns import DnsCache, get_dns_cache, set_dns_cache
+from .transport import HttpxTransport, InProcessTransport, RequestsTransport, Transport, TransportError, TransportTimeout, Urllib3Transport
+
+class Client(ObservableMixin):
+    '''
+    Abstract client implementation.
+    Contains credentials, logger and an endpoint instance.
+
+    Observers registered with `add_observer` receive the timings of the calls (see `eway.rapid.observer`).
+    '''
+
+    _api_key = ''
+
+    _api_password = ''
+
+    _endpoint = None
+
+    _logger = None
+
+    _retry_policy = None
+
+    _connect_timeout = 10.0
+
+    _read_timeout = 60.0
+
+    _rate_limiter = None
+
+    _hedging_policy = None
+
+    def __init__(self, api_key, api_password, endpoint, logger=None, retry_policy=None, connect_timeout=10.0, read_timeout=60.0, rate_limiter=None,
+                 hedging_policy=None):
+        '''
+        Initializes the client.
+
+        Parameters:
+            api_key         : str                     = eWAY API Key
+            api_password    : str                     = eWAY API Password
+            endpoint        : .endpoint.Endpoint      = Initialised endpoint
+            logger          : logging.Logger          = default value is `logging.getLogger('eway.rapid.client')`
+            retry_policy    : .retry.RetryPolicy      = policy retrying transient failures, no retries by default
+            connect_timeout : float                   = seconds to wait for a connection to be established, None to wait forever
+            read_timeout    : float                   = seconds to wait for the gateway to send data, None to wait forever
+            rate_limiter    : .rate_limit.RateLimiter = limiter of the requests sent, no limit by default
+            hedging_policy  : .hedging.HedgingPolicy  = policy hedging slow transaction result queries, they are not hedged by default
+        '''
+
+        if not logger:
+            logger = getLogger('eway.rapid.client')
+
+        self._logger = logger
+
+        self._validate_credentials(api_key, api_password)
+        self._api_key = api_key
+        self._api_password = api_password
+
+        self._validate_endpoint(endpoint)
+        self._endpoint = endpoint
+
+        self._retry_policy = retry_policy
+        self._connect_timeout = connect_timeout
+        self._read_timeout = read_timeout
+        self._rate_limiter = rate_limiter
+        self._hedging_policy = hedging_policy
+
+    def _validate_credentials(self, api_key, api_password):
+        if not len(api_key) or not len(api_password):
+            self._logger.error('API key and password are invalid')
+            raise ResponseError('S9991')  # Rapid API key or password not set
+
+    def _validate_endpoint(self, endpoint):
+        if not len(endpoint.get_url()):
+            self._logger.error('Endpoint returns empty URL')
+            raise ResponseError('S9990')  # Rapid endpoint not set or invalid
+
+    def transparent_redirect_create_access_code(self, request, deadline=None, timings=None):
+        '''Must be implemented in children'''
+        raise TypeError('Method transparent_redirect_create_access_code has not been implemented')
+
+    def transparent_redirect_get_transaction_info(self, access_code, deadline=None, timings=None):
+        '''Must be implemented in children'''
+        raise TypeError('Method transparent_redirect_get_transaction_info has not been implemented')
+
+
+class RestClientMixin(object):
+    '''
+    Parts of the REST (JSON) protocol shared by the blocking and the asyncio clients
+    '''
+
+    def _access_codes_route(self):
+        return 'AccessCodes'
+
+    def _access_code_route(self, access_code):
+        return '{}/{}'.format('AccessCode', access_code)
+
+    def _validate_response(self, response):
+        status_code = response.status_code
+
+        if status_code in (401, 403):
+            raise ResponseError('S9993')  # Authentication error
+
+        elif status_code == 404:
+            raise ResponseError('S9990')  # Rapid endpoint not set or invalid
+
+        elif status_code >= 500:
+            raise ResponseError('S9996')  # Rapid gateway server error
+
+        body = response.content
+        first, last = _edge_bytes(body)
+
+        if first is None:
+            raise ResponseError('S9902')  # Empty response
+
+        elif not _is_json_content_type(response.headers.get('Content-Type')) or first != b'{' or last != b'}':
+            raise ResponseError('S9901')  # Response is not JSON
+
+        return body
+
+    def _timeouts(self, deadline):
+        '''
+        Returns connect and read timeouts of an attempt, raises `RequestTimeoutError('ST003')` if the deadline has passed
+
+        Arguments:
+            deadline : .deadline.Deadline = deadline of the call, may be None
+        '''
+        if deadline is None:
+            return self._connect_timeout, self._read_timeout
+
+        deadline.check()
+
+        # zero is not a valid timeout, the deadline is checked again once the attempt fails
+        return max(_MIN_TIMEOUT, deadline.timeout(self._connect_timeout)), max(_MIN_TIMEOUT, deadline.timeout(self._read_timeout))
+
+    def _rate_limit_delay(self, method, deadline):
+        '''
+        Takes a token of the rate limiter for an attempt and returns the seconds to wait before sending it,
+        raises `RequestTimeoutError('ST003')` if the token would not be available before the deadline
+
+        Arguments:
+            method   : str                = HTTP method of the request, POST creates access codes and GET queries them
+            deadline : .deadline.Deadline = deadline of the call, may be None
+        '''
+        limiter = self._rate_limiter
+        bucket = limiter.get_bucket(_RATE_LIMITED_OPERATIONS[method]) if limiter is not None else None
+
+        if bucket is None:
+            return 0.0
+
+        delay = bucket.reserve(1, deadline.remaining() if deadline is not None else None)
+
+        if delay is None:
+            raise RequestTimeoutError('ST003')  # Deadline of the call exceeded
+
+        return delay
+
+    def _timeout_error(self, connect_phase, deadline):
+        if deadline is not None and deadline.expired():
+            return RequestTimeoutError('ST003')  # Deadline of the call exceeded
+
+        return RequestTimeoutError('ST001' if connect_phase else 'ST002')
+
+    def _circuit_call(self, endpoint):
+        '''
+        Returns a context manager recording the call in the circuit breaker of the endpoint,
+        raises `ResponseError('S9992')` if the circuit is open
+
+        Arguments:
+            endpoint : .endpoint.Endpoint = endpoint the request is sent to
+        '''
+        circuit_breaker = endpoint.get_circuit_breaker()
+
+        if circuit_breaker is None:
+            return _NO_CIRCUIT
+
+        return circuit_breaker.call()
+
+    def _fails_over(self, error, idempotent, connect_phase):
+        '''
+        Checks whether a failed attempt may be repeated on the next endpoint right away, which is the case
+        for connection errors as long as the request is safe to be repeated
+        '''
+        return error._code in _FAILOVER_CODES and (connect_phase or idempotent)
+
+    def _retry_delay(self, error, attempt, idempotent, connect_phase, previous_delay, deadline=None):
+        '''
+        Returns the delay before retrying a failed attempt, raises the error if it must not be retried
+
+        Arguments:
+            error          : .exception.EwayError = error of the failed attempt
+            attempt        : int                  = number of the failed attempt, starting from 1
+            idempotent     : bool                 = whether the request is safe to be repeated
+            connect_phase  : bool                 = whether the attempt failed before the request was sent
+            previous_delay : float                = the previous delay of the request, None before the first retry
+            deadline       : .deadline.Deadline   = deadline of the call, `RequestTimeoutError('ST003')` is raised
+                                                    instead of a retry which would start after it
+        '''
+        policy = self._retry_policy
+
+        if policy is None or not policy.should_retry(error, attempt, idempotent, connect_phase):
+            raise error
+
+        delay = policy.backoff(previous_delay)
+
+        if deadline is not None and delay >= deadline.remaining():
+            raise RequestTimeoutError('ST003')  # Deadline of the call exceeded before the retry
+
+        self._logger.warning('Attempt {} failed with {}, retrying in {:.3f}s'.format(attempt, error._code, delay))
+
+        return delay
+
+
+class _NoCircuit(object):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NO_CIRCUIT = _NoCircuit()
+
+_MIN_TIMEOUT = 0.001
+
+_FAILOVER_CODES = frozenset(('S9992', 'ST001'))
+
+_HEDGING_WORKERS = 64  # threads sending the hedges, started on demand
+
+_PRIMARY_WORKERS = 64  # threads sending the first requests of the hedged calls, started on demand
+
+_RATE_LIMITED_OPERATIONS = {'POST': 'create_access_code', 'GET': 'get_transaction_info'}
+
+_WHITESPACE = frozenset((b' ', b'\t', b'\n', b'\r'))
+
+
+def _edge_bytes(body):
+    '''
+    Returns the first and the last non-whitespace bytes of the body without copying it,
+    (None, None) for an empty or a blank body
+    '''
+    first, last = body[:1], body[-1:]
+
+    if first not in _WHITESPACE and last not in _WHITESPACE:
+        return (first, last) if first else (None, None)
+
+    start, end = 0, len(body)
+
+    while start < end and body[start:start + 1] in _WHITESPACE:
+        start += 1
+
+    while end > start and body[end - 1:end] in _WHITESPACE:
+        end -= 1
+
+    if start == end:
+        return None, None
+
+    return body[start:start + 1], body[end - 1:end]
+
+
+def _is_json_content_type(content_type):
+    '''
+    Checks the Content-Type header of a response, a missing header is left to the body checks
+    '''
+    if not content_type or content_type.startswith('application/json'):
+        return True
+
+    media_type = content_type.split(';', 1)[0].strip().lower()
+
+    return media_type == 'application/json' or media_type.endswith('+json') or media_type == 'text/json'
+
+
+def _request_timings(timings):
+    '''
+    Returns the timings of one of the requests of a hedged call, None if the call is not timed
+    '''
+    return None if timings is None else CallTimings(timings.operation, timings.endpoint)
+
+
+def _hedge_result(future, request_timings, timings):
+    '''
+    Returns the result of one of the requests of a hedged call (or raises its error) once it is finished,
+    and adds the timings of the request to the ones of the call
+    '''
+    try:
+        return future.result()
+    finally:
+        if timings is not None:
+            timings.include(request_timings)
+
+
+class _Refresher(Thread):
+    '''
+    Background thread calling a function periodically until stopped
+    '''
+
+    def __init__(self, refresh, interval):
+        Thread.__init__(self, name='eway-rapid-refresher')
+        self.daemon = True
+        self._refresh = refresh
+        self._interval = interval
+        self._stopped = Event()
+
+    def run(self):
+        while not self._stopped.wait(self._interval):
+            try:
+                self._refresh()
+            except Exception:
+                getLogger('eway.rapid.client').exception('Refreshing the connections failed')
+
+    def stop(self):
+        self._stopped.set()
+
+
+class RestClient(RestClientMixin, Client):
+    '''
+    Implementation of a REST (JSON) client, which is recommended by the Rapid API v3 specification
+
+    The requests are sent through a transport (see `eway.rapid.client.transport`). The default one
+    owns a `requests.Session` with a pooled HTTP adapter, so sequential and concurrent calls reuse
+    warm keep-alive connections instead of paying for TCP and TLS handshakes each time.
+    The pool is shared by all the threads using the client. Call `close()` when the client is not
+    needed anymore, or use it as a context manager:
+
+        with RestClient('api-key', 'api-password', SandboxEndpoint()) as client:
+            payment_method = TransparentRedirect(client)
+            ...
+    '''
+
+    _transport = None
+
+    _refresher = None
+
+    _executor = None
+
+    _primary_executor = None
+
+    def __init__(self, api_key, api_password, endpoint, logger=None, pool_connections=10, pool_maxsize=10, pool_block=False, keep_alive=True,
+                 retry_policy=None, connect_timeout=10.0, read_timeout=60.0, rate_limiter=None, transport=None, hedging_policy=None):
+        '''
+        Initializes the client.
+
+        Parameters:
+            api_key          : str                     = eWAY API Key
+            api_password     : str                     = eWAY API Password
+            endpoint         : .endpoint.Endpoint      = Initialised endpoint
+            logger           : logging.Logger          = default value is `logging.getLogger('eway.rapid.client')`
+            pool_connections : int                     = number of per-host connection pools to keep
+            pool_maxsize     : int                     = maximum number of connections kept open to a single host
+            pool_block       : bool                    = whether to wait for a free connection when the pool is exhausted
+                                                         instead of opening a throwaway one
+            keep_alive       : bool                    = whether connections are kept open between requests
+            retry_policy     : .retry.RetryPolicy      = policy retrying transient failures, no retries by default
+            connect_timeout  : float                   = seconds to wait for a connection to be established, None to wait forever
+            read_timeout     : float                   = seconds to wait for the gateway to send data, None to wait forever
+            rate_limiter     : .rate_limit.RateLimiter = limiter of the requests sent, no limit by default
+            transport        : .transport.Transport    = transport sending the requests, default value is a RequestsTransport
+                                                         with the pool settings above (which are ignored otherwise)
+            hedging_policy   : .hedging.HedgingPolicy  = policy hedging slow transaction result queries, they are not hedged by default
+        '''
+        super(RestClient, self).__init__(api_key, api_password, endpoint, logger, retry_policy, connect_timeout, read_timeout, rate_limiter,
+                                         hedging_policy)
+
+        self._executor_lock = Lock()
+        self._primary_slots = BoundedSemaphore(_PRIMARY_WORKERS)
+
+        if transport is None:
+            transport = RequestsTransport(pool_connections, pool_maxsize, pool_block, keep_alive)
+
+        self._transport = transport.set_auth(api_key, api_password)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        '''
+        Closes the transport and all the pooled connections, stops refreshing them.
+        The client can still be used afterwards, the next request opens new connections.
+        '''
+        self._stop_refresher()
+
+        with self._executor_lock:
+            executors = (self._primary_executor, self._executor)
+            self._primary_executor, self._executor = None, None
+
+        for executor in executors:
+            if executor is not None:
+                executor.shutdown(wait=False)  # the requests outlived by their hedges finish in the background
+
+        self._transport.close()
+
+    def warm_up(self, connections=1, refresh_interval=None):
+        '''
+        Opens connections to the endpoint ahead of the first requests, so they do not pay for DNS,
+        TCP and TLS handshakes. Returns the number of the connections open, failures are logged.
+
+        Arguments:
+            connections      : int   = number of connections to be kept open, limited by the size of the pool
+            refresh_interval : float = seconds between the background checks reopening the connections closed
+                                       while idle (and resolving the cached hosts again, see `.dns`),
+                                       the connections are not refreshed if not set
+        '''
+        ready = self._warm_up(connections)
+        self._stop_refresher()
+
+        if refresh_interval is not None:
+            self._refresher = _Refresher(lambda: self._warm_up(connections, refresh_dns=True), refresh_interval)
+            self._refresher.start()
+
+        return ready
+
+    def _warm_up(self, connections, refresh_dns=False):
+        dns_cache = get_dns_cache()
+
+        if refresh_dns and dns_cache is not None:
+            dns_cache.refresh()
+
+        return sum(self._warm_up_endpoint(endpoint.get_url(), connections) for endpoint in self._endpoint.get_endpoints())
+
+    def _warm_up_endpoint(self, url, connections):
+        try:
+            return self._transport.warm_up(url, connections, self._connect_timeout)
+        except Exception as e:  # warming up is an optimization, the requests open the connections they need anyway
+            self._logger.warning('Warming up the connections to {} failed: {}'.format(url, e))
+            return 0
+
+    def _stop_refresher(self):
+        refresher, self._refresher = self._refresher, None
+
+        if refresher is not None:
+            refresher.stop()
+
+            if refresher is not current_thread():
+                refresher.join()
+
+    def _request(self, method, route, deadline=None, timings=None, **kwargs):
+        error = None
+
+        try:
+            if method == 'GET' and self._hedging_policy is not None:
+                return self._hedged_send(method, route, deadline, timings, **kwargs)
+
+            return self._send(method, route, deadline, timings, **kwargs)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self._finish_timings(timings, error)
+
+    def _send(self, method, route, deadline, timings, **kwargs):
+        policy = self._retry_policy
+
+        if policy is not None:
+            policy.start()
+
+        attempt, delay, idempotent = 1, None, method == 'GET'
+
+        while True:
+            wait = self._rate_limit_delay(method, deadline)
+
+            if wait > 0:
+                timed(timings, 'rate_limit_wait', sleep, wait)
+
+            all_open = True
+
+            for endpoint in self._endpoint.get_endpoints():
+                timeout = self._timeouts(deadline)  # before a half-open circuit reserves its probe for the attempt
+
+                try:
+                    circuit_call = self._circuit_call(endpoint)
+                except ResponseError as e:
+                    circuit_error = e
+                    continue
+
+                connect_phase, all_open = False, False
+                started = monotonic()
+
+                try:
+                    with circuit_call:
+                        try:
+                            response = self._transport_request(timings, endpoint, method, route, deadline, timeout=timeout, **kwargs)
+                            body = timed(timings, 'validate_response', self._validate_response, response)
+                        except TransportError as e:
+                            connect_phase = e.connect_phase
+                            raise self._transport_error(e, deadline)
+                except (ResponseError, RequestTimeoutError) as e:
+                    error = e
+                else:
+                    self._endpoint.record(endpoint, monotonic() - started)
+                    return body
+
+                self._endpoint.record(endpoint, monotonic() - started, error)
+
+                if not self._fails_over(error, idempotent, connect_phase):
+                    break
+
+            if all_open:
+                raise circuit_error  # the circuits of all the endpoints are open
+
+            delay = self._retry_delay(error, attempt, idempotent, connect_phase, delay, deadline)
+            policy.sleep(delay)
+            attempt += 1
+
+    def _hedged_send(self, method, route, deadline, timings, **kwargs):
+        '''
+        Sends the request, and a hedge once it has been outstanding for the delay of the hedging policy.
+        The first successful response is returned, the timings describe the request it came from.
+        The calls which cannot be hedged, or find all the workers sending first requests busy,
+        are sent from the calling thread.
+        '''
+        policy = self._hedging_policy
+        started = monotonic()
+        delay = policy.start()
+
+        if delay is None or not policy.can_hedge() or not self._primary_slots.acquire(False):
+            return self._measured_send(started, method, route, deadline, timings, **kwargs)
+
+        # every request has timings of its own, so the one which lost does not touch the timings of the call
+        primary_timings, hedge_timings = _request_timings(timings), _request_timings(timings)
+        primaries, hedges = self._get_executors()
+
+        # the first requests have a pool of their own, so they never queue behind the hedges of other calls
+        try:
+            primary = primaries.submit(self._primary_send, started, method, route, deadline, primary_timings, **kwargs)
+        except BaseException:
+            self._primary_slots.release()
+            raise
+
+        if wait((primary,), max(0.0, started + delay - monotonic())).done or not policy.hedge():
+            return _hedge_result(primary, primary_timings, timings)
+
+        hedge = hedges.submit(self._measured_send, monotonic(), method, route, deadline, hedge_timings, **kwargs)
+        pending = (primary, hedge)
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+            for future, request_timings in ((primary, primary_timings), (hedge, hedge_timings)):
+                if future in done and future.exception() is None:
+                    policy.record_win(future is hedge)
+                    return _hedge_result(future, request_timings, timings)
+
+        return _hedge_result(primary, primary_timings, timings)  # both failed, raises the error of the first request
+
+    def _primary_send(self, started, method, route, deadline, timings, **kwargs):
+        try:
+            return self._measured_send(started, method, route, deadline, timings, **kwargs)
+        finally:
+            self._primary_slots.release()
+
+    def _measured_send(self, started, method, route, deadline, timings, **kwargs):
+        body = self._send(method, route, deadline, timings, **kwargs)
+        self._hedging_policy.record_latency(monotonic() - started)
+
+        return body
+
+    def _get_executors(self):
+        '''
+        Returns the pools sending the first requests of the hedged calls and their hedges
+        '''
+        with self._executor_lock:
+            if self._executor is None:
+                self._primary_executor = ThreadPoolExecutor(max_workers=_PRIMARY_WORKERS)
+                self._executor = ThreadPoolExecutor(max_workers=_HEDGING_WORKERS)
+
+            return self._primary_executor, self._executor
+
+    def _transport_request(self, timings, endpoint, method, route, deadline, **kwargs):
+        url = endpoint.get_url()
+
+        if timings is not None:
+            timings.attempts += 1
+            timings.first_byte_at = None
+            timings.endpoint = url
+
+        if deadline is not None:
+            kwargs['deadline'] = deadline  # transports not supporting deadlines keep working when none is set
+
+        response = self._transport.request(method, url + route, timings=timings, **kwargs)
+
+        if timings is not None:
+            timings.code = str(response.status_code)
+
+        return response
+
+    def _transport_error(self, error, deadline):
+        '''
+        Returns the error of an attempt the transport failed, a read stopped at the deadline is a timeout
+        '''
+        if isinstance(error, TransportTimeout) or (deadline is not None and deadline.expired()):
+            return self._timeout_error(error.connect_phase, deadline)
+
+        return ResponseError('S9992')  # Error connecting to Rapid gateway
+
+    def transparent_redirect_create_access_code(self, request, deadline=None, timings=None):
+        '''
+        TransparentRedirect STEP 1
+
+        Pass the customer and transaction details to eWAY to generate an Access Code
+
+        Arguments:
+            request  : .payment_method.TransparentRedirect.CreateAccessCodeRequest
+            deadline : .deadline.Deadline    = deadline of the call, only the client timeouts apply if not set
+            timings  : .observer.CallTimings = timings of the calling payment method the phases of the call are added to
+        '''
+        timings = self._start_timings('transparent_redirect_create_access_code', self._endpoint.get_url(), timings)
+        body = timed(timings, 'to_json', get_codec().dumps, request)
+
+        return self._request('POST', self._access_codes_route(), deadline, timings, body=body, headers={'Content-Type': 'application/json'})
+
+    def transparent_redirect_get_transaction_info(self, access_code, deadline=None, timings=None):
+        '''
+        TransparentRedirect STEP 3
+
+        Once the transaction has been processed, request the results from eWAY using the Access Code
+
+        WARNING: An Access Code can only be queried for one week after it has been created
+
+        Arguments:
+            access_code : str(512)              = The Access Code
+            deadline    : .deadline.Deadline    = deadline of the call, only the client timeouts apply if not set
+            timings     : .observer.CallTimings = timings of the calling payment method the phases of the call are added to
+        '''
+        timings = self._start_timings('transparent_redirect_get_transaction_info', self._endpoint.get_url(), timings)
+
+        return self._request('GET', self._access_code_route(access_code), deadline, timings)
+
+
+if version_info >= (3, 5):
+    from .asynchronous import AsyncRestClient
@@ -0,0 +1,310 @@
+'''
+The module contains the asyncio implementation of the REST (JSON) client.
+
+It requires the optional `httpx` dependency:
+
+    pip install eway-rapid-python[async]
+'''
+
+from asyncio import FIRST_COMPLETED, TimeoutError, ensure_future, sleep, wait, wait_for
+from time import monotonic
+
+from ..codec import get_codec
+from ..exception import RequestTimeoutError, ResponseError
+from ..observer import timed
+from . import Client, RestClientMixin, _hedge_result, _request_timings
+from .transport import HttpxTrace, is_http2_available
+
+
+class AsyncRestClient(RestClientMixin, Client):
+    '''
+    Implementation of a REST (JSON) client for asyncio applications
+
+    All the calls made through the client share one pool of keep-alive connections, so a single
+    event loop can keep many requests in flight without a thread per request.
+    The client must be used within one event loop. Close it with `await client.aclose()`
+    or use it as an async context manager:
+
+        async with AsyncRestClient('api-key', 'api-password', SandboxEndpoint()) as client:
+            payment_method = AsyncTransparentRedirect(client)
+            ...
+    '''
+
+    _max_connections = 100
+
+    _max_keepalive_connections = 20
+
+    _keepalive_expiry = 5.0
+
+    _http2 = False
+
+    _http = None
+
+    def __init__(self, api_key, api_password, endpoint, logger=None, max_connections=100, max_keepalive_connections=20, keepalive_expiry=5.0,
+                 retry_policy=None, connect_timeout=10.0, read_timeout=60.0, rate_limiter=None, http2=False, hedging_policy=None, verify=True):
+        '''
+        Initializes the client.
+
+        Parameters:
+            api_key                   : str                     = eWAY API Key
+            api_password              : str                     = eWAY API Password
+            endpoint                  : .endpoint.Endpoint      = Initialised endpoint
+            logger                    : logging.Logger          = default value is `logging.getLogger('eway.rapid.client')`
+            max_connections           : int                     = maximum number of connections open at the same time
+            max_keepalive_connections : int                     = maximum number of idle connections kept in the pool
+            keepalive_expiry          : float                   = seconds an idle connection is kept open
+            retry_policy              : .retry.RetryPolicy      = policy retrying transient failures, no retries by default
+            connect_timeout           : float                   = seconds to wait for a connection to be established, None to wait forever
+            read_timeout              : float                   = seconds to wait for the gateway to send data, None to wait forever
+            rate_limiter              : .rate_limit.RateLimiter = limiter of the requests sent, no limit by default
+            http2                     : bool                    = whether to multiplex the requests over HTTP/2 connections where the
+                                                                  server supports it, requires the h2 package (HTTP/1.1 is used without it)
+            hedging_policy            : .hedging.HedgingPolicy  = policy hedging slow transaction result queries, they are not hedged by default
+            verify                    : bool | ssl.SSLContext   = SSL context verifying the certificates of the servers,
+                                                                  e.g. one trusting the CA of a test server, the system CAs are trusted by default
+        '''
+        try:
+            import httpx
+        except ImportError:
+            raise ImportError('AsyncRestClient requires httpx, install it with `pip install eway-rapid-python[async]`')
+
+        super(AsyncRestClient, self).__init__(api_key, api_password, endpoint, logger, retry_policy, connect_timeout, read_timeout, rate_limiter,
+                                              hedging_policy)
+
+        self._max_connections = max_connections
+        self._max_keepalive_connections = max_keepalive_connections
+        self._keepalive_expiry = keepalive_expiry
+        self._http2 = http2 and is_http2_available()
+        self._verify = verify
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+    async def aclose(self):
+        '''
+        Closes all the pooled connections.
+        The client can still be used afterwards, the next request opens a new pool.
+        '''
+        http, self._http = self._http, None
+
+        if http is not None:
+            await http.aclose()
+
+    def _get_http(self):
+        if self._http is None:
+            self._http = self._create_http()
+
+        return self._http
+
+    def _create_http(self):
+        import httpx
+
+        limits = httpx.Limits(
+            max_connections=self._max_connections,
+            max_keepalive_connections=self._max_keepalive_connections,
+            keepalive_expiry=self._keepalive_expiry
+        )
+
+        return httpx.AsyncClient(auth=(self._api_key, self._api_password), limits=limits, http2=self._http2, verify=self._verify)
+
+    async def _request(self, method, route, deadline=None, timings=None, **kwargs):
+        error = None
+
+        try:
+            if method == 'GET' and self._hedging_policy is not None:
+                return await self._hedged_send(method, route, deadline, timings, **kwargs)
+
+            return await self._send(method, route, deadline, timings, **kwargs)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self._finish_timings(timings, error)
+
+    async def _send(self, method, route, deadline, timings, **kwargs):
+        import httpx
+
+        policy = self._retry_policy
+
+        if policy is not None:
+            policy.start()
+
+        attempt, delay, idempotent = 1, None, method == 'GET'
+
+        while True:
+            wait = self._rate_limit_delay(method, deadline)
+
+            if wait > 0:
+                started = monotonic()
+                await sleep(wait)
+
+                if timings is not None:
+                    timings.add('rate_limit_wait', monotonic() - started)
+
+            all_open = True
+
+            for endpoint in self._endpoint.get_endpoints():
+                connect_timeout, read_timeout = self._timeouts(deadline)  # before a half-open circuit reserves its probe for the attempt
+
+                try:
+                    circuit_call = self._circuit_call(endpoint)
+                except ResponseError as e:
+                    circuit_error = e
+                    continue
+
+                connect_phase, all_open = False, False
+                started = monotonic()
+
+                try:
+                    with circuit_call:
+                        try:
+                            timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+                            send = self._http_request(timings, endpoint, method, route, timeout=timeout, **kwargs)
+
+                            if deadline is not None:
+                                # unlike the timeouts, bounds the time of the whole attempt
+                                send = wait_for(send, deadline.timeout())
+
+                            body = timed(timings, 'validate_response', self._validate_response, await send)
+                        except TimeoutError:
+                            raise RequestTimeoutError('ST003')  # Deadline of the call exceeded
+                        except httpx.TimeoutException as e:
+                            connect_phase = isinstance(e, (httpx.ConnectTimeout, httpx.PoolTimeout))
+                            raise self._timeout_error(isinstance(e, httpx.ConnectTimeout), deadline)
+                        except (httpx.NetworkError, httpx.RemoteProtocolError) as e:
+                            connect_phase = isinstance(e, httpx.ConnectError)
+                            raise ResponseError('S9992')  # Error connecting to Rapid gateway
+                except (ResponseError, RequestTimeoutError) as e:
+                    error = e
+                else:
+                    self._endpoint.record(endpoint, monotonic() - started)
+                    return body
+
+                self._endpoint.record(endpoint, monotonic() - started, error)
+
+                if not self._fails_over(error, idempotent, connect_phase):
+                    break
+
+            if all_open:
+                raise circuit_error  # the circuits of all the endpoints are open
+
+            delay = self._retry_delay(error, attempt, idempotent, connect_phase, delay, deadline)
+            await sleep(delay)
+            attempt += 1
+
+    async def _hedged_send(self, method, route, deadline, timings, **kwargs):
+        '''
+        Sends the request, and a hedge once it has been outstanding for the delay of the hedging policy.
+        The first successful response is returned and the other request is cancelled,
+        the timings describe the request the response came from.
+        '''
+        policy = self._hedging_policy
+        started = monotonic()
+        delay = policy.start()
+
+        if delay is None or not policy.can_hedge():
+            return await self._measured_send(started, method, route, deadline, timings, **kwargs)
+
+        # every request has timings of its own, so the one which lost does not touch the timings of the call
+        primary_timings, hedge_timings = _request_timings(timings), _request_timings(timings)
+        primary = ensure_future(self._measured_send(started, method, route, deadline, primary_timings, **kwargs))
+        hedge = None
+
+        try:
+            done, _ = await wait((primary,), timeout=max(0.0, started + delay - monotonic()))
+
+            if done or not policy.hedge():
+                await wait((primary,))
+                return _hedge_result(primary, primary_timings, timings)
+
+            hedge = ensure_future(self._measured_send(monotonic(), method, route, deadline, hedge_timings, **kwargs))
+            pending = (primary, hedge)
+
+            while pending:
+                done, pending = await wait(pending, return_when=FIRST_COMPLETED)
+
+                for task, request_timings in ((primary, primary_timings), (hedge, hedge_timings)):
+                    if task in done and task.exception() is None:
+                        policy.record_win(task is hedge)
+                        return _hedge_result(task, request_timings, timings)
+
+            return _hedge_result(primary, primary_timings, timings)  # both failed, raises the error of the first request
+        finally:
+            for task in (primary, hedge):
+                if task is None:
+                    continue
+
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled():
+                    task.exception()  # the error of the losing request is not logged as never retrieved
+
+    async def _measured_send(self, started, method, route, deadline, timings, **kwargs):
+        body = await self._send(method, route, deadline, timings, **kwargs)
+        self._hedging_policy.record_latency(monotonic() - started)
+
+        return body
+
+    async def _http_request(self, timings, endpoint, method, route, **kwargs):
+        url = endpoint.get_url()
+
+        if timings is None:
+            return await self._get_http().request(method, url + route, **kwargs)
+
+        timings.attempts += 1
+        timings.first_byte_at = None
+        timings.endpoint = url
+        response = await self._get_http().request(method, url + route, extensions={'trace': _Trace(timings)}, **kwargs)
+        timings.code = str(response.status_code)
+
+        if timings.first_byte_at is not None:
+            timings.add('body_read', monotonic() - timings.first_byte_at)
+
+        return response
+
+    async def transparent_redirect_create_access_code(self, request, deadline=None, timings=None):
+        '''
+        TransparentRedirect STEP 1
+
+        Pass the customer and transaction details to eWAY to generate an Access Code
+
+        Arguments:
+            request  : .payment_method.TransparentRedirect.CreateAccessCodeRequest
+            deadline : .deadline.Deadline    = deadline of the call, only the client timeouts apply if not set
+            timings  : .observer.CallTimings = timings of the calling payment method the phases of the call are added to
+        '''
+        timings = self._start_timings('transparent_redirect_create_access_code', self._endpoint.get_url(), timings)
+        body = timed(timings, 'to_json', get_codec().dumps, request)
+
+        return await self._request('POST', self._access_codes_route(), deadline, timings, content=body, headers={'Content-Type': 'application/json'})
+
+    async def transparent_redirect_get_transaction_info(self, access_code, deadline=None, timings=None):
+        '''
+        TransparentRedirect STEP 3
+
+        Once the transaction has been processed, request the results from eWAY using the Access Code
+
+        WARNING: An Access Code can only be queried for one week after it has been created
+
+        Arguments:
+            access_code : str(512)              = The Access Code
+            deadline    : .deadline.Deadline    = deadline of the call, only the client timeouts apply if not set
+            timings     : .observer.CallTimings = timings of the calling payment method the phases of the call are added to
+        '''
+        timings = self._start_timings('transparent_redirect_get_transaction_info', self._endpoint.get_url(), timings)
+
+        return await self._request('GET', self._access_code_route(access_code), deadline, timings)
+
+
+class _Trace(HttpxTrace):
+    '''
+    Asynchronous callback of the httpcore `trace` extension
+    '''
+
+    __slots__ = ()
+
+    async def __call__(self, name, info):
+        self.record(name)
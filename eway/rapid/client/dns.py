@@ -0,0 +1,161 @@
+'''
+The module contains the DNS cache of the connections opened by RestClient.
+
+Every new connection resolves the host of the endpoint, which costs a round trip to the resolver
+(and may hit a slow one right after a deploy). With a cache, the addresses are resolved once
+and reused until they expire:
+
+    set_dns_cache(DnsCache(ttl=300))
+
+The cache is shared by all the clients of the process, as the system resolver is. The connections
+keep verifying the certificates against the host name, only the address lookup is cached.
+'''
+
+import socket
+
+from threading import Lock
+
+try:
+    from time import monotonic
+except ImportError:
+    from time import time as monotonic
+
+
+_dns_cache = None
+
+
+def get_dns_cache():
+    'Returns the DNS cache of the connections, None if the system resolver is used for every connection'
+    return _dns_cache
+
+
+def set_dns_cache(dns_cache):
+    '''
+    Sets the DNS cache of the connections
+
+    Arguments:
+        dns_cache : DnsCache = the cache, None resolves the hosts for every connection
+    '''
+    global _dns_cache
+    _dns_cache = dns_cache
+
+
+class DnsCache(object):
+    '''
+    Thread-safe cache of the addresses of hosts
+    '''
+
+    def __init__(self, ttl=300.0, clock=monotonic, resolver=socket.getaddrinfo):
+        '''
+        Initializes the cache
+
+        Arguments:
+            ttl      : float             = seconds the addresses of a host are kept for
+            clock    : callable -> float = monotonic clock in seconds
+            resolver : callable          = function with the signature of `socket.getaddrinfo`
+        '''
+        self._ttl = ttl
+        self._clock = clock
+        self._resolver = resolver
+        self._entries = {}  # (host, port) -> (expires at, [address])
+        self._lock = Lock()
+
+    def resolve(self, host, port):
+        '''
+        Returns the first address to connect to for the host, resolving it if it is not cached or has expired
+
+        Arguments:
+            host : str = host name or address
+            port : int = port of the connection
+        '''
+        return self.resolve_all(host, port)[0]
+
+    def resolve_all(self, host, port):
+        '''
+        Returns all the addresses of the host in the order of the resolver, e.g. IPv6 ones first,
+        resolving them if they are not cached or have expired
+
+        Arguments:
+            host : str = host name or address
+            port : int = port of the connection
+        '''
+        key = (host, port)
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+        if entry is not None and entry[0] > self._clock():
+            return entry[1]
+
+        return self._lookup(key)
+
+    def invalidate(self, host, port):
+        '''
+        Forgets the address of the host, e.g. once connecting to it has failed
+        '''
+        with self._lock:
+            self._entries.pop((host, port), None)
+
+    def refresh(self):
+        '''
+        Resolves again all the hosts in the cache, so the lookups do not wait for the resolver once they expire.
+        The hosts failing to resolve are forgotten.
+        '''
+        with self._lock:
+            keys = list(self._entries)
+
+        for key in keys:
+            try:
+                self._lookup(key)
+            except socket.error:
+                self.invalidate(*key)
+
+    def _lookup(self, key):
+        host, port = key
+        addresses = []
+
+        for info in self._resolver(host, port, 0, socket.SOCK_STREAM):
+            if info[4][0] not in addresses:
+                addresses.append(info[4][0])
+
+        if not addresses:
+            raise socket.gaierror('No address found for {}'.format(host))
+
+        with self._lock:
+            self._entries[key] = (self._clock() + self._ttl, addresses)
+
+        return addresses
+
+
+class CachedDnsConnectionMixin(object):
+    '''
+    Mixin of urllib3 connections looking the host up in the DNS cache.
+    The addresses of the host are tried in turn, as urllib3 does with the ones of the resolver.
+    '''
+
+    def _new_conn(self):
+        dns_cache = _dns_cache
+
+        if dns_cache is None:
+            return super(CachedDnsConnectionMixin, self)._new_conn()
+
+        host = self._dns_host
+
+        try:
+            addresses = dns_cache.resolve_all(host, self.port)
+        except socket.error:
+            return super(CachedDnsConnectionMixin, self)._new_conn()  # reports the failure as urllib3 does
+
+        try:
+            for number, address in enumerate(addresses, 1):
+                # the host name is still used for the Host header, SNI and certificate checks
+                self._dns_host = address
+
+                try:
+                    return super(CachedDnsConnectionMixin, self)._new_conn()
+                except Exception:
+                    if number == len(addresses):
+                        dns_cache.invalidate(host, self.port)
+                        raise
+        finally:
+            self._dns_host = host
@@ -0,0 +1,249 @@
+'''
+The module contains urllib3 connection pools and connections timing the phases of the requests
+made by RestClient (see `eway.rapid.observer`).
+
+The connections look their host up in the DNS cache if there is one (see `.dns`). The ones a request
+or a response asked to close with `Connection: close` are closed instead of being kept in the pool,
+so the next request does not pick a socket the server is closing.
+
+The socket timeouts only bound every single read, so a body trickling in could keep a call
+long past its deadline. While the response of a call with a deadline is read, its connection is
+watched and shut down once the deadline has passed, which fails the read.
+
+The timings and the deadline of the call made by a thread are kept in thread local variables,
+the timings are only set while there are observers registered, so the requests made without
+observers only pay for reading them.
+'''
+
+import socket
+
+from heapq import heappop, heappush
+from itertools import count
+from threading import Condition, Thread, local
+
+try:
+    from time import monotonic
+except ImportError:
+    from time import time as monotonic
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from .dns import CachedDnsConnectionMixin
+
+
+_tracing = local()
+
+
+def get_timings():
+    'Returns the timings of the call made by the current thread, None if it is not traced'
+    return getattr(_tracing, 'timings', None)
+
+
+def set_timings(timings):
+    'Sets the timings of the call made by the current thread, None stops tracing'
+    _tracing.timings = timings
+
+
+def get_deadline():
+    'Returns the deadline of the call made by the current thread, None if it has none'
+    return getattr(_tracing, 'deadline', None)
+
+
+def set_deadline(deadline):
+    'Sets the deadline (`eway.rapid.deadline.Deadline`) of the call made by the current thread'
+    _tracing.deadline = deadline
+
+
+class _Watchdog(object):
+    '''
+    Thread shutting down the connections still reading a response once their deadlines have passed.
+    The thread is started with the first connection watched.
+    '''
+
+    def __init__(self):
+        self._condition = Condition()
+        self._watches = []
+        self._sequence = count()
+        self._thread = None
+
+    def watch(self, deadline, connection):
+        '''
+        Starts watching a connection, returns the watch to be cancelled once the response has been read
+        '''
+        watch = [monotonic() + deadline.remaining(), next(self._sequence), connection]
+
+        with self._condition:
+            heappush(self._watches, watch)
+
+            if self._thread is None:
+                self._thread = Thread(target=self._run, name='eway-rapid-watchdog')
+                self._thread.daemon = True
+                self._thread.start()
+
+            if self._watches[0] is watch:
+                self._condition.notify()
+
+        return watch
+
+    def cancel(self, watch):
+        '''
+        Stops watching a connection, which is not shut down after the call returns
+        '''
+        with self._condition:
+            watch[2] = None  # dropped from the heap when due
+
+    def _run(self):
+        with self._condition:
+            while True:
+                while not self._watches or self._watches[0][0] > monotonic():
+                    self._condition.wait(self._watches[0][0] - monotonic() if self._watches else None)
+
+                connection = heappop(self._watches)[2]
+
+                if connection is not None:
+                    connection._abort()
+
+
+_watchdog = _Watchdog()
+
+
+class _TimedConnectionMixin(object):
+    _connect_time = 0.0
+
+    _closing = False
+
+    _watch = None
+
+    def connect(self):
+        timings = get_timings()
+
+        if timings is None:
+            return super(_TimedConnectionMixin, self).connect()
+
+        started = monotonic()
+
+        try:
+            return super(_TimedConnectionMixin, self).connect()
+        finally:
+            self._connect_time = elapsed = monotonic() - started
+            timings.add('connection_acquire', elapsed)
+
+    def request(self, method, url, body=None, headers=None, *args, **kwargs):
+        self._closing = _asks_to_close(headers)
+        args = (method, url, body, headers if headers is not None else {}) + args
+        timings = get_timings()
+
+        if timings is None:
+            return super(_TimedConnectionMixin, self).request(*args, **kwargs)
+
+        self._connect_time = 0.0
+        started = monotonic()
+
+        try:
+            return super(_TimedConnectionMixin, self).request(*args, **kwargs)
+        finally:
+            # plain HTTP connections connect on sending, which is already accounted for
+            timings.add('request_send', monotonic() - started - self._connect_time)
+
+    def getresponse(self, *args, **kwargs):
+        deadline = get_deadline()
+
+        if deadline is not None:
+            self._watch = _watchdog.watch(deadline, self)  # the response may be read right away
+
+        timings = get_timings()
+
+        if timings is None:
+            response = super(_TimedConnectionMixin, self).getresponse(*args, **kwargs)
+        else:
+            started = monotonic()
+
+            try:
+                response = super(_TimedConnectionMixin, self).getresponse(*args, **kwargs)
+            finally:
+                timings.first_byte_at = finished = monotonic()
+                timings.add('first_byte', finished - started)
+
+        self._closing = self._closing or _asks_to_close(response.headers)
+
+        return response
+
+    def close(self):
+        self._release()
+        return super(_TimedConnectionMixin, self).close()
+
+    def _release(self):
+        'Stops watching the connection, once its response has been read'
+        watch, self._watch = self._watch, None
+
+        if watch is not None:
+            _watchdog.cancel(watch)
+
+    def _abort(self):
+        'Shuts the socket down, failing the read of the response past the deadline'
+        self._closing = True
+        sock = self.sock
+
+        if sock is not None:
+            try:
+                # bypasses the TLS layer, so the reading thread gets the end of the stream
+                socket.socket.shutdown(sock, socket.SHUT_RDWR)
+            except (socket.error, OSError):
+                pass
+
+
+class TimedHTTPConnection(_TimedConnectionMixin, CachedDnsConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(_TimedConnectionMixin, CachedDnsConnectionMixin, HTTPSConnection):
+    pass
+
+
+class _TimedConnectionPoolMixin(object):
+    def _get_conn(self, *args, **kwargs):
+        timings = get_timings()
+
+        if timings is None:
+            return super(_TimedConnectionPoolMixin, self)._get_conn(*args, **kwargs)
+
+        started = monotonic()
+
+        try:
+            return super(_TimedConnectionPoolMixin, self)._get_conn(*args, **kwargs)
+        finally:
+            timings.add('connection_acquire', monotonic() - started)
+
+    def _put_conn(self, conn):
+        if conn is not None:
+            conn._release()
+
+            if conn._closing:
+                conn.close()  # connects again when taken from the pool
+
+        return super(_TimedConnectionPoolMixin, self)._put_conn(conn)
+
+
+class TimedHTTPConnectionPool(_TimedConnectionPoolMixin, HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(_TimedConnectionPoolMixin, HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+def _asks_to_close(headers):
+    return bool(headers) and any(name.lower() == 'connection' and value.lower() == 'close' for name, value in headers.items())
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    '''
+    HTTPAdapter making the requests through the timed connection pools
+    '''
+
+    def init_poolmanager(self, *args, **kwargs):
+        super(TimedHTTPAdapter, self).init_poolmanager(*args, **kwargs)
+
+        self.poolmanager.pool_classes_by_scheme = {'http': TimedHTTPConnectionPool, 'https': TimedHTTPSConnectionPool}
@@ -0,0 +1,637 @@
+'''
+The module contains the transports RestClient sends its requests through.
+
+A transport takes an encoded request and returns the raw response, which the client then validates.
+Errors of the underlying HTTP library are reported as TransportError, so the client handles them
+the same way whatever the transport:
+ * RequestsTransport - `requests` session with pooled keep-alive connections (default)
+ * Urllib3Transport  - raw `urllib3` connection pools, skipping the `requests` layer
+ * HttpxTransport    - `httpx` client multiplexing the requests over HTTP/2 connections (requires httpx and h2)
+ * InProcessTransport - calls a Python callable instead of the network, e.g. `RapidStub.handle`
+
+    from eway.rapid.testing import RapidStub
+
+    client = RestClient('api-key', 'api-password', SandboxEndpoint(), transport=InProcessTransport(RapidStub().handle))
+'''
+
+from base64 import b64encode
+from logging import getLogger
+from threading import Lock
+
+try:
+    from time import monotonic
+except ImportError:
+    from time import time as monotonic
+
+try:
+    from urllib.parse import urlsplit
+except ImportError:  # python 2
+    from urlparse import urlsplit
+
+import requests
+from requests.exceptions import ChunkedEncodingError, ConnectionError, ConnectTimeout, Timeout
+from urllib3.exceptions import ConnectTimeoutError, MaxRetryError, NewConnectionError
+
+from .instrumentation import TimedHTTPAdapter, TimedHTTPConnectionPool, TimedHTTPSConnectionPool, set_deadline, set_timings
+
+
+class TransportError(Exception):
+    '''
+    Failure to exchange a request with the gateway
+
+    Attributes:
+        connect_phase : bool = whether the transport failed before the request was sent
+    '''
+
+    def __init__(self, message, connect_phase=False):
+        super(TransportError, self).__init__(message)
+        self.connect_phase = connect_phase
+
+
+class TransportTimeout(TransportError):
+    '''
+    Timeout of a connection or of a response
+    '''
+    pass
+
+
+class Response(object):
+    '''
+    Raw HTTP response
+
+    Attributes:
+        status_code : int        = HTTP status
+        headers     : {str: str} = HTTP headers
+        content     : bytes      = body
+    '''
+
+    __slots__ = ('status_code', 'headers', 'content')
+
+    def __init__(self, status_code, headers, content):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+
+class Transport(object):
+    '''
+    Abstract transport
+    '''
+
+    def set_auth(self, api_key, api_password):
+        '''
+        Sets the credentials sent with every request, called by the client
+        '''
+        raise TypeError('Method set_auth has not been implemented')
+
+    def request(self, method, url, body=None, headers=None, timeout=None, timings=None, deadline=None):
+        '''
+        Sends a request and returns the response, raises TransportError if it could not be exchanged
+
+        Arguments:
+            method   : str                    = HTTP method
+            url      : str                    = URL of the request
+            body     : bytes                  = body of the request
+            headers  : {str: str}             = HTTP headers of the request
+            timeout  : (float, float)         = connect and read timeouts in seconds
+            timings  : ..observer.CallTimings = timings to record the phases of the request in, may be None
+            deadline : ..deadline.Deadline    = deadline of the call the reading of the response is stopped at,
+                                                the client only passes it when the call has one
+
+        Returns:
+            object with `status_code`, `headers` and `content` attributes
+        '''
+        raise TypeError('Method request has not been implemented')
+
+    def warm_up(self, url, connections, timeout=None):
+        '''
+        Opens connections to the URL ahead of the requests and keeps them in the pool,
+        returns the number of the connections open. Transports without a pool of their own open none.
+
+        Arguments:
+            url         : str   = URL the requests are going to be sent to
+            connections : int   = number of connections to be open, limited by the size of the pool
+            timeout     : float = seconds to wait for a connection to be established
+        '''
+        return 0
+
+    def close(self):
+        '''
+        Releases the resources of the transport, which can still be used afterwards
+        '''
+        pass
+
+
+class RequestsTransport(Transport):
+    '''
+    Transport sending the requests through a `requests.Session` with a pooled HTTP adapter.
+    The pool is shared by all the threads using the transport.
+    '''
+
+    _session = None
+
+    def __init__(self, pool_connections=10, pool_maxsize=10, pool_block=False, keep_alive=True):
+        '''
+        Initializes the transport
+
+        Arguments:
+            pool_connections : int  = number of per-host connection pools to keep
+            pool_maxsize     : int  = maximum number of connections kept open to a single host
+            pool_block       : bool = whether to wait for a free connection when the pool is exhausted
+                                      instead of opening a throwaway one
+            keep_alive       : bool = whether connections are kept open between requests
+        '''
+        self._pool_connections = pool_connections
+        self._pool_maxsize = pool_maxsize
+        self._pool_block = pool_block
+        self._keep_alive = keep_alive
+        self._auth = None
+
+        self._session_lock = Lock()
+
+    def set_auth(self, api_key, api_password):
+        self._auth = (api_key, api_password)
+        self.close()
+        self._session = self._create_session()
+
+        return self
+
+    def close(self):
+        '''
+        Closes the session and all the pooled connections, the next request opens a new session
+        '''
+        with self._session_lock:
+            session, self._session = self._session, None
+
+        if session is not None:
+            session.close()
+
+    def _get_session(self):
+        session = self._session
+
+        if session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = self._create_session()
+
+                session = self._session
+
+        return session
+
+    def _create_session(self):
+        adapter = TimedHTTPAdapter(
+            pool_connections=self._pool_connections,
+            pool_maxsize=self._pool_maxsize,
+            pool_block=self._pool_block
+        )
+
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.auth = self._auth
+
+        if not self._keep_alive:
+            session.headers['Connection'] = 'close'
+
+        return session
+
+    def warm_up(self, url, connections, timeout=None):
+        session = self._get_session()
+        adapter = session.get_adapter(url)
+
+        # pools are kept per TLS settings, which must be the ones of the requests (including the environment)
+        settings = session.merge_environment_settings(url, {}, None, None, None)
+
+        if hasattr(adapter, 'get_connection_with_tls_context'):
+            request = requests.Request('GET', url).prepare()
+            pool = adapter.get_connection_with_tls_context(request, settings['verify'], settings['proxies'], settings['cert'])
+        else:
+            pool = adapter.get_connection(url, settings['proxies'])
+
+        return _warm_up_pool(pool, connections, timeout)
+
+    def request(self, method, url, body=None, headers=None, timeout=None, timings=None, deadline=None):
+        session = self._get_session()
+
+        try:
+            if timings is None and deadline is None:
+                return session.request(method, url, data=body, headers=headers, timeout=timeout)
+
+            set_timings(timings)
+            set_deadline(deadline)
+
+            try:
+                response = session.request(method, url, data=body, headers=headers, timeout=timeout)
+            finally:
+                set_timings(None)
+                set_deadline(None)
+        except Timeout as e:
+            raise TransportTimeout(str(e), isinstance(e, ConnectTimeout))
+        except ConnectionError as e:
+            raise TransportError(str(e), _is_connect_failure(e))
+        except ChunkedEncodingError as e:  # the body was cut short
+            raise TransportError(str(e))
+
+        _add_body_read(timings)
+
+        return response
+
+
+class Urllib3Transport(Transport):
+    '''
+    Transport sending the requests through `urllib3` connection pools, without the `requests` layer
+    '''
+
+    _pool_manager = None
+
+    def __init__(self, num_pools=10, maxsize=10, block=False, keep_alive=True):
+        '''
+        Initializes the transport
+
+        Arguments:
+            num_pools  : int  = number of per-host connection pools to keep
+            maxsize    : int  = maximum number of connections kept open to a single host
+            block      : bool = whether to wait for a free connection when the pool is exhausted
+                                instead of opening a throwaway one
+            keep_alive : bool = whether connections are kept open between requests
+        '''
+        self._num_pools = num_pools
+        self._maxsize = maxsize
+        self._block = block
+        self._headers = {} if keep_alive else {'Connection': 'close'}
+
+        self._lock = Lock()
+
+    def set_auth(self, api_key, api_password):
+        self._headers['Authorization'] = _basic_authorization(api_key, api_password)
+        return self
+
+    def close(self):
+        '''
+        Closes all the pooled connections, the next request opens new pools
+        '''
+        with self._lock:
+            pool_manager, self._pool_manager = self._pool_manager, None
+
+        if pool_manager is not None:
+            pool_manager.clear()
+
+    def _get_pool_manager(self):
+        pool_manager = self._pool_manager
+
+        if pool_manager is None:
+            with self._lock:
+                if self._pool_manager is None:
+                    self._pool_manager = self._create_pool_manager()
+
+                pool_manager = self._pool_manager
+
+        return pool_manager
+
+    def _create_pool_manager(self):
+        import urllib3
+
+        pool_manager = urllib3.PoolManager(num_pools=self._num_pools, maxsize=self._maxsize, block=self._block, retries=False)
+        pool_manager.pool_classes_by_scheme = {'http': TimedHTTPConnectionPool, 'https': TimedHTTPSConnectionPool}
+
+        return pool_manager
+
+    def warm_up(self, url, connections, timeout=None):
+        return _warm_up_pool(self._get_pool_manager().connection_from_url(url), connections, timeout)
+
+    def request(self, method, url, body=None, headers=None, timeout=None, timings=None, deadline=None):
+        import urllib3
+        from urllib3.exceptions import HTTPError
+
+        all_headers = dict(self._headers)
+        all_headers.update(headers or {})
+
+        if timeout is not None:
+            timeout = urllib3.Timeout(connect=timeout[0], read=timeout[1])
+
+        set_timings(timings)
+        set_deadline(deadline)
+
+        try:
+            response = self._get_pool_manager().urlopen(method, url, body=body, headers=all_headers, timeout=timeout, redirect=False)
+        except MaxRetryError as e:
+            raise _urllib3_error(e.reason or e)
+        except HTTPError as e:
+            raise _urllib3_error(e)
+        finally:
+            if timings is not None:
+                set_timings(None)
+
+            if deadline is not None:
+                set_deadline(None)
+
+        _add_body_read(timings)
+
+        return Response(response.status, response.headers, response.data)
+
+
+class HttpxTransport(Transport):
+    '''
+    Transport sending the requests through an `httpx` client.
+
+    With HTTP/2 many concurrent requests share a few multiplexed connections instead of taking
+    a connection each. The protocol is negotiated with the server, so the transport falls back
+    to HTTP/1.1 for servers not supporting HTTP/2, as well as when the `h2` package is not installed
+    (`pip install eway-rapid-python[http2]`).
+
+    The deadline of a call is checked between the chunks of the response body, so a body trickling in
+    is given up once the deadline has passed.
+    '''
+
+    _http = None
+
+    def __init__(self, http2=True, max_connections=100, max_keepalive_connections=20, keepalive_expiry=5.0, verify=True):
+        '''
+        Initializes the transport
+
+        Arguments:
+            http2                     : bool                  = whether to use HTTP/2 where the server supports it
+            max_connections           : int                   = maximum number of connections open at the same time
+            max_keepalive_connections : int                   = maximum number of idle connections kept in the pool
+            keepalive_expiry          : float                 = seconds an idle connection is kept open
+            verify                    : bool | ssl.SSLContext = SSL context verifying the certificates of the servers,
+                                                                e.g. one trusting the CA of a test server, the system CAs are trusted by default
+        '''
+        try:
+            import httpx
+        except ImportError:
+            raise ImportError('HttpxTransport requires httpx, install it with `pip install eway-rapid-python[http2]`')
+
+        self._http2 = http2 and is_http2_available()
+        self._max_connections = max_connections
+        self._max_keepalive_connections = max_keepalive_connections
+        self._keepalive_expiry = keepalive_expiry
+        self._verify = verify
+        self._auth = None
+
+        self._lock = Lock()
+
+    def set_auth(self, api_key, api_password):
+        self._auth = (api_key, api_password)
+        self.close()
+
+        return self
+
+    def close(self):
+        '''
+        Closes all the pooled connections, the next request opens a new pool
+        '''
+        with self._lock:
+            http, self._http = self._http, None
+
+        if http is not None:
+            http.close()
+
+    def _get_http(self):
+        http = self._http
+
+        if http is None:
+            with self._lock:
+                if self._http is None:
+                    self._http = self._create_http()
+
+                http = self._http
+
+        return http
+
+    def _create_http(self):
+        import httpx
+
+        limits = httpx.Limits(
+            max_connections=self._max_connections,
+            max_keepalive_connections=self._max_keepalive_connections,
+            keepalive_expiry=self._keepalive_expiry
+        )
+
+        return httpx.Client(auth=self._auth, limits=limits, http2=self._http2, verify=self._verify)
+
+    def request(self, method, url, body=None, headers=None, timeout=None, timings=None, deadline=None):
+        import httpx
+
+        kwargs = {}
+
+        if timeout is not None:
+            kwargs['timeout'] = httpx.Timeout(timeout[1], connect=timeout[0])
+
+        if timings is not None:
+            kwargs['extensions'] = {'trace': HttpxTrace(timings)}
+
+        try:
+            http = self._get_http()
+
+            if deadline is None:
+                response = http.request(method, url, content=body, headers=headers, **kwargs)
+            else:
+                # the timeouts of httpx bound every single read, the body is streamed to check the deadline in between
+                response = http.send(http.build_request(method, url, content=body, headers=headers, **kwargs), stream=True)
+                response.stream = _deadline_stream(response.stream, deadline)
+
+                try:
+                    response.read()
+                finally:
+                    response.close()
+        except httpx.TimeoutException as e:
+            raise TransportTimeout(str(e), isinstance(e, (httpx.ConnectTimeout, httpx.PoolTimeout)))
+        except (httpx.NetworkError, httpx.RemoteProtocolError) as e:
+            raise TransportError(str(e), isinstance(e, httpx.ConnectError))
+
+        _add_body_read(timings)
+
+        return response
+
+
+class HttpxTrace(object):
+    '''
+    Callback of the httpcore `trace` extension recording the phases of a request
+    '''
+
+    __slots__ = ('_timings', '_started', '_marks')
+
+    def __init__(self, timings):
+        self._timings = timings
+        self._started = monotonic()
+        self._marks = {}
+
+    def __call__(self, name, info):
+        self.record(name)
+
+    def record(self, name):
+        now = monotonic()
+        event = name.split('.', 1)[-1]  # e.g. http11.send_request_headers.started
+
+        if event == 'send_request_headers.started':
+            self._timings.add('connection_acquire', now - self._started)
+            self._marks['send'] = now
+
+        elif event == 'send_request_body.complete' and 'send' in self._marks:
+            self._timings.add('request_send', now - self._marks['send'])
+
+        elif event == 'receive_response_headers.started':
+            self._marks['first_byte'] = now
+
+        elif event == 'receive_response_headers.complete' and 'first_byte' in self._marks:
+            self._timings.add('first_byte', now - self._marks['first_byte'])
+            self._timings.first_byte_at = now
+
+
+class InProcessTransport(Transport):
+    '''
+    Transport handing the requests to a Python callable instead of sending them over the network,
+    which lets benchmarks and tests run the whole SDK stack without sockets.
+    The handler gets the path of the URL, e.g. `/AccessCode/{code}`.
+    '''
+
+    def __init__(self, handler):
+        '''
+        Initializes the transport
+
+        Arguments:
+            handler : callable(method, path, headers, body) -> (int, {str: str}, bytes) = handler of the requests
+                      returning the HTTP status, headers and body of the response, e.g. `RapidStub().handle`
+        '''
+        self._handler = handler
+        self._authorization = None
+
+    def set_auth(self, api_key, api_password):
+        self._authorization = _basic_authorization(api_key, api_password)
+        return self
+
+    def request(self, method, url, body=None, headers=None, timeout=None, timings=None, deadline=None):
+        all_headers = dict(headers) if headers else {}
+        all_headers['Authorization'] = self._authorization
+
+        if timings is None:
+            status, response_headers, content = self._handler(method, urlsplit(url).path, all_headers, body or b'')
+        else:
+            started = monotonic()
+            status, response_headers, content = self._handler(method, urlsplit(url).path, all_headers, body or b'')
+            timings.add('first_byte', monotonic() - started)
+
+        return Response(status, response_headers, content)
+
+
+def is_http2_available():
+    '''
+    Checks whether the `h2` package httpx needs for HTTP/2 is installed, logs a warning if it is not
+    '''
+    try:
+        import h2
+    except ImportError:
+        getLogger('eway.rapid.client').warning('HTTP/2 requires the h2 package, falling back to HTTP/1.1')
+        return False
+
+    return True
+
+
+def _warm_up_pool(pool, connections, timeout):
+    '''
+    Takes connections from a urllib3 pool, connects the ones which are not connected and returns them to the pool.
+    There is no public API for that, the internals used are the ones of the urllib3 versions setup.py allows.
+    '''
+    from concurrent.futures import ThreadPoolExecutor
+    from urllib3.exceptions import EmptyPoolError
+
+    taken = []
+
+    try:
+        for _ in range(min(connections, pool.pool.maxsize)):
+            taken.append(pool._get_conn(timeout=0))  # dropped connections are closed on the way out
+    except EmptyPoolError:
+        pass  # the other connections of a blocking pool are in use
+
+    def connect(connection):
+        if connection.sock is not None:
+            return True
+
+        connection.timeout = timeout
+
+        try:
+            connection.connect()
+        except Exception as e:
+            getLogger('eway.rapid.client').warning('Warming up a connection to {} failed: {}'.format(pool.host, e))
+            connection.close()
+            return False
+
+        return True
+
+    try:
+        if not taken:
+            return 0
+
+        with ThreadPoolExecutor(len(taken)) as executor:
+            return sum(executor.map(connect, taken))
+    finally:
+        for connection in taken:
+            pool._put_conn(connection)
+
+
+def _basic_authorization(api_key, api_password):
+    return 'Basic {}'.format(b64encode('{}:{}'.format(api_key, api_password).encode('utf-8')).decode('ascii'))
+
+
+_DeadlineStream = None
+
+
+def _deadline_stream(stream, deadline):
+    '''
+    Wraps the byte stream of an httpx response, so reading it raises `TransportTimeout` once the deadline has passed
+    '''
+    global _DeadlineStream
+
+    if _DeadlineStream is None:
+        import httpx
+
+        class _DeadlineStream(httpx.SyncByteStream):  # httpx only reads the body of sync responses from its sync streams
+            def __init__(self, stream, deadline):
+                self._stream = stream
+                self._deadline = deadline
+
+            def __iter__(self):
+                for chunk in self._stream:
+                    if self._deadline.expired():
+                        raise TransportTimeout('Deadline of the call exceeded while reading the response', False)
+
+                    yield chunk
+
+            def close(self):
+                self._stream.close()
+
+    return _DeadlineStream(stream, deadline)
+
+
+def _add_body_read(timings):
+    if timings is not None and timings.first_byte_at is not None:
+        timings.add('body_read', monotonic() - timings.first_byte_at)
+
+
+def _is_connect_failure(error):
+    '''
+    Checks whether a requests ConnectionError happened before the request was sent
+    '''
+    if isinstance(error, ConnectTimeout):
+        return True
+
+    reason = error.args[0] if error.args else None
+
+    if isinstance(reason, MaxRetryError):
+        reason = reason.reason
+
+    return isinstance(reason, (NewConnectionError, ConnectTimeoutError))
+
+
+def _urllib3_error(error):
+    from urllib3.exceptions import TimeoutError
+
+    # NewConnectionError is a ConnectTimeoutError as well
+    if isinstance(error, NewConnectionError):
+        return TransportError(str(error), True)
+
+    if isinstance(error, TimeoutError):
+        return TransportTimeout(str(error), isinstance(error, ConnectTimeoutError))
+
+    return TransportError(str(error))
@@ -0,0 +1,142 @@
+'''
+The module contains json codecs used to exchange payloads with Rapid API.
+
+A codec decodes response bodies straight from bytes and encodes request structs straight to bytes,
+so a payment round trip does not convert between str and bytes. The fastest json library installed
+is used by default:
+ * OrjsonCodec - orjson
+ * UjsonCodec - ujson (5.0 or newer)
+ * StdlibJsonCodec - json module of the standard library
+
+Another codec may be configured for the whole library:
+
+    from eway.rapid.codec import StdlibJsonCodec, set_codec
+    set_codec(StdlibJsonCodec())
+'''
+
+import json
+
+
+class JsonCodec(object):
+    '''
+    Abstract json codec
+    '''
+
+    name = None
+
+    def loads(self, data):
+        '''
+        Decodes a json document
+
+        Arguments:
+            data : bytes|str = json document, bytes must be utf-8 encoded
+        '''
+        raise TypeError('Method loads has not been implemented')
+
+    def dumps(self, struct):
+        '''
+        Encodes a struct into utf-8 encoded json
+
+        Arguments:
+            struct : .model.StructToJsonMixin = struct to be encoded
+        '''
+        raise TypeError('Method dumps has not been implemented')
+
+
+class StdlibJsonCodec(JsonCodec):
+    '''
+    Codec implemented with the json module of the standard library and the struct encoder of the library
+    '''
+
+    name = 'json'
+
+    def loads(self, data):
+        if isinstance(data, bytes) and not isinstance(data, str):
+            data = data.decode('utf-8')  # python < 3.6 cannot read bytes
+
+        return json.loads(data)
+
+    def dumps(self, struct):
+        return struct.to_json().encode('ascii')
+
+
+class OrjsonCodec(JsonCodec):
+    '''
+    Codec implemented with orjson
+    '''
+
+    name = 'orjson'
+
+    def __init__(self):
+        import orjson
+        from .model import json_default
+
+        self.loads = orjson.loads
+        self._dumps = orjson.dumps
+        self._default = json_default
+
+    def dumps(self, struct):
+        return self._dumps(struct, default=self._default)
+
+
+class UjsonCodec(JsonCodec):
+    '''
+    Codec implemented with ujson
+    '''
+
+    name = 'ujson'
+
+    def __init__(self):
+        import ujson
+        from .model import json_default
+
+        self.loads = ujson.loads
+        self._dumps = ujson.dumps
+        self._default = json_default
+
+    def dumps(self, struct):
+        return self._dumps(struct, default=self._default, ensure_ascii=False).encode('utf-8')
+
+
+def _detect_codec():
+    from .model import Option
+
+    for codec_class in (OrjsonCodec, UjsonCodec):
+        try:
+            codec = codec_class()
+            codec.dumps(Option(Value='probe'))  # ujson < 5.0 does not support `default`
+            return codec
+        except (ImportError, TypeError):
+            continue
+
+    return StdlibJsonCodec()
+
+
+def get_codec():
+    '''
+    Returns the codec used by the library
+    '''
+    global _codec
+
+    if _codec is None:
+        _codec = _detect_codec()
+
+    return _codec
+
+
+def set_codec(codec):
+    '''
+    Configures the codec to be used by the library
+
+    Arguments:
+        codec : JsonCodec = codec instance
+    '''
+    global _codec
+
+    if not isinstance(codec, JsonCodec):
+        raise TypeError('codec must be an instance of .codec.JsonCodec')
+
+    _codec = codec
+
+
+_codec = None
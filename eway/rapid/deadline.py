@@ -0,0 +1,67 @@
+'''
+The module contains the deadline of a call to Rapid API.
+
+A deadline covers the whole call: connecting, waiting for the response, retries and decoding.
+The payment methods accept it as a number of seconds:
+
+    payment_method.request_transaction_result(access_code, deadline=2.5)
+'''
+
+try:
+    from time import monotonic
+except ImportError:
+    from time import time as monotonic
+
+from .exception import RequestTimeoutError
+
+
+class Deadline(object):
+    '''
+    Point in time a call must be finished by
+    '''
+
+    __slots__ = ('_expires_at', '_clock')
+
+    def __init__(self, seconds, clock=monotonic):
+        '''
+        Starts counting the time down
+
+        Arguments:
+            seconds : float             = time the call may take
+            clock   : callable -> float = monotonic clock in seconds
+        '''
+        self._clock = clock
+        self._expires_at = clock() + seconds
+
+    @classmethod
+    def start(cls, deadline):
+        '''
+        Returns a Deadline for a number of seconds, passes through a Deadline or None
+        '''
+        if deadline is None or isinstance(deadline, Deadline):
+            return deadline
+
+        return cls(deadline)
+
+    def remaining(self):
+        'Returns the number of seconds left, negative if the deadline has passed'
+        return self._expires_at - self._clock()
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def check(self):
+        'Raises `RequestTimeoutError(\'ST003\')` if the deadline has passed'
+        if self.expired():
+            raise RequestTimeoutError('ST003')  # Deadline of the call exceeded
+
+    def timeout(self, limit=None):
+        '''
+        Returns the time an operation may take, which is the limit passed or less
+
+        Arguments:
+            limit : float = timeout of the operation in seconds, None for no limit
+        '''
+        remaining = max(0.0, self.remaining())
+
+        return remaining if limit is None else min(limit, remaining)
@@ -4,8 +4,17 @@ Two of them obviously are Production and Sandbox endpoints provided by eWAY. How
 it's possible to have here your own endpoing relating to a black-box exposing API and
 participating in integration tests, or even some middleware keeping credentials and
 any other sensible details of communicating with eWAY.
+
+FailoverEndpoint combines several endpoints reaching the same environment (e.g. a regional
+egress proxy and the direct route to eWAY), picking the healthiest one for every request.
 '''
 
+import random
+
+from threading import Lock
+
+from .exception import TRANSIENT_CODES
+
 
 class Endpoint(object):
     '''
@@ -17,14 +26,45 @@ class Endpoint(object):
 
     _url = None
 
+    _circuit_breaker = None
+
     def get_url(self):
         'Returns URL address of the Rapid API endpoind'
         return self._url
 
+    def get_circuit_breaker(self):
+        'Returns the circuit breaker guarding the endpoint, None if there is none'
+        return self._circuit_breaker
+
+    def set_circuit_breaker(self, circuit_breaker):
+        '''
+        Attaches a circuit breaker to the endpoint, all the clients using the endpoint share it
+
+        Arguments:
+            circuit_breaker : .circuit_breaker.CircuitBreaker = the breaker, None detaches the current one
+        '''
+        self._circuit_breaker = circuit_breaker
+        return self
+
     def is_sandbox(self):
         'Returns True if the endpoint is a sandbox'
         return False
 
+    def get_endpoints(self):
+        'Returns the endpoints a request may be sent to in order of preference'
+        return (self,)
+
+    def record(self, endpoint, seconds, error=None):
+        '''
+        Records the outcome of a request sent to one of the endpoints
+
+        Arguments:
+            endpoint : Endpoint            = endpoint the request was sent to
+            seconds  : float               = seconds the request took
+            error    : .exception.EwayError = error the request failed with, None if it succeeded
+        '''
+        pass
+
 
 class SandboxEndpoint(Endpoint):
     '''
@@ -72,3 +112,131 @@ class GenericEndpoint(Endpoint):
 
     def is_sandbox(self):
         return self._is_sandbox
+
+
+class FailoverEndpoint(Endpoint):
+    '''
+    Composite of endpoints reaching the same environment
+
+    Every request goes to the endpoint with the best score, which is the average latency of its recent
+    requests (an exponentially weighted moving average, failed requests counting as slow ones) inflated
+    by the rate of its recent failures, and fails over to the next endpoints on connection errors.
+    Endpoints with an open circuit breaker come last. A small share of requests goes to another endpoint
+    first, so the ones which failed get the chance to recover their score.
+
+    Usage:
+        endpoint = FailoverEndpoint([GenericEndpoint().set_url('https://eway-proxy.local/').set_is_sandbox(False), ProductionEndpoint()])
+    '''
+
+    FAILURE_CODES = TRANSIENT_CODES
+
+    def __init__(self, endpoints, alpha=0.2, failure_penalty=1.0, explore_ratio=0.05, seed=None):
+        '''
+        Initializes the endpoint
+
+        Arguments:
+            endpoints       : [Endpoint] = endpoints in order of preference while their scores are equal,
+                                           all of them must be either sandbox or production ones
+            alpha           : float      = weight of the latest request in the moving averages, from 0 to 1
+            failure_penalty : float      = seconds a failed request counts for in the average latency at least
+            explore_ratio   : float      = share of the requests sent to another endpoint than the best one first
+            seed            : int        = seed of the random generator to make the choices reproducible
+        '''
+        endpoints = tuple(endpoints)
+
+        if not endpoints:
+            raise ValueError('At least one endpoint is required')
+
+        if len(set(endpoint.is_sandbox() for endpoint in endpoints)) > 1:
+            raise ValueError('Sandbox and production endpoints must not be mixed')
+
+        self._endpoints = endpoints
+        self._alpha = alpha
+        self._failure_penalty = failure_penalty
+        self._explore_ratio = explore_ratio
+        self._random = random.Random(seed)
+        self._stats = dict((id(endpoint), _EndpointStats()) for endpoint in endpoints)
+        self._lock = Lock()
+
+    def get_url(self):
+        'Returns URL address of the best endpoint'
+        return self._ranked()[0].get_url()
+
+    def is_sandbox(self):
+        sandbox = set(endpoint.is_sandbox() for endpoint in self._endpoints)
+
+        if len(sandbox) > 1:  # one of the endpoints has been reconfigured
+            raise ValueError('Sandbox and production endpoints must not be mixed')
+
+        return sandbox.pop()
+
+    def get_endpoints(self):
+        endpoints = self._ranked()
+
+        if len(endpoints) > 1 and self._random.random() < self._explore_ratio:
+            explored = self._random.randrange(1, len(endpoints))
+            endpoints.insert(0, endpoints.pop(explored))
+
+        return endpoints
+
+    def record(self, endpoint, seconds, error=None):
+        stats = self._stats.get(id(endpoint))
+
+        if stats is None:
+            return
+
+        failed = error is not None
+        alpha = self._alpha
+
+        if failed and getattr(error, '_code', None) not in self.FAILURE_CODES:
+            return  # e.g. an authentication error, which does not depend on the route
+
+        if failed:
+            seconds = max(seconds, self._failure_penalty)
+
+        with self._lock:
+            stats.requests += 1
+            stats.latency = seconds if stats.latency is None else (1 - alpha) * stats.latency + alpha * seconds
+            stats.error_rate = (1 - alpha) * stats.error_rate + alpha * failed
+
+    def get_stats(self):
+        '''
+        Returns the statistics of every endpoint: url, requests, latency (average seconds, None before
+        the first request), error_rate and score
+        '''
+        with self._lock:
+            return [
+                {
+                    'url': endpoint.get_url(),
+                    'requests': self._stats[id(endpoint)].requests,
+                    'latency': self._stats[id(endpoint)].latency,
+                    'error_rate': self._stats[id(endpoint)].error_rate,
+                    'score': self._stats[id(endpoint)].score()
+                }
+                for endpoint in self._endpoints
+            ]
+
+    def _ranked(self):
+        stats = self._stats
+
+        def rank(item):
+            position, endpoint = item
+            circuit_breaker = endpoint.get_circuit_breaker()
+            circuit_open = circuit_breaker is not None and circuit_breaker.is_open()
+
+            return circuit_open, stats[id(endpoint)].score(), position
+
+        return [endpoint for position, endpoint in sorted(enumerate(self._endpoints), key=rank)]
+
+
+class _EndpointStats(object):
+    __slots__ = ('requests', 'latency', 'error_rate')
+
+    def __init__(self):
+        self.requests = 0
+        self.latency = None
+        self.error_rate = 0.0
+
+    def score(self):
+        # expected time to a successful response, endpoints without requests yet are tried first
+        return (self.latency or 0.0) / max(0.01, 1.0 - self.error_rate)
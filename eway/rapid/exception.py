@@ -8,6 +8,9 @@ Rapid API specification in the following way:
     * TransactionError - Transpaction Response Messages
     * FraudError - Beagle Fraud Alerts and Beagle Fraud Alerts (Enterprise) Fraud Response Messages
     * SysError - System Response Codes
+Errors not defined by the specification:
+    * UndocumentedError - errors returned by Rapid API without documentation
+    * RequestTimeoutError - timeouts and deadlines of the calls made by the library
 '''
 
 
@@ -44,7 +47,12 @@ class EwayError(Exception):
         super(EwayError, self).__init__(*args, **kwargs)
 
         self._code = code
-        self._message = '{} / {}'.format(code, message).encode('utf-8')
+
+        entry = _CODE_INDEX.get(code)
+        if entry is not None and entry[1] == message:
+            self._message = entry[2]
+        else:
+            self._message = '{} / {}'.format(code, message).encode('utf-8')
 
     def __bytes__(self):
         return self._message
@@ -83,29 +91,9 @@ class EwayError(Exception):
             **kwargs : {str: ?} = additional arguments to be passed in an exception constructor
         '''
 
-        response_error = ResponseError.from_code(code)
-        if response_error:
-            return response_error
-
-        validation_error = ValidationError.from_code(code, *args, **kwargs)
-        if validation_error:
-            return validation_error
-
-        transaction_error = TransactionError.from_code(code, *args, **kwargs)
-        if transaction_error:
-            return transaction_error
-
-        fraud_error = FraudError.from_code(code)
-        if fraud_error:
-            return fraud_error
-
-        system_error = SysError.from_code(code)
-        if system_error:
-            return system_error
-
-        undocumented_error = UndocumentedError.from_code(code)
-        if undocumented_error:
-            return undocumented_error
+        entry = _CODE_INDEX.get(code)
+        if entry:
+            return entry[0](code, *args, **kwargs)
 
     @classmethod
     def from_message(cls, message, *args, **kwargs):
@@ -133,13 +121,9 @@ class EwayError(Exception):
             **kwargs : {str: ?} = additional arguments to be passed in an exception constructor
         '''
 
-        # Unlike within `lookup_error_by_code`, `UndocumentedError` comes first
-        # as in the context of searching by message, it is the most likely candidate.
-        error_classes = (UndocumentedError, ResponseError, ValidationError, TransactionError, FraudError, SysError)
-        for error_class in error_classes:
-            err = error_class.from_message(message, *args, **kwargs)
-            if err:
-                return err
+        entry = _MESSAGE_INDEX.get(message)
+        if entry:
+            return entry[0](entry[1], *args, **kwargs)
 
 
 class ResponseError(EwayError):
@@ -159,10 +143,7 @@ class ResponseError(EwayError):
     }
 
     def __init__(self, code, *args, **kwargs):
-        if code not in ResponseError.INDEX.keys():
-            raise ValueError('Invalid error code: {}'.format(code))
-
-        super(ResponseError, self).__init__(code, ResponseError.INDEX[code], *args, **kwargs)
+        super(ResponseError, self).__init__(code, _indexed_message(ResponseError, code), *args, **kwargs)
 
 
 class ValidationError(EwayError):
@@ -286,10 +267,7 @@ class ValidationError(EwayError):
     }
 
     def __init__(self, code, *args, **kwargs):
-        if code not in ValidationError.INDEX.keys():
-            raise ValueError('Invalid error code: {}'.format(code))
-
-        super(ValidationError, self).__init__(code, ValidationError.INDEX[code], *args, **kwargs)
+        super(ValidationError, self).__init__(code, _indexed_message(ValidationError, code), *args, **kwargs)
 
 
 class SysError(EwayError):
@@ -310,10 +288,7 @@ class SysError(EwayError):
     }
 
     def __init__(self, code, *args, **kwargs):
-        if code not in SysError.INDEX.keys():
-            raise ValueError('Invalid error code: {}'.format(code))
-
-        super(SysError, self).__init__(code, SysError.INDEX[code], *args, **kwargs)
+        super(SysError, self).__init__(code, _indexed_message(SysError, code), *args, **kwargs)
 
 
 class FraudError(EwayError):
@@ -368,10 +343,7 @@ class FraudError(EwayError):
     }
 
     def __init__(self, code, *args, **kwargs):
-        if code not in FraudError.INDEX.keys():
-            raise ValueError('Invalid error code: {}'.format(code))
-
-        super(FraudError, self).__init__(code, FraudError.INDEX[code], *args, **kwargs)
+        super(FraudError, self).__init__(code, _indexed_message(FraudError, code), *args, **kwargs)
 
 
 class TransactionError(EwayError):
@@ -448,10 +420,7 @@ class TransactionError(EwayError):
     }
 
     def __init__(self, code, *args, **kwargs):
-        if code not in TransactionError.INDEX.keys():
-            raise ValueError('Invalid error code: {}'.format(code))
-
-        super(TransactionError, self).__init__(code, TransactionError.INDEX[code], *args, **kwargs)
+        super(TransactionError, self).__init__(code, _indexed_message(TransactionError, code), *args, **kwargs)
 
 
 class UndocumentedError(EwayError):
@@ -467,7 +436,69 @@ class UndocumentedError(EwayError):
     }
 
     def __init__(self, code, *args, **kwargs):
-        if code not in UndocumentedError.INDEX.keys():
-            raise ValueError('Invalid error code: {}'.format(code))
+        super(UndocumentedError, self).__init__(code, _indexed_message(UndocumentedError, code), *args, **kwargs)
+
+
+class RequestTimeoutError(EwayError):
+    '''
+    Represents calls to Rapid API taking longer than the client allows
+
+    Note: Error codes are prefixed with `ST` for the same reason as the ones of UndocumentedError.
+    '''
+
+    INDEX = {
+        'ST001': 'Timed out connecting to Rapid gateway',
+        'ST002': 'Timed out waiting for Rapid gateway response',
+        'ST003': 'Deadline of the call exceeded'
+    }
+
+    def __init__(self, code, *args, **kwargs):
+        super(RequestTimeoutError, self).__init__(code, _indexed_message(RequestTimeoutError, code), *args, **kwargs)
+
+
+# Codes of the errors telling that the gateway is unhealthy or unreachable, which are worth retrying
+# and count against the health of an endpoint, unlike the errors caused by the requests themselves
+TRANSIENT_CODES = frozenset(('S9992', 'S9996', 'ST001', 'ST002'))
+
+
+def _indexed_message(cls, code):
+    entry = _CODE_INDEX.get(code)
+
+    if entry is None or entry[0] is not cls:
+        raise ValueError('Invalid error code: {}'.format(code))
+
+    return entry[1]
+
+
+def _build_indexes(classes_by_code, classes_by_message):
+    '''
+    Merges the indexes of the error classes into
+        - code -> (class, message, encoded message) index
+        - message -> (class, code) index
+
+    Arguments:
+        classes_by_code    : [class] = error classes in order of precedence when looking up by code
+        classes_by_message : [class] = error classes in order of precedence when looking up by message
+    '''
+    code_index = {}
+    message_index = {}
+
+    for cls in reversed(classes_by_code):
+        for code, message in cls.INDEX.items():
+            code_index[code] = (cls, message, '{} / {}'.format(code, message).encode('utf-8'))
+
+    for cls in reversed(classes_by_message):
+        cls.REVERSE_INDEX = {msg: code for code, msg in cls.INDEX.items()}
+
+        for message, code in cls.REVERSE_INDEX.items():
+            message_index[message] = (cls, code)
+
+    return code_index, message_index
+
 
-        super(UndocumentedError, self).__init__(code, UndocumentedError.INDEX[code], *args, **kwargs)
\ No newline at end of file
+_CODE_INDEX, _MESSAGE_INDEX = _build_indexes(
+    (ResponseError, ValidationError, TransactionError, FraudError, SysError, UndocumentedError, RequestTimeoutError),
+    # Unlike within `lookup_error_by_code`, `UndocumentedError` comes first
+    # as in the context of searching by message, it is the most likely candidate.
+    (UndocumentedError, ResponseError, ValidationError, TransactionError, FraudError, SysError, RequestTimeoutError)
+)
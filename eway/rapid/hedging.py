@@ -0,0 +1,153 @@
+'''
+The module contains the hedging policy used by the clients to cut the tail latency of reading
+transaction results.
+
+Most responses of the gateway come back quickly, but a few take many times the median. Reading
+a transaction result (GET AccessCode/{code}) is safe to repeat, so once the request has been
+outstanding for longer than a percentile of the recent latencies, a second (hedge) request is sent
+and whichever response comes first is used:
+
+    policy = HedgingPolicy(percentile=0.95)
+    client = RestClient('api-key', 'api-password', ProductionEndpoint(), hedging_policy=policy)
+    ...
+    policy.get_stats()  # how often the calls were hedged and the hedges won
+
+Creating access codes is never hedged. The hedges are limited by a budget (see `.retry.RetryBudget`)
+to a share of the calls, so a slow gateway does not get twice the load.
+'''
+
+from collections import deque
+from threading import Lock
+
+from .retry import RetryBudget
+
+
+class HedgingPolicy(object):
+    '''
+    Decides when a call is hedged and keeps the statistics of the hedges
+
+    A policy owns its latency samples and its budget, so every client should be given its own policy instance.
+    '''
+
+    _percentile = 0.95
+
+    _min_delay = 0.01
+
+    _min_samples = 20
+
+    _budget = None
+
+    _latencies = None
+
+    _lock = None
+
+    def __init__(self, percentile=0.95, max_hedge_ratio=0.1, min_delay=0.01, min_samples=20, max_samples=200, budget=None):
+        '''
+        Initializes the policy
+
+        Arguments:
+            percentile      : float              = percentile of the recent latencies after which the hedge is sent
+            max_hedge_ratio : float              = maximum share of the calls which may be hedged
+            min_delay       : float              = minimum delay before the hedge in seconds
+            min_samples     : int                = number of latencies required before the calls are hedged
+            max_samples     : int                = number of the most recent latencies the percentile is taken of
+            budget          : .retry.RetryBudget = default value is a budget of `max_hedge_ratio` without a reserve
+        '''
+        if not 0 < percentile < 1:
+            raise ValueError('percentile must be within (0, 1)')
+
+        if min_delay < 0:
+            raise ValueError('min_delay must not be negative')
+
+        if not 0 < min_samples <= max_samples:
+            raise ValueError('samples must satisfy 0 < min_samples <= max_samples')
+
+        self._percentile = percentile
+        self._min_delay = min_delay
+        self._min_samples = min_samples
+        self._budget = budget if budget is not None else RetryBudget(ratio=max_hedge_ratio, reserve=0, capacity=10)
+        self._latencies = deque(maxlen=max_samples)
+        self._lock = Lock()
+
+        self._calls = 0
+        self._hedges = 0
+        self._hedge_wins = 0
+
+    def get_budget(self):
+        return self._budget
+
+    def start(self):
+        '''
+        Records a new call, must be called once before its first request.
+        Returns the delay before the hedge in seconds, None if the call must not be hedged yet.
+        '''
+        self._budget.deposit()
+
+        with self._lock:
+            self._calls += 1
+
+            if len(self._latencies) < self._min_samples:
+                return None
+
+            latencies = sorted(self._latencies)
+
+        return max(self._min_delay, latencies[min(len(latencies) - 1, int(self._percentile * len(latencies)))])
+
+    def can_hedge(self):
+        '''
+        Checks whether the budget would let a call be hedged now, without taking a token
+        '''
+        return self._budget.get_tokens() >= 1
+
+    def hedge(self):
+        '''
+        Checks whether the hedge of a call still outstanding may be sent and takes a token from the budget if so
+        '''
+        if not self._budget.withdraw():
+            return False
+
+        with self._lock:
+            self._hedges += 1
+
+        return True
+
+    def record_latency(self, seconds):
+        '''
+        Records the latency of a successful request, hedges included
+        '''
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def record_win(self, hedge):
+        '''
+        Records which request of a hedged call returned first
+
+        Arguments:
+            hedge : bool = whether the response of the hedge was used
+        '''
+        if hedge:
+            with self._lock:
+                self._hedge_wins += 1
+
+    def get_stats(self):
+        '''
+        Returns a snapshot of the statistics of the hedges:
+            calls      : int   = number of the calls made
+            hedges     : int   = number of the hedges sent
+            hedge_wins : int   = number of the hedges which returned before the first request
+            hedge_rate : float = share of the calls hedged
+            win_rate   : float = share of the hedges which won
+            samples    : int   = number of the latencies the delay is taken of
+        '''
+        with self._lock:
+            calls, hedges, wins = self._calls, self._hedges, self._hedge_wins
+            samples = len(self._latencies)
+
+        return {
+            'calls': calls,
+            'hedges': hedges,
+            'hedge_wins': wins,
+            'hedge_rate': float(hedges) / calls if calls else 0.0,
+            'win_rate': float(wins) / hedges if hedges else 0.0,
+            'samples': samples
+        }
@@ -4,11 +4,14 @@ and representing data payload to exchange it with eWAY.
 '''
 
 from enum import Enum
+from types import FunctionType
 
 import inspect
 import json
 import six
 
+from .codec import get_codec
+
 
 class StructInitMixin(object):
     '''
@@ -23,58 +26,227 @@ class StructInitMixin(object):
             ignore_unknown : bool     = False by default. Whether to ignore all the unknown keys instead of raising an exception
             **kwargs       : {str: ?} = key-value pairs representing attributes of the object and values to be assigned
         '''
-        for key in kwargs:
-            if key.startswith('__') and key.endswith('__'):
-                raise AttributeError('Cannot assign meta field of the object: {}.{}'.format(self.__class__.__name__, key))
+        fields = _struct_fields(self.__class__)
 
-            if key not in self.__class__.__dict__.keys():
-                if ignore_unknown:
+        for key in kwargs:
+            if key not in fields:
+                if _check_unknown_field(self.__class__, key, ignore_unknown):
                     continue
-                raise AttributeError('Cannot assign non-existing field of the object: {}.{}'.format(self.__class__.__name__, key))
 
-            self.__dict__[key] = kwargs[key]
+            setattr(self, key, kwargs[key])
+
+
+def _struct_fields(cls):
+    '''
+    Returns a set of the attribute names which may be assigned to objects of the class
+    '''
+    try:
+        return _FIELDS[cls]
+    except KeyError:
+        fields = frozenset(key for key in cls.__dict__ if not (key.startswith('__') and key.endswith('__')))
+        _FIELDS[cls] = fields
+        return fields
+
+
+def _check_unknown_field(cls, key, ignore_unknown):
+    '''
+    Raises AttributeError for a key which is not a field of the class, unless it is to be ignored.
+    Returns True if the key is to be skipped.
+    '''
+    if key.startswith('__') and key.endswith('__'):
+        raise AttributeError('Cannot assign meta field of the object: {}.{}'.format(cls.__name__, key))
+
+    if ignore_unknown:
+        return True
+
+    raise AttributeError('Cannot assign non-existing field of the object: {}.{}'.format(cls.__name__, key))
+
+
+_FIELDS = {}
 
 
 class StructToJsonMixin(object):
     '''
     Mixin implements a method `to_json` which is to be used for serializing objects of the class
     '''
-    def to_json(self, **kwargs):
+    def to_json(self, default=None):
         '''
         Generates a json string from the object
 
+        The json is written in a single pass over the object tree, nested structs are not turned
+        into intermediate dictionaries. Circular references are detected by object identity.
+
         Arguments:
-            circle : [?] = not to be used explicitly. keeps a list of objects iterated by the function to avoid circular refs
+            default : callable = (optional) called for the values which cannot be encoded natively,
+                                 should return an encodable replacement or raise TypeError
         '''
-        if 'circle' not in kwargs:
-            circle = []
-        else:
-            circle = kwargs['circle']
+        chunks = []
+        _JsonWriter(chunks.append, default).write_struct(self)
+        return ''.join(chunks)
+
+    def _struct_values(self):
+        '''
+        Returns a dictionary of the fields assigned to the object
+        '''
+        return self.__dict__
+
+
+def json_default(value):
+    '''
+    Converts a struct into a dictionary of its fields (or an enum into its value).
+    To be used as the `default` hook of third-party json encoders, e.g. `orjson.dumps(request, default=json_default)`
+    '''
+    if isinstance(value, Enum):
+        return value.value
+
+    if isinstance(value, StructToJsonMixin):
+        return value._struct_values()
 
-        if self in circle:
+    if type(value) is _Pending:
+        return value.raw
+
+    raise TypeError('Object of type {} is not JSON serializable'.format(type(value).__name__))
+
+
+class _JsonWriter(object):
+    '''
+    Writes json chunks of structs and the values they contain
+    '''
+
+    def __init__(self, write, default=None):
+        self._write = write
+        self._default = default
+        self._path = set()
+
+    def _enter(self, value):
+        marker = id(value)
+
+        if marker in self._path:
             try:
                 raise RecursionError('Circular reference detected')
             except NameError:
                 raise RuntimeError('Circular reference detected')  # python < 3.5
 
-        circle.append(self)
+        self._path.add(marker)
+        return marker
+
+    def write_struct(self, struct):
+        if isinstance(struct, Enum):
+            return self.write_value(struct.value)
+
+        write = self._write
+        marker = self._enter(struct)
+        values = struct._struct_values()
+        separator = '{'
+
+        for key in values:
+            write(separator)
+            write(_encode_string(key))
+            write(': ')
+            self.write_value(values[key])
+            separator = ', '
+
+        write('}' if separator == ', ' else '{}')
+        self._path.discard(marker)
+
+    def write_value(self, value):
+        encode = _SCALAR_ENCODERS.get(type(value))
+
+        if encode is not None:
+            return self._write(encode(value))
+
+        if type(value) is _Pending:
+            return self.write_value(value.raw)
+
+        if isinstance(value, StructToJsonMixin):
+            return self.write_struct(value)
+
+        if isinstance(value, (list, tuple)):
+            return self._write_list(value)
+
+        if isinstance(value, dict):
+            return self._write_dict(value)
+
+        if isinstance(value, six.string_types):
+            return self._write(_encode_string(value))
+
+        if isinstance(value, bool):
+            return self._write('true' if value else 'false')
+
+        if isinstance(value, six.integer_types):
+            return self._write(int.__repr__(int(value)))
+
+        if isinstance(value, float):
+            return self._write(_encode_float(value))
+
+        if self._default is None:
+            raise TypeError('Object of type {} is not JSON serializable'.format(type(value).__name__))
+
+        marker = self._enter(value)
+        self.write_value(self._default(value))
+        self._path.discard(marker)
 
-        _dict = {}
+    def _write_list(self, items):
+        write = self._write
+        marker = self._enter(items)
+        separator = '['
 
-        for key in self.__dict__:
-            if isinstance(self.__dict__[key], StructToJsonMixin):
-                _dict[key] = self.__dict__[key].to_json(circle=circle, noharm=True)
-            elif isinstance(self.__dict__[key], list):
-                _dict[key] = []
-                for item in self.__dict__[key]:
-                    if isinstance(item, StructToJsonMixin):
-                        _dict[key].append(item.to_json(circle=circle, noharm=True))
-                    else:
-                        _dict[key].append(item)
-            else:
-                _dict[key] = self.__dict__[key]
+        for item in items:
+            write(separator)
+            self.write_value(item)
+            separator = ', '
 
-        return _dict if 'noharm' in kwargs else json.dumps(_dict)
+        write(']' if separator == ', ' else '[]')
+        self._path.discard(marker)
+
+    def _write_dict(self, items):
+        write = self._write
+        marker = self._enter(items)
+        separator = '{'
+
+        for key in items:
+            write(separator)
+            write(_encode_string(key if isinstance(key, six.string_types) else _encode_key(key)))
+            write(': ')
+            self.write_value(items[key])
+            separator = ', '
+
+        write('}' if separator == ', ' else '{}')
+        self._path.discard(marker)
+
+
+def _encode_float(value):
+    if value != value:
+        return 'NaN'
+
+    if value == float('inf'):
+        return 'Infinity'
+
+    if value == -float('inf'):
+        return '-Infinity'
+
+    return float.__repr__(value)
+
+
+def _encode_key(key):
+    if key is None or isinstance(key, (bool, float) + six.integer_types):
+        return _SCALAR_ENCODERS.get(type(key), str)(key)
+
+    raise TypeError('keys must be str, int, float, bool or None, not {}'.format(type(key).__name__))
+
+
+_encode_string = json.encoder.encode_basestring_ascii
+
+_SCALAR_ENCODERS = {
+    type(None): lambda value: 'null',
+    bool: lambda value: 'true' if value else 'false',
+    int: int.__repr__,
+    float: _encode_float,
+    six.text_type: _encode_string
+}
+
+if str is not six.text_type:
+    _SCALAR_ENCODERS[str] = _encode_string  # python < 3
 
 
 class StructFromJsonMixin(StructInitMixin):
@@ -82,52 +254,251 @@ class StructFromJsonMixin(StructInitMixin):
     Mixin implements a method `from_json` which is to be used for unserializing objects of the class
     '''
     @classmethod
-    def from_json(cls, json_string, ignore_unknown=False, **kwargs):
+    def from_json(cls, json_string, ignore_unknown=False, lazy=False, **kwargs):
         '''
         Method to unserialize json-encoded objects (recursively)
 
         Arguments:
-            json_string    : str      = json representation of an object of the class
-            ignore_unknown : bool     = False by default. Whether to ignore all the unknown keys instead of raising an exception
-            **kwargs       : {str: ?} = list of key-value pairs where keys stay for attributes and values contain either:
-                                            - a decoder class also implementing StructFromJsonMixin
-                                            - list with a single decoder class, showing that the argument must be a list of values
-                                            - an instance of a class or a scalar value to be used as a default value
+            json_string    : str|bytes = json representation of an object of the class, bytes must be utf-8 encoded
+            ignore_unknown : bool      = False by default. Whether to ignore all the unknown keys instead of raising an exception
+            lazy           : bool      = False by default. Whether nested structs of the fields declared as `LazyField`
+                                         are kept as decoded json until the first access to the field
+            **kwargs       : {str: ?}  = list of key-value pairs where keys stay for attributes and values contain either:
+                                             - a decoder class also implementing StructFromJsonMixin
+                                             - list with a single decoder class, showing that the argument must be a list of values
+                                             - an instance of a class or a scalar value to be used as a default value
         '''
-        if isinstance(json_string, six.string_types):
-            _dict = json.loads(json_string)
+        if isinstance(json_string, (six.string_types, six.binary_type)):
+            _dict = get_codec().loads(json_string)
         elif isinstance(json_string, dict):
             _dict = json_string
         else:
             raise TypeError('The source must be either string or dictionary')
 
-        for key in _dict:
-            if key in kwargs:
-                if inspect.isclass(kwargs[key]) and issubclass(kwargs[key], StructFromJsonMixin):
-                    _dict[key] = kwargs[key].from_json(_dict[key], ignore_unknown)
+        return cls.compile_decoder(ignore_unknown, lazy, **kwargs)(_dict)
 
-                elif isinstance(kwargs[key], list) \
-                        and len(kwargs[key]) \
-                        and inspect.isclass(kwargs[key][0]) \
-                        and issubclass(kwargs[key][0], StructFromJsonMixin) \
-                        and isinstance(_dict[key], list):
-                    for idx in range(0, len(_dict[key])):
-                        _dict[key][idx] = kwargs[key][0].from_json(_dict[key][idx], ignore_unknown)
+    @classmethod
+    def compile_decoder(cls, ignore_unknown=False, lazy=False, **kwargs):
+        '''
+        Returns a function building objects of the class from decoded json dictionaries.
+
+        The function is specialised for the class and the decoders passed: the fields, nested decoders
+        and default values are resolved once and cached, so decoding does not inspect the classes again.
+
+        Arguments are the same as for `from_json`
+        '''
+        key = _decoder_key(cls, ignore_unknown, lazy, kwargs)
+
+        if key is None:
+            return _compile_decoder(cls, ignore_unknown, lazy, kwargs)
+
+        try:
+            return _DECODERS[key]
+        except KeyError:
+            decoder = _compile_decoder(cls, ignore_unknown, lazy, kwargs)
+            _DECODERS[key] = decoder
+            return decoder
+
+
+def _decoder_key(cls, ignore_unknown, lazy, specs):
+    '''
+    Returns a hashable key identifying a decoder or None if the specs contain unhashable default values
+    '''
+    items = []
+
+    for name, spec in specs.items():
+        if isinstance(spec, list):
+            if len(spec) != 1 or not inspect.isclass(spec[0]):
+                return None
+            spec = (list, spec[0])
+
+        items.append((name, spec))
+
+    key = (cls, bool(ignore_unknown), bool(lazy), frozenset(items))
+
+    try:
+        hash(key)
+    except TypeError:
+        return None
+
+    return key
+
+
+def _is_struct_class(spec):
+    return inspect.isclass(spec) and issubclass(spec, StructFromJsonMixin)
+
+
+def _nested_decoder(decoder_class, ignore_unknown):
+    '''
+    Returns a function decoding a nested value with the class passed.
+    Classes relying on the default `from_json` are decoded with their compiled decoder straight away,
+    enums are decoded with a single lookup.
+    '''
+    if issubclass(decoder_class, StructEnum):
+        return _nested_enum_decoder(decoder_class)
+
+    if getattr(decoder_class.from_json, '__func__', None) is not StructFromJsonMixin.from_json.__func__:
+        return lambda value: None if value is None else decoder_class.from_json(value, ignore_unknown)
+
+    decode = decoder_class.compile_decoder(ignore_unknown)
+
+    def decode_nested(value):
+        if type(value) is dict:
+            return decode(value)
+
+        if value is None:
+            return None
+
+        return decoder_class.from_json(value, ignore_unknown)
+
+    return decode_nested
+
+
+def _nested_enum_decoder(decoder_class):
+    index = _enum_index(decoder_class)
+
+    def decode_enum(value):
+        try:
+            return index[value]
+        except (KeyError, TypeError):
+            return None if value is None else decoder_class.from_json(value)
+
+    return decode_enum
 
-        for key in kwargs:
-            if key in _dict:
-                continue
 
-            if not inspect.isclass(kwargs[key]):
-                _dict[key] = kwargs[key]
+def _nested_list_decoder(decoder_class, ignore_unknown):
+    decode = _nested_decoder(decoder_class, ignore_unknown)
+    return lambda value: [decode(item) for item in value] if isinstance(value, list) else value
 
-            elif isinstance(kwargs[key], list) and (not len(kwargs[key]) or len(kwargs[key]) > 1 or (len(kwargs[key] == 1) and not inspect.isclass(kwargs[key][0]))):
-                _dict[key] = kwargs[key]
+
+def _compile_decoder(cls, ignore_unknown, lazy, specs):
+    fields = _struct_fields(cls)
+    converters = []
+    defaults = []
+
+    if cls in _COMPACT_ORIGINS:
+        # compact structs consist of compact structs
+        specs = dict((key, _compact_spec(spec)) for key, spec in specs.items())
+
+    for key, spec in specs.items():
+        if _is_struct_class(spec):
+            converter = _nested_decoder(spec, ignore_unknown)
+
+        elif isinstance(spec, list) and len(spec) == 1 and _is_struct_class(spec[0]):
+            converter = _nested_list_decoder(spec[0], ignore_unknown)
+
+        else:
+            if not inspect.isclass(spec):
+                defaults.append((key, spec))
+            continue
+
+        if lazy and isinstance(inspect.getattr_static(cls, key, None), LazyField):
+            converter = _lazy_converter(spec, ignore_unknown)
+
+        converters.append((key, converter))
+
+    def decode(_dict):
+        if fields.issuperset(_dict):
+            values = dict(_dict)
+        else:
+            values = {}
+            for key in _dict:
+                if key in fields or not _check_unknown_field(cls, key, ignore_unknown):
+                    values[key] = _dict[key]
+
+        for key, converter in converters:
+            if key in values:
+                values[key] = converter(values[key])
+
+        for key, value in defaults:
+            if key not in _dict and (key in fields or not _check_unknown_field(cls, key, ignore_unknown)):
+                values[key] = value
 
         instance = cls()
-        super(StructFromJsonMixin, instance).__init__(ignore_unknown, **_dict)
+        assign(instance, values)
         return instance
 
+    if cls in _COMPACT_ORIGINS:
+        assign = _assign_attributes
+    else:
+        assign = _update_dict
+
+    return decode
+
+
+def _lazy_converter(spec, ignore_unknown):
+    return lambda value: value if value is None else _Pending(value, spec, ignore_unknown)
+
+
+def _update_dict(instance, values):
+    instance.__dict__.update(values)
+
+
+def _assign_attributes(instance, values):
+    for key in values:
+        setattr(instance, key, values[key])
+
+
+_DECODERS = {}
+
+
+class LazyField(object):
+    '''
+    Declares a field holding nested structs, which may be decoded lazily (see `StructFromJsonMixin.from_json`).
+    Until the first access the field keeps the decoded json of the nested structs, serializing it as is.
+
+    Usage:
+        class TransactionInfo(StructMixin):
+            Verification = LazyField()
+    '''
+
+    def __init__(self, default=None):
+        self.default = default
+        self.name = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self.default
+
+        try:
+            value = instance.__dict__[self.name]
+        except KeyError:
+            return self.default
+
+        if type(value) is _Pending:
+            value = value.decode()
+            instance.__dict__[self.name] = value
+
+        return value
+
+    def __set__(self, instance, value):
+        instance.__dict__[self.name] = value
+
+
+class _Pending(object):
+    '''
+    Decoded json of a lazy field along with the spec of the field, which tells how to decode it into structs.
+    The spec is kept rather than a decoding function, so structs holding pending fields can be pickled.
+    '''
+    __slots__ = ('raw', 'spec', 'ignore_unknown')
+
+    def __init__(self, raw, spec, ignore_unknown):
+        self.raw = raw
+        self.spec = spec
+        self.ignore_unknown = ignore_unknown
+
+    def decode(self):
+        if isinstance(self.spec, list):
+            return _nested_list_decoder(self.spec[0], self.ignore_unknown)(self.raw)
+
+        return _nested_decoder(self.spec, self.ignore_unknown)(self.raw)
+
+    def __reduce__(self):
+        return _Pending, (self.raw, self.spec, self.ignore_unknown)
+
 
 class StructMixin(StructFromJsonMixin, StructToJsonMixin):
     '''
@@ -136,87 +507,165 @@ class StructMixin(StructFromJsonMixin, StructToJsonMixin):
     pass
 
 
-class RequestMethod(StructMixin, Enum):
+def compact(cls):
     '''
-    Represents a type of a request defined as PaymentMethod in the Rapid API specification, Introduction -> Payment Methods
+    Returns a compact counterpart of a struct class, keeping the fields in `__slots__`
+    instead of a per-instance dictionary, which roughly halves the memory taken by an object.
 
-    NOTE: we cannot use a name PaymentMethod in here, because the name describes rather a kind of an approach we use to perform payment like:
-          one of `TransparentRedirect`, `DirectConnection`, `ResponsiveSharedPage` etc
+    The compact class derives from the original one, so its objects are instances of the original class,
+    have the same attribute API and are serialized and unserialized the same way. Structs nested into
+    a compact struct by `from_json` are compact as well.
+
+    The slots take the place of `LazyField` descriptors, so the nested structs of a compact struct
+    are always decoded eagerly, even with `lazy=True`.
+
+    Usage:
+        info = compact(TransactionInfo).from_json(response_json)
+
+    Arguments:
+        cls : class = class implementing StructMixin
     '''
-    ProcessPayment = 'ProcessPayment'
-    Authorise = 'Authorise'
-    TokenPayment = 'TokenPayment'
-    CreateTokenCustomer = 'CreateTokenCustomer'
-    UpdateTokenCustomer = 'UpdateTokenCustomer'
+    try:
+        return _COMPACT[cls]
+    except KeyError:
+        pass
 
-    def to_json(self, **kwargs):
-        return u'"{}"'.format(self)
+    if cls in _COMPACT_ORIGINS:
+        return cls
 
-    @classmethod
-    def from_json(cls, json_string, *args, **kwargs):
-        error = ValueError(u'Cannot read a correct representation of RequestMethod from json value: {}'.format(json_string))
+    if not _is_compactable(cls):
+        raise TypeError('Cannot make a compact counterpart of {}'.format(cls))
 
-        if not json_string.startswith(u'"') and not json_string.startswith(u"'"):
-            raise error
+    slots = tuple(
+        key for key, value in cls.__dict__.items()
+        if not (key.startswith('__') and key.endswith('__'))
+        and not isinstance(value, (classmethod, staticmethod, property, FunctionType))
+    )
 
-        if not json_string.endswith(u'"') and not json_string.endswith(u"'"):
-            raise error
+    def __getattr__(self, name):
+        if name in slots:
+            return getattr(cls, name)
 
-        value = json_string[1:-1]
+        raise AttributeError("'{}' object has no attribute '{}'".format(cls.__name__, name))
 
-        if value == 'ProcessPayment':
-            return cls.ProcessPayment
+    def _struct_values(self):
+        values = {}
 
-        elif value == 'Authorise':
-            return cls.Authorise
+        for key in slots:
+            try:
+                values[key] = object.__getattribute__(self, key)
+            except AttributeError:
+                pass
 
-        elif value == 'TokenPayment':
-            return cls.TokenPayment
+        return values
 
-        elif value == 'CreateTokenCustomer':
-            return cls.CreateTokenCustomer
+    def __reduce__(self):
+        return _restore_compact, (cls, self._struct_values())
 
-        elif value == 'UpdateTokenCustomer':
-            return cls.UpdateTokenCustomer
+    compact_class = type(cls.__name__, (cls,), {
+        '__slots__': slots,
+        '__module__': cls.__module__,
+        '__doc__': cls.__doc__,
+        '__getattr__': __getattr__,
+        '__reduce__': __reduce__,
+        '_struct_values': _struct_values
+    })
+
+    _FIELDS[compact_class] = _struct_fields(cls)
+    _COMPACT_ORIGINS[compact_class] = cls
+    _COMPACT[cls] = compact_class
+
+    return compact_class
+
+
+def _is_compactable(cls):
+    return inspect.isclass(cls) and issubclass(cls, StructMixin) and not issubclass(cls, Enum)
 
-        else:
-            raise error
 
+def _compact_spec(spec):
+    if _is_compactable(spec):
+        return compact(spec)
 
-class TransactionType(StructMixin, Enum):
+    if isinstance(spec, list) and len(spec) == 1 and _is_compactable(spec[0]):
+        return [compact(spec[0])]
+
+    return spec
+
+
+def _restore_compact(cls, values):
+    instance = compact(cls).__new__(compact(cls))
+    _assign_attributes(instance, values)
+    return instance
+
+
+_COMPACT = {}
+
+_COMPACT_ORIGINS = {}
+
+
+class StructEnum(StructMixin, Enum):
     '''
-    Represents transaction types defined by the Rapid API specification
+    Base class of the enums exchanged with eWAY.
+
+    Members are encoded as json strings of their values. Decoding is a single lookup in a map
+    precomputed for the enum, which accepts the raw value (as found in decoded json dictionaries)
+    as well as its quoted json representation.
     '''
-    Purchase = 'Purchase'
-    MOTO = 'MOTO'
-    Recurring = 'Recurring'
 
-    def to_json(self, **kwargs):
-        return u'"{}"'.format(self)
+    def to_json(self, default=None):
+        return _encode_string(self.value)
 
     @classmethod
     def from_json(cls, json_string, *args, **kwargs):
-        error = ValueError(u'Cannot read a correct representation of TransactionType from json value: {}'.format(json_string))
+        try:
+            return _enum_index(cls)[json_string]
+        except (KeyError, TypeError):
+            raise ValueError(u'Cannot read a correct representation of {} from json value: {}'.format(cls.__name__, json_string))
+
 
-        if not json_string.startswith(u'"') and not json_string.startswith(u"'"):
-            raise error
+def _enum_index(cls):
+    '''
+    Returns the map of json values (raw and quoted) to the members of the enum
+    '''
+    try:
+        return _ENUM_INDEXES[cls]
+    except KeyError:
+        index = {}
 
-        if not json_string.endswith(u'"') and not json_string.endswith(u"'"):
-            raise error
+        for member in cls:
+            index[member] = member
+            index[member.value] = member
+            index[u'"{}"'.format(member.value)] = member
+            index[u"'{}'".format(member.value)] = member
 
-        value = json_string[1:-1]
+        _ENUM_INDEXES[cls] = index
+        return index
 
-        if value == 'Purchase':
-            return cls.Purchase
 
-        elif value == 'MOTO':
-            return cls.MOTO
+_ENUM_INDEXES = {}
 
-        elif value == 'Recurring':
-            return cls.Recurring
 
-        else:
-            raise error
+class RequestMethod(StructEnum):
+    '''
+    Represents a type of a request defined as PaymentMethod in the Rapid API specification, Introduction -> Payment Methods
+
+    NOTE: we cannot use a name PaymentMethod in here, because the name describes rather a kind of an approach we use to perform payment like:
+          one of `TransparentRedirect`, `DirectConnection`, `ResponsiveSharedPage` etc
+    '''
+    ProcessPayment = 'ProcessPayment'
+    Authorise = 'Authorise'
+    TokenPayment = 'TokenPayment'
+    CreateTokenCustomer = 'CreateTokenCustomer'
+    UpdateTokenCustomer = 'UpdateTokenCustomer'
+
+
+class TransactionType(StructEnum):
+    '''
+    Represents transaction types defined by the Rapid API specification
+    '''
+    Purchase = 'Purchase'
+    MOTO = 'MOTO'
+    Recurring = 'Recurring'
 
 
 class Payment(StructMixin):
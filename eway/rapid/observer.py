@@ -0,0 +1,188 @@
+'''
+The module contains the observer interface reporting where the time of the calls to Rapid API goes.
+
+Observers are registered on clients and payment methods. Once a call is finished, every observer
+receives its CallTimings, which breaks the call down into phases:
+ * to_json            - encoding the request (client)
+ * rate_limit_wait    - waiting for the rate limiter (client)
+ * connection_acquire - taking a connection from the pool, including connecting and TLS handshake (client)
+ * request_send       - sending the request (client)
+ * first_byte         - waiting for the response headers (client)
+ * body_read          - reading the response body (client)
+ * validate_response  - checking the response (client)
+ * from_json          - decoding the response (payment method)
+ * trigger_errors     - mapping the errors of the response (payment method)
+
+    class LogObserver(Observer):
+        def on_call(self, timings):
+            logger.info('%s %s %s %r', timings.operation, timings.code, timings.duration, timings.phases)
+
+    client.add_observer(LogObserver())
+    payment_method.add_observer(LogObserver())
+
+Phases of all the attempts of a retried call are added up. The timings reported by a payment method
+include the phases of the request it makes through the client, so a single report covers the call
+from encoding the request to decoding the response. The timings are only collected while there are
+observers registered.
+'''
+
+from logging import getLogger
+
+try:
+    from time import monotonic
+except ImportError:
+    from time import time as monotonic
+
+from .exception import EwayError
+
+
+PHASES = (
+    'to_json', 'rate_limit_wait', 'connection_acquire', 'request_send', 'first_byte', 'body_read', 'validate_response', 'from_json', 'trigger_errors'
+)
+
+
+class Observer(object):
+    '''
+    Abstract observer
+    '''
+
+    def on_call(self, timings):
+        '''
+        Receives the timings of a finished call
+
+        Arguments:
+            timings : CallTimings = timings of the call
+        '''
+        pass
+
+
+class CallTimings(object):
+    '''
+    Timings of a call
+
+    Attributes:
+        operation : str           = name of the call, e.g. 'transparent_redirect_get_transaction_info'
+        endpoint  : str           = URL of the endpoint, None if unknown
+        code      : str           = code of the error the call failed with, otherwise the HTTP status of the response
+                                    it read, e.g. '200' (None if it got the response through a client not reporting timings)
+        attempts  : int           = number of the requests sent by the client
+        duration  : float         = seconds the whole call took
+        phases    : {str: float}  = seconds spent in every phase, only the phases the call went through are present
+        parent    : CallTimings   = timings of the call this one is made for (e.g. by a payment method), None if there is none
+    '''
+
+    __slots__ = ('operation', 'endpoint', 'code', 'attempts', 'duration', 'phases', 'started', 'first_byte_at', 'parent')
+
+    def __init__(self, operation, endpoint=None, parent=None):
+        self.operation = operation
+        self.endpoint = endpoint
+        self.code = None
+        self.attempts = 0
+        self.duration = None
+        self.phases = {}
+        self.started = monotonic()
+        self.first_byte_at = None
+        self.parent = parent
+
+    def add(self, phase, seconds):
+        '''
+        Adds time spent in a phase
+        '''
+        phases = self.phases
+        phases[phase] = phases.get(phase, 0.0) + seconds
+
+    def include(self, timings):
+        '''
+        Adds the phases and the attempts of a nested call, e.g. the request a payment method makes through the client,
+        and takes its endpoint and code
+        '''
+        for phase, seconds in timings.phases.items():
+            self.add(phase, seconds)
+
+        self.attempts += timings.attempts
+
+        if timings.endpoint is not None:
+            self.endpoint = timings.endpoint
+
+        if timings.code is not None:
+            self.code = timings.code  # replaced by the code of the error the call fails with, if it does
+
+    def __repr__(self):
+        return 'CallTimings({!r}, code={!r}, duration={!r}, phases={!r})'.format(self.operation, self.code, self.duration, self.phases)
+
+
+class ObservableMixin(object):
+    '''
+    Mixin implementing the registration of observers
+    '''
+
+    _observers = ()
+
+    def add_observer(self, observer):
+        '''
+        Registers an observer
+
+        Arguments:
+            observer : Observer = observer to receive the timings of the calls
+        '''
+        self._observers = self._observers + (observer,)
+        return self
+
+    def remove_observer(self, observer):
+        'Unregisters an observer'
+        self._observers = tuple(registered for registered in self._observers if registered is not observer)
+        return self
+
+    def _start_timings(self, operation, endpoint=None, parent=None):
+        '''
+        Returns CallTimings for a new call, None if there are no observers and no timings of a calling one
+
+        Arguments:
+            operation : str         = name of the call
+            endpoint  : str         = URL of the endpoint, None if unknown
+            parent    : CallTimings = timings of the call this one is made for, which the phases are added to once it is finished
+        '''
+        if not self._observers and parent is None:
+            return None
+
+        return CallTimings(operation, endpoint, parent)
+
+    def _finish_timings(self, timings, error=None):
+        '''
+        Completes the timings of a call and passes them to the observers
+
+        Arguments:
+            timings : CallTimings = timings of the call, nothing is done if None
+            error   : Exception   = error the call failed with
+        '''
+        if timings is None:
+            return
+
+        timings.duration = monotonic() - timings.started
+
+        if error is not None:
+            timings.code = error._code if isinstance(error, EwayError) else type(error).__name__
+
+        for observer in self._observers:
+            try:
+                observer.on_call(timings)
+            except Exception:
+                getLogger('eway.rapid.observer').exception('Observer {!r} failed'.format(observer))
+
+        if timings.parent is not None:
+            timings.parent.include(timings)
+
+
+def timed(timings, phase, func, *args, **kwargs):
+    '''
+    Calls the function adding the time it takes to a phase of the timings, only calls it if timings is None
+    '''
+    if timings is None:
+        return func(*args, **kwargs)
+
+    started = monotonic()
+
+    try:
+        return func(*args, **kwargs)
+    finally:
+        timings.add(phase, monotonic() - started)
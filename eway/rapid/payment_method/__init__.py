@@ -8,25 +8,103 @@ The module to contain implementations of the payment methods, which defined by t
  - Recurring Payments
 '''
 
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
+from eway.rapid.checkpoint import _Progress
 from eway.rapid.exception import EwayError
+from eway.rapid.model import compact
+from eway.rapid.observer import ObservableMixin
 
 
-class Method(object):
+class Method(ObservableMixin):
     '''
     Abstract payment method class with commont methods for all the payment method implementations
+
+    Observers registered with `add_observer` receive the timings of the calls, from encoding the requests
+    in the client to decoding the responses (see `eway.rapid.observer`).
     '''
     _client = None
 
-    def __init__(self, client):
+    _compact = False
+
+    _lazy = False
+
+    def __init__(self, client, compact=False, lazy=False):
         '''
         Initializes the object
 
         Parameters:
-            client : .client.Client = Initialised client
+            client  : .client.Client = Initialised client
+            compact : bool           = whether responses are decoded into compact structs (see `eway.rapid.model.compact`)
+            lazy    : bool           = whether nested structs of responses are decoded on the first access (see `eway.rapid.model.LazyField`)
         '''
 
         self._client = client
+        self._compact = compact
+        self._lazy = lazy
+
+    def _client_kwargs(self, deadline, timings):
+        '''
+        Returns keyword arguments passing a deadline and the timings of the call to the client,
+        so that clients not supporting them keep working when neither is set
+        '''
+        kwargs = {} if deadline is None else {'deadline': deadline}
+
+        if timings is not None:
+            kwargs['timings'] = timings
+
+        return kwargs
+
+    def _within_deadline(self, response, deadline):
+        '''
+        Returns the response if the deadline has not passed, raises `RequestTimeoutError('ST003')` otherwise
+        '''
+        if deadline is not None:
+            deadline.check()
+
+        return response
+
+    def _call(self, operation, send, read, deadline):
+        '''
+        Sends a request with `send(**kwargs)` and reads the response with `read(response_json, timings)` within the deadline,
+        reporting the timings of the call, the phases of the client included, to the observers
+
+        Arguments:
+            operation : str                = name of the call
+            send      : callable           = function calling the client with the deadline and the timings passed
+            read      : callable           = function decoding the response
+            deadline  : .deadline.Deadline = deadline of the call, may be None
+        '''
+        if not self._observers:
+            return self._within_deadline(read(send(**self._client_kwargs(deadline, None)), None), deadline)
+
+        endpoint = getattr(self._client, '_endpoint', None)
+        timings = self._start_timings(operation, endpoint.get_url() if endpoint is not None else None)
+        error = None
+
+        try:
+            return self._within_deadline(read(send(**self._client_kwargs(deadline, timings)), timings), deadline)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self._finish_timings(timings, error)
+
+    def _response_string(self, response_json):
+        '''
+        Returns a response body as a string to be attached to errors
+        '''
+        if isinstance(response_json, bytes) and not isinstance(response_json, str):
+            return response_json.decode('utf-8', 'replace')
+
+        return response_json
+
+    def _response_class(self, cls):
+        '''
+        Returns the class responses are to be decoded with
+        '''
+        return compact(cls) if self._compact else cls
 
     def trigger_errors(self, codes, *args, **kwargs):
         '''
@@ -42,3 +120,101 @@ class Method(object):
 
             if error:
                 raise error
+
+    def _map_concurrently(self, func, items, max_concurrency, ordered, admit=None):
+        '''
+        Calls `func` for every item on a pool of worker threads and yields `(item, result)` pairs.
+        EwayError raised by `func` is yielded as the result of the item instead of being raised.
+
+        No more than `max_concurrency` items are taken from `items` ahead of the consumer,
+        so the memory stays flat however long the input iterator is.
+
+        Arguments:
+            func            : callable = function to be called with every item
+            items           : iterable = items to be processed
+            max_concurrency : int      = number of calls kept in flight
+            ordered         : bool     = whether to yield results in the input order instead of the completion order
+            admit           : callable = predicate holding the next item back while it returns False, all the items are admitted if not set
+        '''
+        if max_concurrency < 1:
+            raise ValueError('max_concurrency must be a positive number')
+
+        items = iter(items)
+        executor = ThreadPoolExecutor(max_workers=max_concurrency)
+        pending = deque() if ordered else set()
+        add = pending.append if ordered else pending.add
+        held = []  # the next item, not admitted yet
+
+        def submit():
+            while len(pending) < max_concurrency:
+                item = held.pop() if held else next(items, _END)
+
+                if item is _END:
+                    return
+
+                # an item is never held back with nothing in flight, which could not admit it later
+                if admit is not None and pending and not admit(item):
+                    held.append(item)
+                    return
+
+                add(executor.submit(_call_capturing_errors, func, item))
+
+        try:
+            submit()
+
+            while pending:
+                if ordered:
+                    done = [pending.popleft()]
+                else:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    pending.difference_update(done)
+
+                for future in done:
+                    yield future.result()
+
+                submit()
+
+        finally:
+            for future in pending:
+                future.cancel()
+
+            executor.shutdown(wait=True)
+
+    def _map_resumably(self, func, items, max_concurrency, ordered, checkpoint):
+        '''
+        Works as `_map_concurrently`, but skips the items a checkpoint has recorded as processed
+        and records every item once the consumer asks for the next result
+
+        Arguments:
+            func            : callable                     = function to be called with every item
+            items           : iterable                     = items to be processed, in the same order on every run
+            max_concurrency : int                          = number of calls kept in flight
+            ordered         : bool                         = whether to yield results in the input order instead of the completion order
+            checkpoint      : .checkpoint.Checkpoint       = checkpoint of the progress, None to process all the items
+        '''
+        if checkpoint is None:
+            for result in self._map_concurrently(func, items, max_concurrency, ordered):
+                yield result
+
+            return
+
+        progress = _Progress(checkpoint, max_concurrency)
+        results = self._map_concurrently(lambda pair: func(pair[1]), progress.pending(items), max_concurrency, ordered, progress.admits)
+
+        try:
+            for (position, item), result in results:
+                yield item, result
+                progress.complete(position)
+        finally:
+            results.close()
+            progress.flush()
+
+
+_END = object()
+
+
+def _call_capturing_errors(func, item):
+    try:
+        return item, func(item)
+    except EwayError as error:
+        return item, error
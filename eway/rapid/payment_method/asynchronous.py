@@ -0,0 +1,134 @@
+'''
+Helpers shared by the awaitable payment method implementations
+'''
+
+import asyncio
+from collections import deque
+
+from eway.rapid.checkpoint import _Progress
+from eway.rapid.exception import EwayError
+
+
+class AsyncMethodMixin(object):
+    '''
+    Mixin implements coroutine counterparts of the Method helpers
+    '''
+
+    async def _call(self, operation, send, read, deadline):
+        '''
+        Awaits a request sent with `send(**kwargs)` and reads the response with `read(response_json, timings)` within the deadline,
+        reporting the timings of the call, the phases of the client included, to the observers
+
+        Arguments:
+            operation : str                = name of the call
+            send      : coroutine function = function calling the client with the deadline and the timings passed
+            read      : callable           = function decoding the response
+            deadline  : .deadline.Deadline = deadline of the call, may be None
+        '''
+        if not self._observers:
+            return self._within_deadline(read(await send(**self._client_kwargs(deadline, None)), None), deadline)
+
+        endpoint = getattr(self._client, '_endpoint', None)
+        timings = self._start_timings(operation, endpoint.get_url() if endpoint is not None else None)
+        error = None
+
+        try:
+            return self._within_deadline(read(await send(**self._client_kwargs(deadline, timings)), timings), deadline)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self._finish_timings(timings, error)
+
+    async def _map_concurrently(self, func, items, max_concurrency, ordered, admit=None):
+        '''
+        Awaits `func` for every item keeping up to `max_concurrency` calls in flight and yields `(item, result)` pairs.
+        EwayError raised by `func` is yielded as the result of the item instead of being raised.
+
+        Arguments:
+            func            : coroutine function = function to be called with every item
+            items           : iterable           = items to be processed
+            max_concurrency : int                = number of calls kept in flight
+            ordered         : bool               = whether to yield results in the input order instead of the completion order
+            admit           : callable           = predicate holding the next item back while it returns False, all the items are admitted if not set
+        '''
+        if max_concurrency < 1:
+            raise ValueError('max_concurrency must be a positive number')
+
+        items = iter(items)
+        pending = deque() if ordered else set()
+        add = pending.append if ordered else pending.add
+        held = []  # the next item, not admitted yet
+
+        def submit():
+            while len(pending) < max_concurrency:
+                item = held.pop() if held else next(items, _END)
+
+                if item is _END:
+                    return
+
+                # an item is never held back with nothing in flight, which could not admit it later
+                if admit is not None and pending and not admit(item):
+                    held.append(item)
+                    return
+
+                add(asyncio.ensure_future(_call_capturing_errors(func, item)))
+
+        try:
+            submit()
+
+            while pending:
+                if ordered:
+                    done = [pending.popleft()]
+                    await asyncio.wait(done)
+                else:
+                    done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    pending.difference_update(done)
+
+                for task in done:
+                    yield task.result()
+
+                submit()
+
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _map_resumably(self, func, items, max_concurrency, ordered, checkpoint):
+        '''
+        Works as `_map_concurrently`, but skips the items a checkpoint has recorded as processed
+        and records every item once the consumer asks for the next result
+
+        Arguments:
+            func            : coroutine function           = function to be called with every item
+            items           : iterable                     = items to be processed, in the same order on every run
+            max_concurrency : int                          = number of calls kept in flight
+            ordered         : bool                         = whether to yield results in the input order instead of the completion order
+            checkpoint      : .checkpoint.Checkpoint       = checkpoint of the progress, None to process all the items
+        '''
+        if checkpoint is None:
+            async for result in self._map_concurrently(func, items, max_concurrency, ordered):
+                yield result
+
+            return
+
+        progress = _Progress(checkpoint, max_concurrency)
+        results = self._map_concurrently(lambda pair: func(pair[1]), progress.pending(items), max_concurrency, ordered, progress.admits)
+
+        try:
+            async for (position, item), result in results:
+                yield item, result
+                progress.complete(position)
+        finally:
+            await results.aclose()
+            progress.flush()
+
+
+_END = object()
+
+
+async def _call_capturing_errors(func, item):
+    try:
+        return item, await func(item)
+    except EwayError as error:
+        return item, error
@@ -2,6 +2,13 @@
 Implementation of a payment method defined by the specification as Transparent Redirect
 '''
 
+from functools import partial
+from sys import version_info
+
+from eway.rapid.cache import is_final
+from eway.rapid.deadline import Deadline
+from eway.rapid.exception import RequestTimeoutError
+from eway.rapid.observer import timed
 from eway.rapid.payment_method import Method
 
 from .request import CreateAccessCodeRequest
@@ -9,35 +16,169 @@ from .response import AccessCodeResponse, TransactionInfo
 
 
 class TransparentRedirect(Method):
-    def create_access_code(self, request):
+    _result_cache = None
+
+    _single_flight = None
+
+    def __init__(self, client, compact=False, lazy=False, result_cache=None, single_flight=None):
+        '''
+        Initializes the object
+
+        Parameters:
+            client        : .client.Client                        = Initialised client
+            compact       : bool                                  = whether responses are decoded into compact structs (see `eway.rapid.model.compact`)
+            lazy          : bool                                  = whether nested structs of responses are decoded on the first access (see `eway.rapid.model.LazyField`)
+            result_cache  : eway.rapid.cache.ResultCache          = cache of the processed transactions results, may be shared by many objects
+            single_flight : eway.rapid.single_flight.SingleFlight = group coalescing concurrent requests of the same transaction result,
+                                                                    may be shared by many objects (AsyncSingleFlight for AsyncTransparentRedirect)
+        '''
+        super(TransparentRedirect, self).__init__(client, compact, lazy)
+
+        self._result_cache = result_cache
+        self._single_flight = single_flight
+
+    def create_access_code(self, request, deadline=None):
         '''
         Makes a CreateAccessCodeRequest and sends it to eWAY
 
         Arguments:
-            request : .request.CreateAccessCodeRequest = request to be performed
+            request  : .request.CreateAccessCodeRequest = request to be performed
+            deadline : float                            = seconds the call may take including retries and decoding,
+                                                          `eway.rapid.exception.RequestTimeoutError` is raised once exceeded
         '''
+        deadline = Deadline.start(deadline)
 
-        response_json = self._client.transparent_redirect_create_access_code(request)
+        return self._call(
+            'transparent_redirect_create_access_code', partial(self._client.transparent_redirect_create_access_code, request),
+            self._read_access_code_response, deadline
+        )
 
-        ignore_unknown = False  # TODO: True after lib stabilization
-        response = AccessCodeResponse.from_json(response_json, ignore_unknown)
+    def create_access_codes(self, requests, max_concurrency=8, ordered=False, deadline=None):
+        '''
+        Sends many CreateAccessCodeRequests to eWAY keeping up to `max_concurrency` of them in flight.
 
-        if response.Errors:
-            self.trigger_errors(response.Errors.split(','), response_struct=response, response_string=response_json)
+        Yields `(request, response)` pairs, where response is either an `.response.AccessCodeResponse`
+        or the `EwayError` the request failed with. Requests are read from the iterable lazily,
+        so it may be a generator of any length. The client must be safe to share between threads
+        (RestClient is), and its pool should hold at least `max_concurrency` connections.
 
-        return response
+        Arguments:
+            requests        : iterable(.request.CreateAccessCodeRequest) = requests to be performed
+            max_concurrency : int                                        = number of requests kept in flight
+            ordered         : bool                                       = whether to yield results in the input order
+                                                                           instead of the completion order
+            deadline        : float                                      = seconds every request may take once sent
+        '''
+
+        return self._map_concurrently(partial(self.create_access_code, deadline=deadline), requests, max_concurrency, ordered)
 
-    def request_transaction_result(self, access_code):
+    def request_transaction_result(self, access_code, deadline=None):
         '''
         Performs request of a transaction information by AccessCode
+
+        With a single flight group, concurrent calls for the same AccessCode share one request
+        and receive the same TransactionInfo (or error). The shared request runs within the deadline
+        of the call which started it; once that deadline is exceeded, the other calls make the request again.
+
+        Arguments:
+            access_code : str   = The Access Code
+            deadline    : float = seconds the call may take including retries and decoding,
+                                  `eway.rapid.exception.RequestTimeoutError` is raised once exceeded
         '''
+        cached = self._cached_transaction_info(access_code)
 
-        response_json = self._client.transparent_redirect_get_transaction_info(access_code)
+        if cached is not None:
+            return cached
+
+        deadline = Deadline.start(deadline)
+
+        if self._single_flight is None:
+            return self._fetch_transaction_info(access_code, deadline)
+
+        while True:
+            try:
+                return self._single_flight.do(
+                    access_code, partial(self._fetch_transaction_info, access_code, deadline), None if deadline is None else deadline.timeout()
+                )
+            except RequestTimeoutError as error:
+                if not _exceeded_another_deadline(error, deadline):
+                    raise
+
+    def request_transaction_results(self, access_codes, max_concurrency=8, ordered=False, checkpoint=None, deadline=None):
+        '''
+        Requests transaction information for many AccessCodes keeping up to `max_concurrency` requests in flight.
 
+        Yields `(access_code, info)` pairs as the results arrive, where info is either
+        an `.response.TransactionInfo` or the `EwayError` the request failed with.
+        Access codes are read from the iterable lazily, so the memory stays flat whatever its length.
+
+        With a checkpoint the progress is recorded, and a run given the same access codes in the same
+        order skips the ones already yielded by an interrupted run (see `eway.rapid.checkpoint`).
+
+        Arguments:
+            access_codes    : iterable(str)                      = access codes to be looked up
+            max_concurrency : int                                = number of requests kept in flight
+            ordered         : bool                               = whether to yield results in the input order
+                                                                   instead of the completion order
+            checkpoint      : eway.rapid.checkpoint.Checkpoint   = checkpoint of the progress
+            deadline        : float                              = seconds every request may take once sent
+        '''
+
+        return self._map_resumably(
+            partial(self.request_transaction_result, deadline=deadline), access_codes, max_concurrency, ordered, checkpoint
+        )
+
+    def _fetch_transaction_info(self, access_code, deadline):
+        info = self._call(
+            'transparent_redirect_get_transaction_info', partial(self._client.transparent_redirect_get_transaction_info, access_code),
+            self._read_transaction_info, deadline
+        )
+
+        return self._cache_transaction_info(access_code, info)
+
+    def _cached_transaction_info(self, access_code):
+        if self._result_cache is None:
+            return None
+
+        return self._result_cache.get(access_code)
+
+    def _cache_transaction_info(self, access_code, info):
+        if self._result_cache is not None and is_final(info):
+            self._result_cache.put(access_code, info)
+
+        return info
+
+    def _read_access_code_response(self, response_json, timings=None):
         ignore_unknown = False  # TODO: True after lib stabilization
-        response = TransactionInfo.from_json(response_json, ignore_unknown)
+        response = timed(timings, 'from_json', self._response_class(AccessCodeResponse).from_json, response_json, ignore_unknown)
 
         if response.Errors:
-            self.trigger_errors(response.Errors.split(','), response_struct=response, response_string=response_json)
+            timed(
+                timings, 'trigger_errors', self.trigger_errors, response.Errors.split(','),
+                response_struct=response, response_string=self._response_string(response_json)
+            )
 
         return response
+
+    def _read_transaction_info(self, response_json, timings=None):
+        ignore_unknown = False  # TODO: True after lib stabilization
+        response = timed(timings, 'from_json', self._response_class(TransactionInfo).from_json, response_json, ignore_unknown, self._lazy)
+
+        if response.Errors:
+            timed(
+                timings, 'trigger_errors', self.trigger_errors, response.Errors.split(','),
+                response_struct=response, response_string=self._response_string(response_json)
+            )
+
+        return response
+
+
+def _exceeded_another_deadline(error, deadline):
+    '''
+    Checks whether a coalesced call failed because of the deadline of the call which made the request
+    '''
+    return error._code == 'ST003' and (deadline is None or not deadline.expired())
+
+
+if version_info >= (3, 5):
+    from .asynchronous import AsyncTransparentRedirect
@@ -0,0 +1,116 @@
+'''
+Awaitable implementation of the Transparent Redirect payment method.
+Must be used along with a client implementing coroutines, e.g. `eway.rapid.client.AsyncRestClient`
+'''
+
+from asyncio import TimeoutError
+from functools import partial
+
+from eway.rapid.deadline import Deadline
+from eway.rapid.exception import RequestTimeoutError
+from eway.rapid.payment_method.asynchronous import AsyncMethodMixin
+
+from . import TransparentRedirect, _exceeded_another_deadline
+
+
+class AsyncTransparentRedirect(AsyncMethodMixin, TransparentRedirect):
+    async def create_access_code(self, request, deadline=None):
+        '''
+        Makes a CreateAccessCodeRequest and sends it to eWAY
+
+        Arguments:
+            request  : .request.CreateAccessCodeRequest = request to be performed
+            deadline : float                            = seconds the call may take including retries and decoding,
+                                                          `eway.rapid.exception.RequestTimeoutError` is raised once exceeded
+        '''
+        deadline = Deadline.start(deadline)
+
+        return await self._call(
+            'transparent_redirect_create_access_code', partial(self._client.transparent_redirect_create_access_code, request),
+            self._read_access_code_response, deadline
+        )
+
+    def create_access_codes(self, requests, max_concurrency=8, ordered=False, deadline=None):
+        '''
+        Sends many CreateAccessCodeRequests to eWAY keeping up to `max_concurrency` of them in flight.
+
+        Returns an async generator of `(request, response)` pairs, where response is either
+        an `.response.AccessCodeResponse` or the `EwayError` the request failed with:
+
+            async for request, response in payment_method.create_access_codes(requests, max_concurrency=50):
+                ...
+
+        Arguments:
+            requests        : iterable(.request.CreateAccessCodeRequest) = requests to be performed
+            max_concurrency : int                                        = number of requests kept in flight
+            ordered         : bool                                       = whether to yield results in the input order
+                                                                           instead of the completion order
+            deadline        : float                                      = seconds every request may take once sent
+        '''
+
+        return self._map_concurrently(partial(self.create_access_code, deadline=deadline), requests, max_concurrency, ordered)
+
+    async def request_transaction_result(self, access_code, deadline=None):
+        '''
+        Performs request of a transaction information by AccessCode
+
+        With a single flight group, concurrent calls for the same AccessCode share one request
+        and receive the same TransactionInfo (or error). The shared request runs within the deadline
+        of the call which started it; once that deadline is exceeded, the other calls make the request again.
+
+        Arguments:
+            access_code : str   = The Access Code
+            deadline    : float = seconds the call may take including retries and decoding,
+                                  `eway.rapid.exception.RequestTimeoutError` is raised once exceeded
+        '''
+        cached = self._cached_transaction_info(access_code)
+
+        if cached is not None:
+            return cached
+
+        deadline = Deadline.start(deadline)
+
+        if self._single_flight is None:
+            return await self._fetch_transaction_info(access_code, deadline)
+
+        while True:
+            try:
+                return await self._single_flight.do(
+                    access_code, partial(self._fetch_transaction_info, access_code, deadline), None if deadline is None else deadline.timeout()
+                )
+            except TimeoutError:
+                raise RequestTimeoutError('ST003')  # Deadline of the call exceeded
+            except RequestTimeoutError as error:
+                if not _exceeded_another_deadline(error, deadline):
+                    raise
+
+    async def _fetch_transaction_info(self, access_code, deadline):
+        info = await self._call(
+            'transparent_redirect_get_transaction_info', partial(self._client.transparent_redirect_get_transaction_info, access_code),
+            self._read_transaction_info, deadline
+        )
+
+        return self._cache_transaction_info(access_code, info)
+
+    def request_transaction_results(self, access_codes, max_concurrency=8, ordered=False, checkpoint=None, deadline=None):
+        '''
+        Requests transaction information for many AccessCodes keeping up to `max_concurrency` requests in flight.
+
+        Returns an async generator of `(access_code, info)` pairs, where info is either
+        an `.response.TransactionInfo` or the `EwayError` the request failed with:
+
+            async for access_code, info in payment_method.request_transaction_results(access_codes, max_concurrency=50):
+                ...
+
+        Arguments:
+            access_codes    : iterable(str)                      = access codes to be looked up
+            max_concurrency : int                                = number of requests kept in flight
+            ordered         : bool                               = whether to yield results in the input order
+                                                                   instead of the completion order
+            checkpoint      : eway.rapid.checkpoint.Checkpoint   = checkpoint of the progress
+            deadline        : float                              = seconds every request may take once sent
+        '''
+
+        return self._map_resumably(
+            partial(self.request_transaction_result, deadline=deadline), access_codes, max_concurrency, ordered, checkpoint
+        )
@@ -3,11 +3,11 @@ The module contains classes representing responses of the Rapid API during creat
 using TransparentRedirect payment method
 '''
 
-import json
 import six
 
+from eway.rapid.codec import get_codec
 from eway.rapid.exception import EwayError
-from eway.rapid.model import Customer, Option, Payment, StructMixin, Verification, BeagleVerification
+from eway.rapid.model import Customer, LazyField, Option, Payment, StructMixin, Verification, BeagleVerification
 
 
 class AccessCodeResponse(StructMixin):
@@ -32,10 +32,10 @@ class AccessCodeResponse(StructMixin):
     Payment = None
 
     @classmethod
-    def from_json(cls, json_string, ignore_unknown=False, **kwargs):
+    def from_json(cls, json_string, ignore_unknown=False, lazy=False, **kwargs):
         _kwargs = {'Customer': Customer, 'Payment': Payment}
         _kwargs.update(kwargs)
-        return super(AccessCodeResponse, cls).from_json(json_string, ignore_unknown, **_kwargs)
+        return super(AccessCodeResponse, cls).from_json(json_string, ignore_unknown, lazy, **_kwargs)
 
 
 class TransactionInfo(StructMixin):
@@ -61,6 +61,9 @@ class TransactionInfo(StructMixin):
         Options            : [str(255)]                = Options collection passed in the original request will be echoed back in the response here
         Verification       : .model.Verification       = These fields are currently unused
         BeagleVerification : .model.BeagleVerification = Always empty for TransparentRedirect
+
+    The nested structs (Options, Verification and BeagleVerification) are decoded on the first access
+    when the object is created with `from_json(json_string, lazy=True)`
     '''
 
     AccessCode = None
@@ -75,17 +78,17 @@ class TransactionInfo(StructMixin):
     TokenCustomerID = None
     BeagleScore = None
     Errors = None
-    Options = None
-    Verification = None
-    BeagleVerification = None
+    Options = LazyField()
+    Verification = LazyField()
+    BeagleVerification = LazyField()
 
     @classmethod
-    def from_json(cls, json_string, ignore_unknown=False, **kwargs):
+    def from_json(cls, json_string, ignore_unknown=False, lazy=False, **kwargs):
         _kwargs = {'Options': [Option], 'Verification': Verification, 'BeagleVerification': BeagleVerification}
         _kwargs.update(kwargs)
 
-        if isinstance(json_string, six.string_types):
-            _dict = json.loads(json_string)
+        if isinstance(json_string, (six.string_types, six.binary_type)):
+            _dict = get_codec().loads(json_string)
         elif isinstance(json_string, dict):
             _dict = json_string
         else:
@@ -93,7 +96,7 @@ class TransactionInfo(StructMixin):
 
         cls._map_undocumented_message(_dict)
 
-        return super(TransactionInfo, cls).from_json(_dict, ignore_unknown, **_kwargs)
+        return super(TransactionInfo, cls).from_json(_dict, ignore_unknown, lazy, **_kwargs)
 
     @classmethod
     def _map_undocumented_message(cls, _dict):
@@ -0,0 +1,230 @@
+'''
+The module contains the client-side rate limiter keeping the requests under the rate agreed with eWAY.
+
+Every limited operation has a token bucket refilled at a steady rate and holding up to `burst`
+tokens, every request takes a token and waits for one if the bucket is empty:
+
+    limiter = RateLimiter(
+        create_access_code=TokenBucket(rate=20, burst=40),
+        get_transaction_info=TokenBucket(rate=50, burst=100)
+    )
+    client = RestClient('api-key', 'api-password', ProductionEndpoint(), rate_limiter=limiter)
+
+By default a bucket is kept in memory and limits one process. Buckets with a FileLockBackend
+share their state through a file, so all the processes of a host (e.g. gunicorn workers)
+stay under the limit together:
+
+    TokenBucket(rate=20, burst=40, backend=FileLockBackend('/run/eway/access-codes.bucket'))
+'''
+
+import os
+import struct
+
+from threading import Lock
+from time import sleep
+
+try:
+    from time import monotonic
+except ImportError:
+    from time import time as monotonic
+
+
+class MemoryBackend(object):
+    '''
+    Keeps the state of a bucket in the memory of the process
+    '''
+
+    def __init__(self):
+        self._lock = Lock()
+        self._state = None
+
+    def update(self, func):
+        '''
+        Atomically replaces the state with the first item of `func(state)` and returns the second one.
+        The state is None before the first update.
+        '''
+        with self._lock:
+            self._state, result = func(self._state)
+            return result
+
+
+class FileLockBackend(object):
+    '''
+    Keeps the state of a bucket in a file locked for every update, to be shared by the processes of a host.
+    Requires a POSIX system (fcntl), and the clock of the bucket must be the same for all the processes
+    (the default one, `time.monotonic`, is system-wide). A state saved ahead of the clock, e.g. before
+    a reboot restarted it, is discarded and the bucket starts full again.
+    '''
+
+    _FORMAT = struct.Struct('<dd')
+
+    def __init__(self, path):
+        '''
+        Initializes the backend
+
+        Arguments:
+            path : str = path to the state file, created if it does not exist
+        '''
+        import fcntl  # fails early on systems without it
+
+        self._path = path
+        self._lock = Lock()
+        self._file = None
+        self._pid = None
+
+    def update(self, func):
+        import fcntl
+
+        with self._lock:
+            state_file = self._open()
+            fcntl.flock(state_file, fcntl.LOCK_EX)
+
+            try:
+                state_file.seek(0)
+                data = state_file.read(self._FORMAT.size)
+                state = self._FORMAT.unpack(data) if len(data) == self._FORMAT.size else None
+
+                state, result = func(state)
+
+                state_file.seek(0)
+                state_file.write(self._FORMAT.pack(*state))
+                state_file.flush()
+            finally:
+                fcntl.flock(state_file, fcntl.LOCK_UN)
+
+            return result
+
+    def close(self):
+        'Closes the state file, it is opened again by the next update'
+        with self._lock:
+            state_file, self._file = self._file, None
+
+        if state_file is not None:
+            state_file.close()
+
+    def _open(self):
+        # locks are held by open file descriptions, which a forked process would share with its parent
+        if self._file is None or self._pid != os.getpid():
+            fd = os.open(self._path, os.O_RDWR | os.O_CREAT, 0o644)
+            self._file = os.fdopen(fd, 'r+b', 0)
+            self._pid = os.getpid()
+
+        return self._file
+
+
+class TokenBucket(object):
+    '''
+    Token bucket refilled at `rate` tokens per second and holding up to `burst` tokens
+    '''
+
+    def __init__(self, rate, burst=1, backend=None, clock=monotonic):
+        '''
+        Initializes the bucket, which starts full
+
+        Arguments:
+            rate    : float             = tokens added per second, i.e. the sustained rate of requests
+            burst   : int               = capacity of the bucket, i.e. the number of requests which may be sent at once
+            backend : MemoryBackend     = keeper of the state, default value is `MemoryBackend()`
+            clock   : callable -> float = monotonic clock in seconds
+        '''
+        if rate <= 0:
+            raise ValueError('rate must be a positive number')
+
+        if burst < 1:
+            raise ValueError('burst must be at least 1')
+
+        self._rate = float(rate)
+        self._burst = float(burst)
+        self._backend = backend if backend is not None else MemoryBackend()
+        self._clock = clock
+
+    def reserve(self, tokens=1, max_wait=None):
+        '''
+        Takes tokens from the bucket and returns the number of seconds to wait before using them.
+        Returns None without taking the tokens if the wait would be longer than `max_wait`.
+
+        Arguments:
+            tokens   : int   = number of tokens to be taken
+            max_wait : float = maximum number of seconds to wait, there is no limit if not set
+        '''
+        rate, burst, clock = self._rate, self._burst, self._clock
+
+        def take(state):
+            now = clock()  # read under the lock, so the updates of the state never go back in time
+
+            if state is None or state[1] > now:
+                # a new bucket, or one saved before the clock restarted (e.g. a state file kept across a reboot)
+                state = (burst, now)
+
+            level, updated = state
+            level = min(burst, level + (now - updated) * rate)
+            wait = (tokens - level) / rate if level < tokens else 0.0
+
+            if max_wait is not None and wait > max_wait:
+                return (level, now), None
+
+            # the level goes below zero for the tokens reserved ahead of time
+            return (level - tokens, now), wait
+
+        return self._backend.update(take)
+
+    def acquire(self, tokens=1, timeout=None):
+        '''
+        Waits for tokens, returns False if they would not be available within the timeout
+
+        Arguments:
+            tokens  : int   = number of tokens to be taken
+            timeout : float = maximum number of seconds to wait, there is no limit if not set
+        '''
+        wait = self.reserve(tokens, timeout)
+
+        if wait is None:
+            return False
+
+        if wait > 0:
+            sleep(wait)
+
+        return True
+
+    def acquire_async(self, tokens=1, timeout=None):
+        '''
+        Returns an awaitable of `acquire` for asyncio applications.
+        The tokens are reserved when the method is called.
+        '''
+        import asyncio
+
+        wait = self.reserve(tokens, timeout)
+
+        if wait is None:
+            return asyncio.sleep(0, False)
+
+        return asyncio.sleep(wait, True)
+
+
+class RateLimiter(object):
+    '''
+    Token buckets limiting the calls of a client
+
+    Operations:
+        create_access_code   = POST AccessCodes
+        get_transaction_info = GET AccessCode/{code}
+    '''
+
+    def __init__(self, create_access_code=None, get_transaction_info=None):
+        '''
+        Initializes the limiter
+
+        Arguments:
+            create_access_code   : TokenBucket = bucket limiting the creation of access codes, no limit if not set
+            get_transaction_info : TokenBucket = bucket limiting the queries of transaction results, no limit if not set
+        '''
+        self._buckets = {'create_access_code': create_access_code, 'get_transaction_info': get_transaction_info}
+
+    def get_bucket(self, operation):
+        '''
+        Returns the bucket limiting the operation, None if it is not limited
+
+        Arguments:
+            operation : str = 'create_access_code' or 'get_transaction_info'
+        '''
+        return self._buckets.get(operation)
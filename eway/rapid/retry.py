@@ -0,0 +1,163 @@
+'''
+The module contains the retry policy used by the clients to recover from transient failures
+of Rapid API:
+ * S9996 - Rapid gateway server error (a 5xx response)
+ * S9992 - Error connecting to Rapid gateway
+ * ST001, ST002 - Timed out connecting to or waiting for Rapid gateway
+
+Retries are idempotency-aware. Reading transaction results (GET AccessCode/{code}) is always safe
+to repeat, while creating an access code (POST AccessCodes) is only repeated when the request has
+never reached the gateway, i.e. the connection could not be established.
+
+Attempts are spread with decorrelated jitter backoff and limited by a retry budget, so that a
+gateway brownout is not amplified by the clients retrying all at once:
+
+    client = RestClient('api-key', 'api-password', SandboxEndpoint(), retry_policy=RetryPolicy(max_attempts=4))
+'''
+
+import random
+
+from threading import Lock
+from time import sleep
+
+from .exception import TRANSIENT_CODES
+
+
+class RetryBudget(object):
+    '''
+    Token bucket limiting retries to a share of the requests made
+
+    Every request deposits `ratio` of a token and every retry withdraws a whole one,
+    so that in the long run no more than `ratio` retries are made per request.
+    The bucket starts with `reserve` tokens to let a client with little traffic retry.
+    '''
+
+    _ratio = 0.1
+
+    _capacity = 100.0
+
+    _tokens = 10.0
+
+    _lock = None
+
+    def __init__(self, ratio=0.1, reserve=10, capacity=100):
+        '''
+        Initializes the budget
+
+        Arguments:
+            ratio    : float = share of the requests which may be retried
+            reserve  : int   = tokens available from the start
+            capacity : int   = maximum number of tokens saved up
+        '''
+        if ratio < 0:
+            raise ValueError('ratio must not be negative')
+
+        self._ratio = float(ratio)
+        self._capacity = float(max(capacity, reserve))
+        self._tokens = float(reserve)
+        self._lock = Lock()
+
+    def deposit(self):
+        'Records a request'
+        with self._lock:
+            self._tokens = min(self._capacity, self._tokens + self._ratio)
+
+    def withdraw(self):
+        'Takes a token for a retry, returns False if the budget is exhausted'
+        with self._lock:
+            if self._tokens < 1:
+                return False
+
+            self._tokens -= 1
+            return True
+
+    def get_tokens(self):
+        'Returns the number of tokens available'
+        return self._tokens
+
+
+class RetryPolicy(object):
+    '''
+    Decides which failed requests are retried and how long to wait before the next attempt
+
+    A policy owns its retry budget, so every client should be given its own policy instance.
+    '''
+
+    RETRY_CODES = TRANSIENT_CODES
+
+    _max_attempts = 3
+
+    _base_delay = 0.05
+
+    _max_delay = 2.0
+
+    _budget = None
+
+    _random = None
+
+    def __init__(self, max_attempts=3, base_delay=0.05, max_delay=2.0, budget=None, seed=None):
+        '''
+        Initializes the policy
+
+        Arguments:
+            max_attempts : int                = maximum number of attempts per request, including the first one
+            base_delay   : float              = minimum delay between attempts in seconds
+            max_delay    : float              = maximum delay between attempts in seconds
+            budget       : RetryBudget        = default value is `RetryBudget()`
+            seed         : int                = seed of the jitter, for reproducible delays
+        '''
+        if max_attempts < 1:
+            raise ValueError('max_attempts must be at least 1')
+
+        if base_delay < 0 or max_delay < base_delay:
+            raise ValueError('delays must satisfy 0 <= base_delay <= max_delay')
+
+        self._max_attempts = max_attempts
+        self._base_delay = base_delay
+        self._max_delay = max_delay
+        self._budget = budget if budget is not None else RetryBudget()
+        self._random = random.Random(seed)
+
+    def get_budget(self):
+        return self._budget
+
+    def start(self):
+        '''
+        Records a new request in the budget, must be called once before the first attempt
+        '''
+        self._budget.deposit()
+
+    def should_retry(self, error, attempt, idempotent, connect_phase=False):
+        '''
+        Checks whether a failed attempt has to be retried and takes a token from the budget if so
+
+        Arguments:
+            error         : .exception.EwayError = error of the failed attempt
+            attempt       : int                  = number of the failed attempt, starting from 1
+            idempotent    : bool                 = whether the request is safe to be repeated
+            connect_phase : bool                 = whether the attempt failed before the request was sent
+        '''
+        if attempt >= self._max_attempts or getattr(error, '_code', None) not in self.RETRY_CODES:
+            return False
+
+        if not idempotent and not connect_phase:
+            return False
+
+        return self._budget.withdraw()
+
+    def backoff(self, previous_delay=None):
+        '''
+        Returns the delay before the next attempt (decorrelated jitter)
+
+        Arguments:
+            previous_delay : float = the previous delay returned for the request, None before the first retry
+        '''
+        if previous_delay is None:
+            previous_delay = self._base_delay
+
+        upper = max(self._base_delay, previous_delay * 3)
+
+        return min(self._max_delay, self._random.uniform(self._base_delay, upper))
+
+    def sleep(self, delay):
+        sleep(delay)
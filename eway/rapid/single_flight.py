@@ -0,0 +1,137 @@
+'''
+The module contains groups coalescing concurrent identical calls into one.
+
+While a call for a key is in flight, other calls for the same key do not start another one
+but wait for its outcome and receive the same result (or error). A customer coming back from
+the payment page often triggers the browser callback and a status poller at the same time,
+which then share one request of the transaction result:
+
+    payment_method = TransparentRedirect(client, single_flight=SingleFlight())
+
+SingleFlight coalesces calls made by threads, AsyncSingleFlight calls made by coroutines
+of one event loop.
+'''
+
+from threading import Event, Lock
+
+from .exception import RequestTimeoutError
+
+
+class SingleFlight(object):
+    '''
+    Coalesces concurrent calls made by threads
+
+    Attributes:
+        coalesced : int = number of calls which received the outcome of another one
+    '''
+
+    coalesced = 0
+
+    def __init__(self):
+        self._lock = Lock()
+        self._calls = {}
+
+    def do(self, key, func, timeout=None):
+        '''
+        Calls `func` unless a call for the key is in flight already, in which case waits for its outcome.
+        Returns the result of the call or raises its error.
+
+        Arguments:
+            key     : hashable          = identity of the call
+            func    : callable          = function making the call
+            timeout : float             = seconds to wait for a call in flight, `RequestTimeoutError('ST003')`
+                                          is raised once passed. There is no limit if not set.
+        '''
+        with self._lock:
+            call = self._calls.get(key)
+
+            if call is None:
+                call = self._calls[key] = _Call()
+                leader = True
+            else:
+                self.coalesced += 1
+                leader = False
+
+        if not leader:
+            if not call.event.wait(timeout):
+                raise RequestTimeoutError('ST003')  # Deadline of the call exceeded
+
+            if call.error is not None:
+                raise call.error
+
+            return call.result
+
+        try:
+            call.result = func()
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+            call.event.set()
+
+        return call.result
+
+    def in_flight(self):
+        'Returns the number of calls in flight'
+        return len(self._calls)
+
+
+class _Call(object):
+    __slots__ = ('event', 'result', 'error')
+
+    def __init__(self):
+        self.event = Event()
+        self.result = None
+        self.error = None
+
+
+class AsyncSingleFlight(object):
+    '''
+    Coalesces concurrent calls made by coroutines of one event loop
+
+    Attributes:
+        coalesced : int = number of calls which received the outcome of another one
+    '''
+
+    coalesced = 0
+
+    def __init__(self):
+        self._calls = {}
+
+    def do(self, key, func, timeout=None):
+        '''
+        Awaits `func()` unless a call for the key is in flight already, in which case waits for its outcome.
+        Returns an awaitable of the result of the call. Cancelling a caller does not cancel the call
+        shared with the others.
+
+        Arguments:
+            key     : hashable           = identity of the call
+            func    : coroutine function = function making the call
+            timeout : float              = seconds to wait for the call, `asyncio.TimeoutError` is raised once passed.
+                                           There is no limit if not set.
+        '''
+        import asyncio
+
+        future = self._calls.get(key)
+
+        if future is None:
+            future = self._calls[key] = asyncio.ensure_future(func())
+            future.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.coalesced += 1
+
+        return asyncio.wait_for(asyncio.shield(future), timeout)
+
+    def in_flight(self):
+        'Returns the number of calls in flight'
+        return len(self._calls)
+
+    def _forget(self, key, future):
+        if self._calls.get(key) is future:
+            del self._calls[key]
+
+        if not future.cancelled():
+            future.exception()  # all the callers may be gone, the error must not be reported as never retrieved
@@ -0,0 +1,17 @@
+'''
+Tools for testing applications integrated with Rapid API without reaching eWAY.
+
+ * RapidStub - an in-memory implementation of the Transparent Redirect routes of Rapid API
+ * Http2StubServer - HTTPS server exposing RapidStub over HTTP/2 and HTTP/1.1, requires python 3.7+ and the h2 package
+ * StubServer - HTTP server exposing RapidStub, which an endpoint can point to:
+
+    with StubServer(RapidStub(latency=exponential_latency(0.05), errors={'S9996': 0.01})) as server:
+        client = RestClient('api-key', 'api-password', GenericEndpoint().set_url(server.url))
+'''
+
+from sys import version_info
+
+from .server import RapidStub, StubServer, constant_latency, exponential_latency, lognormal_latency, uniform_latency
+
+if version_info >= (3, 7):
+    from .http2 import Http2StubServer
@@ -0,0 +1,336 @@
+'''
+The module contains an HTTP/2 server exposing RapidStub, so the multiplexing of the requests
+can be tested and benchmarked without reaching eWAY. It requires the h2 package
+(`pip install eway-rapid-python[http2]`).
+
+Clients negotiate HTTP/2 over TLS, so the server speaks HTTPS with the certificate of the SSL context
+it is given. The library ships no certificate: tests issue one from a throwaway CA, e.g. with trustme,
+and tell the clients to trust it:
+
+    ca = trustme.CA()
+    server_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    ca.issue_cert('127.0.0.1').configure_cert(server_context)
+    client_context = ssl.create_default_context()
+    ca.configure_trust(client_context)
+
+    with Http2StubServer(RapidStub(), server_context) as server:
+        client = AsyncRestClient('api-key', 'api-password', GenericEndpoint().set_url(server.url),
+                                 http2=True, verify=client_context)
+
+Both HTTP/2 and HTTP/1.1 are offered, so the clients not supporting HTTP/2 fall back to HTTP/1.1.
+'''
+
+import asyncio
+import socket
+
+from concurrent.futures import ThreadPoolExecutor
+from http.client import responses
+from threading import Event, Thread
+
+from .server import RapidStub
+
+
+class _Connection(asyncio.Protocol):
+    '''
+    Connection of the server, served over the protocol negotiated with the client
+    '''
+
+    def __init__(self, server):
+        self._server = server
+        self._transport = None
+        self._handler = None
+
+    def connection_made(self, transport):
+        self._transport = transport
+        self._server._protocols.add(self)
+        self._server.connections_count += 1  # the connections are only made in the thread of the loop
+
+        protocol = transport.get_extra_info('ssl_object').selected_alpn_protocol()
+        self._handler = (_Http2Handler if protocol == 'h2' else _Http1Handler)(self._server, transport)
+
+    def connection_lost(self, exc):
+        self._server._protocols.discard(self)
+
+    def data_received(self, data):
+        self._handler.data_received(data)
+
+    def close(self):
+        self._transport.close()
+
+
+class _Http1Handler(object):
+    '''
+    HTTP/1.1 side of a connection, answers its requests one after another
+    '''
+
+    def __init__(self, server, transport):
+        self._server = server
+        self._transport = transport
+        self._buffer = b''
+        self._busy = False
+
+    def data_received(self, data):
+        self._buffer += data
+        self._handle_next()
+
+    def _handle_next(self):
+        if self._busy:
+            return
+
+        head, separator, rest = self._buffer.partition(b'\r\n\r\n')
+
+        if not separator:
+            return
+
+        lines = head.decode('latin-1').split('\r\n')
+        method, path = lines[0].split(' ')[:2]
+        headers = dict((name.strip().title(), value.strip()) for name, _, value in (line.partition(':') for line in lines[1:]))
+        length = int(headers.get('Content-Length') or 0)
+
+        if len(rest) < length:
+            return
+
+        self._buffer = rest[length:]
+        self._busy = True
+        asyncio.ensure_future(self._respond(method, path, headers, rest[:length]))
+
+    async def _respond(self, method, path, headers, body):
+        status, response_headers, content = await asyncio.get_event_loop().run_in_executor(
+            self._server._executor, self._server.stub.handle, method, path, headers, body
+        )
+
+        if self._transport.is_closing():
+            return
+
+        close = headers.get('Connection', '').lower() == 'close'
+
+        lines = ['HTTP/1.1 {} {}'.format(status, responses.get(status, ''))]
+        lines.extend('{}: {}'.format(name, value) for name, value in response_headers.items())
+        lines.append('Content-Length: {}'.format(len(content)))
+
+        if close:
+            lines.append('Connection: close')  # as asked by the client
+
+        self._transport.write('\r\n'.join(lines).encode('latin-1') + b'\r\n\r\n' + content)
+
+        if close:
+            self._transport.close()
+            return
+
+        self._busy = False
+        self._handle_next()
+
+
+class _Http2Handler(object):
+    '''
+    HTTP/2 side of a connection, answers every stream with the response of the stub
+    '''
+
+    def __init__(self, server, transport):
+        from h2.config import H2Configuration
+        from h2.connection import H2Connection
+
+        self._server = server
+        self._transport = transport
+        self._connection = H2Connection(H2Configuration(client_side=False, header_encoding='utf-8'))
+        self._requests = {}  # stream id -> (headers, chunks of the body)
+        self._outbound = {}  # stream id -> body left to be sent once the flow control window allows
+
+        self._connection.initiate_connection()
+        self._flush()
+
+    def data_received(self, data):
+        from h2.events import DataReceived, RequestReceived, StreamEnded, StreamReset, WindowUpdated
+        from h2.exceptions import ProtocolError
+
+        try:
+            events = self._connection.receive_data(data)
+        except ProtocolError:
+            self._flush()
+            self._transport.close()
+            return
+
+        for event in events:
+            if isinstance(event, RequestReceived):
+                self._requests[event.stream_id] = (event.headers, [])
+
+            elif isinstance(event, DataReceived):
+                self._connection.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+
+                if event.stream_id in self._requests:
+                    self._requests[event.stream_id][1].append(event.data)
+
+            elif isinstance(event, StreamEnded) and event.stream_id in self._requests:
+                headers, chunks = self._requests.pop(event.stream_id)
+                asyncio.ensure_future(self._respond(event.stream_id, headers, b''.join(chunks)))
+
+            elif isinstance(event, StreamReset):
+                self._requests.pop(event.stream_id, None)
+                self._outbound.pop(event.stream_id, None)
+
+            elif isinstance(event, WindowUpdated):
+                self._send_outbound()
+
+        self._flush()
+
+    async def _respond(self, stream_id, headers, body):
+        from h2.exceptions import StreamClosedError
+
+        pseudo_headers = dict((name, value) for name, value in headers if name.startswith(':'))
+        headers = dict((name.title(), value) for name, value in headers if not name.startswith(':'))
+
+        status, response_headers, content = await asyncio.get_event_loop().run_in_executor(
+            self._server._executor, self._server.stub.handle, pseudo_headers[':method'], pseudo_headers[':path'], headers, body
+        )
+
+        if self._transport.is_closing():
+            return
+
+        response_headers = [(':status', str(status))] + [(name.lower(), value) for name, value in response_headers.items()]
+        response_headers.append(('content-length', str(len(content))))
+
+        try:
+            self._connection.send_headers(stream_id, response_headers)
+        except StreamClosedError:
+            return  # reset by the client in the meantime
+
+        self._outbound[stream_id] = content
+        self._send_outbound()
+        self._flush()
+
+    def _send_outbound(self):
+        from h2.exceptions import StreamClosedError
+
+        for stream_id, content in list(self._outbound.items()):
+            try:
+                while True:
+                    size = min(len(content), self._connection.local_flow_control_window(stream_id), self._connection.max_outbound_frame_size)
+
+                    if content and not size:
+                        self._outbound[stream_id] = content  # waits for the window to be updated
+                        break
+
+                    self._connection.send_data(stream_id, content[:size], end_stream=size == len(content))
+                    content = content[size:]
+
+                    if not content:
+                        del self._outbound[stream_id]
+                        break
+            except StreamClosedError:
+                self._outbound.pop(stream_id, None)
+
+    def _flush(self):
+        data = self._connection.data_to_send()
+
+        if data:
+            self._transport.write(data)
+
+
+class Http2StubServer(object):
+    '''
+    HTTPS server exposing a RapidStub over HTTP/2 (and HTTP/1.1) on localhost, the requests
+    of an HTTP/2 connection are multiplexed and handled concurrently
+
+    Usage:
+        with Http2StubServer(RapidStub(), server_ssl_context) as server:
+            transport = HttpxTransport(http2=True, verify=client_ssl_context)
+    '''
+
+    def __init__(self, stub=None, ssl_context=None, host='127.0.0.1', port=0, workers=100):
+        '''
+        Initializes the server
+
+        Arguments:
+            stub        : RapidStub      = the stub to be served, default one is created if not passed
+            ssl_context : ssl.SSLContext = server side context holding the certificate of the host, the protocols
+                                           the server offers are set on it
+            host        : str            = interface to listen on
+            port        : int            = port to listen on, a free one is picked if 0
+            workers     : int            = number of requests handled by the stub at the same time
+        '''
+        try:
+            import h2
+        except ImportError:
+            raise ImportError('Http2StubServer requires h2, install it with `pip install eway-rapid-python[http2]`')
+
+        if ssl_context is None:
+            raise ValueError('Http2StubServer requires an SSL context with the certificate of the host')
+
+        ssl_context.set_alpn_protocols(['h2', 'http/1.1'])
+
+        self.stub = stub or RapidStub()
+        self.connections_count = 0
+
+        self._ssl_context = ssl_context
+        self._socket = socket.socket(socket.AF_INET6 if ':' in host else socket.AF_INET)
+        self._socket.bind((host, port))
+        self._socket.listen(1024)
+
+        self._workers = workers
+        self._executor = None
+        self._loop = None
+        self._server = None
+        self._protocols = set()
+        self._thread = None
+
+    @property
+    def url(self):
+        'URL to be used as an endpoint URL'
+        host, port = self._socket.getsockname()[:2]
+        return 'https://{}:{}/'.format('[{}]'.format(host) if ':' in host else host, port)
+
+    def start(self):
+        'Starts serving in a background thread'
+        started = Event()
+
+        self._executor = ThreadPoolExecutor(max_workers=self._workers)
+        self._loop = asyncio.new_event_loop()
+        self._thread = Thread(target=self._run, args=(started,), name='eway-rapid-http2-stub-server')
+        self._thread.daemon = True
+        self._thread.start()
+
+        started.wait()
+        return self
+
+    def stop(self):
+        'Stops the server, closes its connections and the listening socket'
+        if self._thread is not None:
+            self._loop.call_soon_threadsafe(self._close)
+            self._thread.join()
+            self._thread = None
+            self._executor.shutdown(wait=False)
+
+        self._socket.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def _run(self, started):
+        loop = self._loop
+        asyncio.set_event_loop(loop)
+
+        self._server = loop.run_until_complete(loop.create_server(lambda: _Connection(self), sock=self._socket, ssl=self._ssl_context))
+        started.set()
+
+        try:
+            loop.run_forever()
+
+            tasks = asyncio.all_tasks(loop)
+
+            for task in tasks:
+                task.cancel()
+
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        finally:
+            loop.close()
+
+    def _close(self):
+        self._server.close()
+
+        for protocol in list(self._protocols):
+            protocol.close()
+
+        self._loop.stop()
@@ -0,0 +1,435 @@
+'''
+The module contains a stand-in implementation of Rapid API for integration and load testing.
+
+RapidStub implements the Transparent Redirect routes:
+    POST AccessCodes          - creates an access code echoing the payment and customer details
+    GET  AccessCode/{code}    - returns the transaction information for the access code
+
+It has knobs for response latency, error injection and throughput, so the SDK (and applications
+built on it) can be benchmarked offline. StubServer exposes RapidStub over HTTP/1.1 with keep-alive.
+
+The server can also be started from the command line:
+
+    python -m eway.rapid.testing --port 8080 --latency exponential:0.05 --error S9996:0.01 --error D4405:0.1
+'''
+
+import json
+import random
+import socket
+import sys
+import time
+
+from argparse import ArgumentParser
+from base64 import b64encode
+from collections import OrderedDict
+from itertools import count
+from threading import Lock, Thread
+from uuid import uuid4
+
+from six.moves.BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+from six.moves.socketserver import ThreadingMixIn
+
+from eway.rapid.exception import EwayError
+from eway.rapid.model import Customer
+
+
+def constant_latency(seconds):
+    'Returns a latency distribution always giving the same value'
+    return lambda rnd: seconds
+
+
+def uniform_latency(low, high):
+    'Returns a latency distribution giving values uniformly distributed between low and high'
+    return lambda rnd: rnd.uniform(low, high)
+
+
+def exponential_latency(mean):
+    'Returns a latency distribution giving exponentially distributed values with the mean passed'
+    return lambda rnd: rnd.expovariate(1.0 / mean)
+
+
+def lognormal_latency(median, sigma=0.5):
+    'Returns a latency distribution with a long tail, typical for network services'
+    return lambda rnd: median * rnd.lognormvariate(0, sigma)
+
+
+LATENCY_DISTRIBUTIONS = {
+    'constant': constant_latency,
+    'uniform': uniform_latency,
+    'exponential': exponential_latency,
+    'lognormal': lognormal_latency
+}
+
+
+# HTTP responses emulating the SDK Response Codes the client detects by itself
+_SDK_ERROR_RESPONSES = {
+    'S9990': (404, b'{"Message":"No HTTP resource was found that matches the request URI"}'),
+    'S9901': (200, b'<html><body>Gateway maintenance</body></html>'),
+    'S9902': (200, b''),
+    'S9993': (401, b'{"Message":"Authorization has been denied for this request."}'),
+    'S9996': (503, b'{"Message":"Service Unavailable"}')
+}
+
+# Bank response codes accompanying the transaction response messages
+_RESPONSE_CODES = {
+    'D4401': '01', 'D4405': '05', 'D4412': '12', 'D4413': '13', 'D4414': '14', 'D4433': '33',
+    'D4451': '51', 'D4454': '54', 'D4457': '57', 'D4482': '82', 'D4491': '91', 'D4494': '94'
+}
+
+
+class RapidStub(object):
+    '''
+    In-memory implementation of the Transparent Redirect routes of Rapid API
+
+    Attributes:
+        requests_count : int = number of requests handled so far
+    '''
+
+    requests_count = 0
+
+    def __init__(self, latency=None, errors=None, throughput=None, credentials=None, strict=False, capacity=100000, seed=None):
+        '''
+        Initializes the stub
+
+        Arguments:
+            latency     : callable(random.Random) -> float = distribution of the response latency in seconds, e.g. `exponential_latency(0.05)`
+            errors      : {str: float}                    = error codes to be injected along with their probability, e.g. {'S9996': 0.01}
+                                                             S99xx codes are emulated by HTTP statuses or malformed bodies,
+                                                             D44xx codes decline transactions on `AccessCode/{code}`,
+                                                             any other code is returned in the `Errors` field of the response
+            throughput  : float                           = maximum number of requests per second, excess requests are queued
+            credentials : (str, str)                      = API key and password to be checked, any credentials are accepted if not set
+            strict      : bool                            = whether unknown access codes are reported as not found
+                                                            instead of being answered with an approved transaction
+            capacity    : int                             = number of access codes remembered, the oldest ones are forgotten first
+            seed        : int                             = seed of the random generator to make runs reproducible
+        '''
+        self._latency = latency
+        self._errors = list((errors or {}).items())
+        self._interval = 1.0 / throughput if throughput else None
+        self._authorization = None
+        self._strict = strict
+        self._capacity = capacity
+
+        if credentials:
+            token = b64encode('{}:{}'.format(*credentials).encode('utf-8')).decode('ascii')
+            self._authorization = 'Basic {}'.format(token)
+
+        self._random = random.Random(seed)
+        self._lock = Lock()
+        self._next_slot = 0.0
+        self._transaction_ids = count(10000000)
+        self._access_codes = OrderedDict()
+
+    def handle(self, method, path, headers=None, body=b''):
+        '''
+        Handles a request to the stub
+
+        Arguments:
+            method  : str        = HTTP method
+            path    : str        = path of the URL, may contain a prefix before the route
+            headers : {str: str} = HTTP headers of the request
+            body    : bytes      = body of the request
+
+        Returns:
+            (int, {str: str}, bytes) = HTTP status, headers and body of the response
+        '''
+        with self._lock:
+            self.requests_count += 1
+            delay = self._throttle() + (self._latency(self._random) if self._latency else 0)
+            error = self._pick_error()
+
+        if delay > 0:
+            time.sleep(delay)
+
+        if self._authorization and (headers or {}).get('Authorization') != self._authorization:
+            error = 'S9993'
+
+        path = path.split('?', 1)[0]
+
+        if method == 'POST' and path.endswith('/AccessCodes'):
+            status, body = self._create_access_code(body, error)
+
+        elif method == 'GET' and '/AccessCode/' in path:
+            status, body = self._get_transaction_info(path.rsplit('/', 1)[-1], error)
+
+        else:
+            status, body = _SDK_ERROR_RESPONSES['S9990']
+
+        return status, {'Content-Type': 'application/json; charset=utf-8'}, body
+
+    def _throttle(self):
+        if not self._interval:
+            return 0
+
+        now = time.time()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self._interval
+
+        return slot - now
+
+    def _pick_error(self):
+        for code, probability in self._errors:
+            if self._random.random() < probability:
+                return code
+
+        return None
+
+    def _create_access_code(self, body, error):
+        if error in _SDK_ERROR_RESPONSES:
+            return _SDK_ERROR_RESPONSES[error]
+
+        try:
+            request = json.loads(body.decode('utf-8'))
+        except ValueError:
+            return 200, _dumps({'Errors': 'V6000'})
+
+        payment = request.get('Payment') or {}
+        errors = None
+
+        if error and not error.startswith('D'):
+            errors = error
+        elif not request.get('RedirectUrl'):
+            errors = 'V6047'
+        elif not isinstance(payment.get('TotalAmount', 0), int) or payment.get('TotalAmount', 0) < 0:
+            errors = 'V6011'
+
+        access_code = None if errors else 'A1001{}'.format(uuid4().hex.upper() * 3)
+
+        customer = dict((field, None) for field in Customer.__dict__ if not field.startswith('_') and not callable(Customer.__dict__[field]))
+        customer.update(IsActive=False, CardExpiryMonth='', CardExpiryYear='', CardNumber='', CardName='')
+        customer.update(request.get('Customer') or {})
+
+        response = {
+            'AccessCode': access_code,
+            'Customer': customer,
+            'Payment': {
+                'TotalAmount': payment.get('TotalAmount', 0),
+                'InvoiceNumber': payment.get('InvoiceNumber'),
+                'InvoiceDescription': payment.get('InvoiceDescription'),
+                'InvoiceReference': payment.get('InvoiceReference'),
+                'CurrencyCode': payment.get('CurrencyCode') or 'AUD'
+            },
+            'FormActionURL': 'https://secure-au.sandbox.ewaypayments.com/AccessCode/{}'.format(access_code) if access_code else None,
+            'CompleteCheckoutURL': None,
+            'Errors': errors
+        }
+
+        if access_code:
+            with self._lock:
+                self._access_codes[access_code] = (response['Payment'], request.get('Options') or [])
+
+                while len(self._access_codes) > self._capacity:
+                    self._access_codes.popitem(last=False)
+
+        return 200, _dumps(response)
+
+    def _get_transaction_info(self, access_code, error):
+        if error in _SDK_ERROR_RESPONSES:
+            return _SDK_ERROR_RESPONSES[error]
+
+        with self._lock:
+            known = self._access_codes.get(access_code)
+
+        if known is None and self._strict:
+            return 200, _dumps({'Message': 'Access Code Not Found'})
+
+        payment, options = known or ({'TotalAmount': 0}, [])
+        declined = bool(error and error.startswith('D'))
+
+        response = {
+            'AccessCode': access_code,
+            'AuthorisationCode': None if declined else '{:06d}'.format(self._random.randint(0, 999999)),
+            'ResponseCode': _RESPONSE_CODES.get(error, '05') if declined else '00',
+            'ResponseMessage': error if declined else 'A2000',
+            'InvoiceNumber': payment.get('InvoiceNumber'),
+            'InvoiceReference': payment.get('InvoiceReference'),
+            'TotalAmount': payment.get('TotalAmount'),
+            'TransactionID': next(self._transaction_ids),
+            'TransactionStatus': not declined,
+            'TokenCustomerID': None,
+            'BeagleScore': 0,
+            'Options': options,
+            'Verification': {'CVN': 0, 'Address': 0, 'Email': 0, 'Mobile': 0, 'Phone': 0},
+            'BeagleVerification': {'Email': 0, 'Phone': 0},
+            'Errors': error if error and not declined else None
+        }
+
+        return 200, _dumps(response)
+
+
+def _dumps(data):
+    return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+
+class _StubRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        BaseHTTPRequestHandler.setup(self)
+        self.server.count_connection()
+
+    def do_GET(self):
+        self._respond(b'')
+
+    def do_POST(self):
+        self._respond(self.rfile.read(int(self.headers.get('Content-Length') or 0)))
+
+    def _respond(self, body):
+        headers = dict((name.title(), value) for name, value in self.headers.items())  # python 2 lower-cases the names
+        status, headers, body = self.server.stub.handle(self.command, self.path, headers, body)
+
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        if self.close_connection:
+            self.send_header('Connection', 'close')  # as asked by the client
+        self.end_headers()
+
+        if self.server.drip is None:
+            self.wfile.write(body)
+        else:
+            for index in range(len(body)):  # the body trickles in
+                time.sleep(self.server.drip)
+                self.wfile.write(body[index:index + 1])
+
+    def log_message(self, format, *args):
+        pass
+
+
+try:
+    _CONNECTION_ERRORS = ConnectionError
+except NameError:
+    _CONNECTION_ERRORS = socket.error  # python 2
+
+
+class _ThreadingStubServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+    drip = None
+
+    def __init__(self, server_address, handler_class):
+        HTTPServer.__init__(self, server_address, handler_class)
+        self.connections_count = 0
+        self._connections_lock = Lock()
+
+    def count_connection(self):
+        with self._connections_lock:  # every connection is handled by a thread of its own
+            self.connections_count += 1
+
+    def handle_error(self, request, client_address):
+        # clients giving up on slow responses (timeouts, deadlines) are part of the game
+        if not isinstance(sys.exc_info()[1], _CONNECTION_ERRORS):
+            HTTPServer.handle_error(self, request, client_address)
+
+
+class StubServer(object):
+    '''
+    HTTP server exposing a RapidStub on localhost
+
+    Usage:
+        with StubServer(RapidStub()) as server:
+            endpoint = GenericEndpoint().set_url(server.url)
+    '''
+
+    def __init__(self, stub=None, host='127.0.0.1', port=0, drip=None, ssl_context=None):
+        '''
+        Initializes the server
+
+        Arguments:
+            stub        : RapidStub      = the stub to be served, default one is created if not passed
+            host        : str            = interface to listen on
+            port        : int            = port to listen on, a free one is picked if 0
+            drip        : float          = seconds between the bytes of the response bodies, which are written at once if None
+            ssl_context : ssl.SSLContext = server side context holding the certificate of the host, HTTPS is served
+                                           (HTTP/1.1 only) if passed
+        '''
+        self.stub = stub or RapidStub()
+        self._server = _ThreadingStubServer((host, port), _StubRequestHandler)
+        self._server.stub = self.stub
+        self._server.drip = drip
+        self._thread = None
+        self._scheme = 'http'
+
+        if ssl_context is not None:
+            ssl_context.set_alpn_protocols(['http/1.1'])
+            self._server.socket = ssl_context.wrap_socket(self._server.socket, server_side=True)
+            self._scheme = 'https'
+
+    @property
+    def url(self):
+        'URL to be used as an endpoint URL'
+        host, port = self._server.server_address[:2]
+        return '{}://{}:{}/'.format(self._scheme, host, port)
+
+    @property
+    def connections_count(self):
+        'Number of TCP connections accepted so far'
+        return self._server.connections_count
+
+    def start(self):
+        'Starts serving in a background thread'
+        self._thread = Thread(target=self._server.serve_forever, name='eway-rapid-stub-server')
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        'Stops the server and closes the listening socket'
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+def _parse_latency(value):
+    name, _, args = value.partition(':')
+
+    if name not in LATENCY_DISTRIBUTIONS:
+        raise ValueError('Unknown latency distribution: {}'.format(name))
+
+    return LATENCY_DISTRIBUTIONS[name](*[float(arg) for arg in args.split(',') if arg])
+
+
+def _parse_error(value):
+    code, _, probability = value.partition(':')
+
+    if code not in _SDK_ERROR_RESPONSES and EwayError.lookup_error_by_code(code) is None:
+        raise ValueError('Unknown error code: {}'.format(code))
+
+    return code, float(probability or 1)
+
+
+def main(argv=None):
+    parser = ArgumentParser(description='Stand-in Rapid API server for integration and load testing')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency', type=_parse_latency, help='distribution:args, e.g. constant:0.1, uniform:0.05,0.2, exponential:0.05, lognormal:0.05,0.5')
+    parser.add_argument('--error', type=_parse_error, action='append', default=[], help='code:probability, e.g. S9996:0.01, may be repeated')
+    parser.add_argument('--throughput', type=float, help='maximum number of requests per second')
+    parser.add_argument('--strict', action='store_true', help='report unknown access codes as not found')
+    parser.add_argument('--seed', type=int)
+
+    args = parser.parse_args(argv)
+
+    stub = RapidStub(latency=args.latency, errors=OrderedDict(args.error), throughput=args.throughput, strict=args.strict, seed=args.seed)
+    server = StubServer(stub, args.host, args.port)
+
+    print('Serving Rapid API stub at {}'.format(server.url))
+
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
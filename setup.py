@@ -7,7 +7,8 @@ from setuptools import setup, find_packages
 
 requirements = [
     'requests>=2.10.0',
-    'six>=1.10.0'
+    'six>=1.10.0',
+    'urllib3>=1.21.1,<3'  # the connection warm-up relies on the internals of the pools of these versions
 ]
 
 
@@ -15,13 +16,17 @@ if version_info.major < 3 or (version_info.major == 3 and version_info.minor < 4
     requirements.append('enum34>=1.1.6')
 
 
+if version_info.major < 3:
+    requirements.append('futures>=3.0.5')
+
+
 setup(
     name = 'eway-rapid-python',
     description = 'Python client implementation for eWAY Rapid API v3',
     version = '0.8',
     packages = find_packages(exclude=('tests',)),
     install_requires = requirements,
-    extras_require = {'testing': ['hypothesis>=3.1.3', 'coverage']},
+    extras_require = {'testing': ['hypothesis>=3.1.3', 'coverage', 'trustme'], 'async': ['httpx>=0.23.0'], 'http2': ['httpx[http2]>=0.23.0'], 'fast': ['orjson']},
     author = 'Sergey Latyntsev at Springload',
     author_email = 'dnsl48@gmail.com',
     license = 'MIT',
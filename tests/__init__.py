@@ -1,2 +1,19 @@
 from .model import *
-from .transparent_redirect import *
\ No newline at end of file
+from .exception import *
+from .codec import *
+from .transparent_redirect import *
+from .client import *
+from .server import *
+from .retry import *
+from .circuit_breaker import *
+from .timeout import *
+from .checkpoint import *
+from .cache import *
+from .single_flight import *
+from .observer import *
+from .rate_limit import *
+from .transport import *
+from .http2 import *
+from .warm_up import *
+from .failover import *
+from .hedging import *
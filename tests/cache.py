@@ -0,0 +1,141 @@
+import asyncio
+import json
+import unittest
+
+
+try:
+    import eway
+except:
+    from os.path import dirname, join
+    from sys import path
+    path.append(join(dirname(__file__), '..'))
+
+
+from eway.rapid.cache import ResultCache, is_final
+from eway.rapid.exception import SysError
+from eway.rapid.payment_method.transparent_redirect import AsyncTransparentRedirect, TransparentRedirect
+from eway.rapid.payment_method.transparent_redirect.response import TransactionInfo
+
+from .helpers import Clock
+
+
+class InfoClient(object):
+    '''
+    Client stub answering transaction info requests with the responses set per access code
+    '''
+    def __init__(self, **responses):
+        self.responses = responses
+        self.calls = []
+
+    def transparent_redirect_get_transaction_info(self, access_code):
+        self.calls.append(access_code)
+        return json.dumps(self.responses[access_code])
+
+
+class AsyncInfoClient(InfoClient):
+    async def transparent_redirect_get_transaction_info(self, access_code):
+        return InfoClient.transparent_redirect_get_transaction_info(self, access_code)
+
+
+APPROVED = {'AccessCode': 'approved', 'TransactionID': 1, 'TransactionStatus': True, 'ResponseMessage': 'A2000'}
+DECLINED = {'AccessCode': 'declined', 'TransactionID': 2, 'TransactionStatus': False, 'ResponseMessage': 'D4405'}
+INCOMPLETE = {'AccessCode': 'incomplete', 'TransactionID': None, 'TransactionStatus': False, 'Errors': 'S5099'}
+PENDING = {'AccessCode': 'pending', 'TransactionID': None, 'TransactionStatus': None}
+
+
+class TestResultCache(unittest.TestCase):
+    def test_lru_eviction(self):
+        cache = ResultCache(maxsize=2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+
+        self.assertEqual(cache.get('a'), 1)
+
+        cache.put('c', 3)
+
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('c'), 3)
+        self.assertEqual(len(cache), 2)
+
+    def test_ttl(self):
+        clock = Clock()
+        cache = ResultCache(ttl=10, clock=clock)
+        cache.put('a', 1)
+
+        clock.now = 9
+        self.assertEqual(cache.get('a'), 1)
+
+        clock.now = 10
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(len(cache), 0)
+
+    def test_counters(self):
+        cache = ResultCache()
+        cache.put('a', 1)
+
+        cache.get('a')
+        cache.get('a')
+        cache.get('b')
+
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+        self.assertEqual(cache.get_stats(), {'size': 1, 'maxsize': 10000, 'hits': 2, 'misses': 1, 'hit_rate': 2 / 3.0})
+
+        cache.clear()
+        self.assertEqual((len(cache), cache.hits, cache.misses), (0, 0, 0))
+
+    def test_is_final(self):
+        self.assertTrue(is_final(TransactionInfo.from_json(json.dumps(APPROVED))))
+        self.assertTrue(is_final(TransactionInfo.from_json(json.dumps(DECLINED))))
+        self.assertFalse(is_final(TransactionInfo.from_json(json.dumps(PENDING))))
+
+
+class TestTransparentRedirectResultCache(unittest.TestCase):
+    def test_final_results_are_cached(self):
+        client = InfoClient(approved=APPROVED, declined=DECLINED)
+        cache = ResultCache()
+        method = TransparentRedirect(client, result_cache=cache)
+
+        info = method.request_transaction_result('approved')
+
+        self.assertIs(method.request_transaction_result('approved'), info)
+        self.assertIs(TransparentRedirect(client, result_cache=cache).request_transaction_result('approved'), info)
+
+        method.request_transaction_result('declined')
+        method.request_transaction_result('declined')
+
+        self.assertEqual(client.calls, ['approved', 'declined'])
+        self.assertEqual(cache.hits, 3)
+
+    def test_incomplete_results_are_not_cached(self):
+        client = InfoClient(incomplete=INCOMPLETE, pending=PENDING)
+        method = TransparentRedirect(client, result_cache=ResultCache())
+
+        for _ in range(2):
+            with self.assertRaises(SysError):
+                method.request_transaction_result('incomplete')
+
+            method.request_transaction_result('pending')
+
+        self.assertEqual(client.calls, ['incomplete', 'pending'] * 2)
+
+    def test_no_cache(self):
+        client = InfoClient(approved=APPROVED)
+        method = TransparentRedirect(client)
+
+        method.request_transaction_result('approved')
+        method.request_transaction_result('approved')
+
+        self.assertEqual(client.calls, ['approved', 'approved'])
+
+    def test_async(self):
+        client = AsyncInfoClient(approved=APPROVED)
+        method = AsyncTransparentRedirect(client, result_cache=ResultCache())
+
+        async def run():
+            return [await method.request_transaction_result('approved') for _ in range(3)]
+
+        results = asyncio.run(run())
+
+        self.assertIs(results[0], results[2])
+        self.assertEqual(client.calls, ['approved'])
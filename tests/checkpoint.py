@@ -0,0 +1,222 @@
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+
+try:
+    import eway
+except:
+    from os.path import dirname, join
+    from sys import path
+    path.append(join(dirname(__file__), '..'))
+
+
+from eway.rapid.checkpoint import FileCheckpoint, MemoryCheckpoint, _Progress
+from eway.rapid.exception import ValidationError
+from eway.rapid.payment_method.transparent_redirect import AsyncTransparentRedirect, TransparentRedirect
+from eway.rapid.payment_method.transparent_redirect.response import TransactionInfo
+
+
+class LookupClient(object):
+    '''
+    Client stub answering transaction info requests, access codes starting with "V" are answered with the validation error
+    '''
+    def __init__(self, delay=0):
+        self.delay = delay
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def response(self, access_code):
+        with self.lock:
+            self.calls.append(access_code)
+
+        if access_code.startswith('V'):
+            return json.dumps({'AccessCode': access_code, 'Errors': access_code})
+
+        return json.dumps({'AccessCode': access_code, 'TransactionStatus': True})
+
+    def transparent_redirect_get_transaction_info(self, access_code):
+        time.sleep(self.delay)
+        return self.response(access_code)
+
+
+class AsyncLookupClient(LookupClient):
+    async def transparent_redirect_get_transaction_info(self, access_code):
+        await asyncio.sleep(self.delay)
+        return self.response(access_code)
+
+
+def access_codes(count):
+    return ['code-{}'.format(number) for number in range(count)]
+
+
+class TestProgress(unittest.TestCase):
+    def test_low_water_mark(self):
+        checkpoint = MemoryCheckpoint()
+        progress = _Progress(checkpoint)
+
+        for position in (1, 2, 4):
+            progress.complete(position)
+
+        self.assertEqual(checkpoint.load(), (0, {1, 2, 4}))
+
+        progress.complete(0)
+        self.assertEqual(checkpoint.load(), (3, {4}))
+
+        progress.complete(3)
+        self.assertEqual(checkpoint.load(), (5, set()))
+
+    def test_pending_skips_done(self):
+        checkpoint = MemoryCheckpoint()
+        checkpoint.update(2, {3, 5})
+
+        self.assertEqual(list(_Progress(checkpoint).pending('abcdefg')), [(2, 'c'), (4, 'e'), (6, 'g')])
+
+
+    def test_window(self):
+        checkpoint = MemoryCheckpoint()
+        checkpoint.update(10, {12})
+        progress = _Progress(checkpoint, max_concurrency=1)
+
+        self.assertTrue(progress.admits((25, 'z')))
+        self.assertFalse(progress.admits((26, 'z')))
+        self.assertTrue(_Progress(checkpoint).admits((10000, 'z')))
+
+
+class RecordingCheckpoint(MemoryCheckpoint):
+    max_done = 0
+
+    def update(self, position, done):
+        super(RecordingCheckpoint, self).update(position, done)
+        self.max_done = max(self.max_done, len(done))
+
+
+class SlowFirstLookupClient(LookupClient):
+    def transparent_redirect_get_transaction_info(self, access_code):
+        time.sleep(0.2 if access_code == 'code-0' else 0)
+        return self.response(access_code)
+
+
+class AsyncSlowFirstLookupClient(LookupClient):
+    async def transparent_redirect_get_transaction_info(self, access_code):
+        await asyncio.sleep(0.2 if access_code == 'code-0' else 0)
+        return self.response(access_code)
+
+
+class TestFileCheckpoint(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, 'checkpoint.json')
+
+    def test_missing_file(self):
+        self.assertEqual(FileCheckpoint(self.path).load(), (0, set()))
+
+    def test_saves_periodically(self):
+        checkpoint = FileCheckpoint(self.path, save_every=2)
+
+        checkpoint.update(1, {3})
+        self.assertFalse(os.path.exists(self.path))
+
+        checkpoint.update(2, {3})
+        self.assertEqual(FileCheckpoint(self.path).load(), (2, {3}))
+
+        checkpoint.update(4, set())
+        checkpoint.flush()
+        self.assertEqual(FileCheckpoint(self.path).load(), (4, set()))
+
+        checkpoint.remove()
+        self.assertFalse(os.path.exists(self.path))
+
+
+class TestRequestTransactionResults(unittest.TestCase):
+    def test_results(self):
+        client = LookupClient()
+        results = dict(TransparentRedirect(client).request_transaction_results(access_codes(20) + ['V6021'], max_concurrency=4))
+
+        self.assertEqual(len(results), 21)
+        self.assertIsInstance(results['code-7'], TransactionInfo)
+        self.assertTrue(results['code-7'].TransactionStatus)
+        self.assertIsInstance(results['V6021'], ValidationError)
+
+    def test_ordered(self):
+        codes = access_codes(30)
+        results = TransparentRedirect(LookupClient()).request_transaction_results(codes, max_concurrency=5, ordered=True)
+
+        self.assertEqual([code for code, info in results], codes)
+
+    def test_input_is_consumed_lazily(self):
+        taken = []
+
+        def codes():
+            for code in access_codes(1000):
+                taken.append(code)
+                yield code
+
+        results = TransparentRedirect(LookupClient()).request_transaction_results(codes(), max_concurrency=4, checkpoint=MemoryCheckpoint())
+        next(results)
+
+        self.assertLessEqual(len(taken), 5)
+        results.close()
+
+    def test_resume(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'checkpoint.json')
+
+        codes = access_codes(100)
+        client = LookupClient(delay=0.001)
+        method = TransparentRedirect(client)
+
+        first_run = []
+        for access_code, info in method.request_transaction_results(codes, max_concurrency=4, checkpoint=FileCheckpoint(path, save_every=10)):
+            first_run.append(access_code)
+
+            if len(first_run) == 30:
+                break  # interrupted while handling the 30th result
+
+        client.calls = []
+        second_run = [code for code, info in method.request_transaction_results(codes, max_concurrency=4, checkpoint=FileCheckpoint(path))]
+
+        self.assertEqual(set(first_run) | set(second_run), set(codes))
+        self.assertEqual(set(first_run) & set(second_run), {first_run[-1]})
+        self.assertEqual(sorted(client.calls), sorted(second_run))
+        self.assertEqual(FileCheckpoint(path).load(), (100, set()))
+
+    def test_slow_item_bounds_progress(self):
+        checkpoint = RecordingCheckpoint()
+        method = TransparentRedirect(SlowFirstLookupClient())
+
+        results = [code for code, info in method.request_transaction_results(access_codes(500), max_concurrency=2, checkpoint=checkpoint)]
+
+        self.assertEqual(sorted(results), sorted(access_codes(500)))
+        self.assertLessEqual(checkpoint.max_done, 2 * 16)
+        self.assertEqual(checkpoint.load(), (500, set()))
+
+    def test_async(self):
+        checkpoint = MemoryCheckpoint()
+        checkpoint.update(10, {12})
+
+        async def run():
+            method = AsyncTransparentRedirect(AsyncLookupClient(delay=0.001))
+            return [code async for code, info in method.request_transaction_results(access_codes(20), max_concurrency=4, checkpoint=checkpoint)]
+
+        results = asyncio.run(run())
+
+        self.assertEqual(sorted(results), sorted(code for code in access_codes(20)[10:] if code != 'code-12'))
+        self.assertEqual(checkpoint.load(), (20, set()))
+
+    def test_async_slow_item_bounds_progress(self):
+        checkpoint = RecordingCheckpoint()
+
+        async def run():
+            method = AsyncTransparentRedirect(AsyncSlowFirstLookupClient())
+            return [code async for code, info in method.request_transaction_results(access_codes(500), max_concurrency=2, checkpoint=checkpoint)]
+
+        self.assertEqual(len(asyncio.run(run())), 500)
+        self.assertLessEqual(checkpoint.max_done, 2 * 16)
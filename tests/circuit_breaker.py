@@ -0,0 +1,231 @@
+import asyncio
+import unittest
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+
+try:
+    import eway
+except:
+    from os.path import dirname, join
+    from sys import path
+    path.append(join(dirname(__file__), '..'))
+
+
+from eway.rapid.circuit_breaker import CircuitBreaker
+from eway.rapid.client import AsyncRestClient, RestClient
+from eway.rapid.deadline import Deadline
+from eway.rapid.endpoint import GenericEndpoint
+from eway.rapid.exception import RequestTimeoutError, ResponseError
+from eway.rapid.payment_method.transparent_redirect import TransparentRedirect
+from eway.rapid.testing import RapidStub, StubServer
+
+from .helpers import Clock
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def make_breaker(self, **kwargs):
+        self.clock = Clock()
+        kwargs.setdefault('minimum_calls', 4)
+        kwargs.setdefault('open_duration', 10)
+        return CircuitBreaker(clock=self.clock, seed=1, **kwargs)
+
+    def succeed(self, breaker, latency=0.01):
+        with breaker.call():
+            self.clock.now += latency
+
+    def fail(self, breaker, error=None):
+        try:
+            with breaker.call():
+                raise error or ResponseError('S9996')
+        except ResponseError:
+            pass
+
+    def test_opens_on_failure_rate(self):
+        breaker = self.make_breaker(failure_rate_threshold=0.5)
+
+        self.succeed(breaker)
+        self.fail(breaker)
+        self.succeed(breaker)
+        self.assertEqual(breaker.get_state(), CircuitBreaker.CLOSED)
+
+        self.fail(breaker)
+        self.assertEqual(breaker.get_state(), CircuitBreaker.OPEN)
+        self.assertTrue(breaker.is_open())
+
+        with self.assertRaises(ResponseError) as err:
+            breaker.call()
+
+        self.assertEqual(err.exception._code, 'S9992')
+
+    def test_request_errors_are_not_failures(self):
+        breaker = self.make_breaker()
+
+        for _ in range(10):
+            self.fail(breaker, ResponseError('S9993'))
+
+        self.assertEqual(breaker.get_state(), CircuitBreaker.CLOSED)
+        self.assertEqual(breaker.get_stats()['failure_rate'], 0)
+
+    def test_opens_on_slow_calls(self):
+        breaker = self.make_breaker(slow_call_duration=1.0, slow_call_rate_threshold=0.75)
+
+        for latency in (0.1, 2, 2, 2):
+            self.succeed(breaker, latency)
+
+        self.assertEqual(breaker.get_state(), CircuitBreaker.OPEN)
+
+    def test_window(self):
+        breaker = self.make_breaker(window=5)
+
+        self.fail(breaker)
+        self.fail(breaker)
+        self.clock.now += 10
+        self.succeed(breaker)
+        self.fail(breaker)
+
+        self.assertEqual(breaker.get_stats()['calls'], 2)
+        self.assertEqual(breaker.get_state(), CircuitBreaker.CLOSED)
+
+    def test_half_open_restores_traffic_gradually(self):
+        breaker = self.make_breaker(probe_ratio=0.25)
+
+        for _ in range(4):
+            self.fail(breaker)
+
+        self.clock.now += 10
+        self.assertEqual(breaker.get_state(), CircuitBreaker.HALF_OPEN)
+        self.assertEqual(breaker.get_stats()['admit_ratio'], 0.25)
+
+        # while a probe is in flight, other requests are sampled
+        probe = breaker.call()
+        admitted = 0
+
+        for _ in range(1000):
+            try:
+                breaker.call()
+                admitted += 1
+            except ResponseError:
+                pass
+
+        self.assertTrue(150 < admitted < 350, admitted)
+
+        breaker.reset()
+        for _ in range(4):
+            self.fail(breaker)
+
+        self.clock.now += 10
+        self.succeed(breaker)
+        self.assertEqual(breaker.get_stats()['admit_ratio'], 0.5)
+
+        self.succeed(breaker)
+        self.assertEqual(breaker.get_state(), CircuitBreaker.CLOSED)
+
+    def test_failed_probe_opens_again(self):
+        breaker = self.make_breaker()
+
+        for _ in range(4):
+            self.fail(breaker)
+
+        self.clock.now += 10
+        self.fail(breaker)
+
+        self.assertEqual(breaker.get_state(), CircuitBreaker.OPEN)
+        self.clock.now += 9
+        self.assertEqual(breaker.get_state(), CircuitBreaker.OPEN)
+
+    def test_cancelled_calls_are_not_recorded(self):
+        breaker = self.make_breaker()
+
+        for _ in range(4):
+            with self.assertRaises(GeneratorExit):
+                with breaker.call():
+                    raise GeneratorExit()
+
+        self.assertEqual(breaker.get_state(), CircuitBreaker.CLOSED)
+        self.assertEqual(breaker.get_stats()['calls'], 0)
+
+    def test_stats(self):
+        breaker = self.make_breaker()
+
+        for latency in range(1, 101):
+            self.succeed(breaker, latency / 1000.0)
+
+        stats = breaker.get_stats()
+
+        self.assertEqual(stats['calls'], 100)
+        self.assertAlmostEqual(stats['p50'], 0.051)
+        self.assertAlmostEqual(stats['p99'], 0.1)
+        self.assertEqual(stats['failure_rate'], 0)
+
+
+class TestEndpointCircuitBreaker(unittest.TestCase):
+    def test_client_fails_fast(self):
+        server = StubServer(RapidStub(errors={'S9996': 1})).start()
+        self.addCleanup(server.stop)
+
+        breaker = CircuitBreaker(minimum_calls=2, open_duration=60)
+        endpoint = GenericEndpoint().set_url(server.url).set_circuit_breaker(breaker)
+        self.assertIs(endpoint.get_circuit_breaker(), breaker)
+
+        client = RestClient('api-key', 'api-password', endpoint)
+        self.addCleanup(client.close)
+        method = TransparentRedirect(client)
+
+        for code in ('S9996', 'S9996', 'S9992', 'S9992'):
+            with self.assertRaises(ResponseError) as err:
+                method.request_transaction_result('code')
+
+            self.assertEqual(err.exception._code, code)
+
+        self.assertEqual(server.stub.requests_count, 2)
+        self.assertEqual(breaker.get_state(), CircuitBreaker.OPEN)
+
+    def half_open_endpoint(self):
+        clock = Clock()
+        breaker = CircuitBreaker(minimum_calls=2, open_duration=10, probe_ratio=0.01, seed=1, clock=clock)
+
+        for _ in range(2):
+            with self.assertRaises(ResponseError):
+                with breaker.call():
+                    raise ResponseError('S9996')
+
+        clock.now += 10
+        self.assertEqual(breaker.get_state(), CircuitBreaker.HALF_OPEN)
+
+        return GenericEndpoint().set_url('http://127.0.0.1:1/').set_circuit_breaker(breaker)
+
+    def assertProbeAvailable(self, breaker):
+        # a leaked probe would leave the next calls to the sampling, which lets 1% of them through
+        with breaker.call():
+            pass
+
+        self.assertEqual(breaker.get_stats()['admit_ratio'], 0.02)
+
+    def test_expired_deadline_keeps_the_probe(self):
+        endpoint = self.half_open_endpoint()
+        client = RestClient('api-key', 'api-password', endpoint)
+        self.addCleanup(client.close)
+
+        with self.assertRaises(RequestTimeoutError) as err:
+            TransparentRedirect(client).request_transaction_result('code', deadline=Deadline(0))
+
+        self.assertEqual(err.exception._code, 'ST003')
+        self.assertProbeAvailable(endpoint.get_circuit_breaker())
+
+    @unittest.skipIf(httpx is None, 'httpx is not installed')
+    def test_async_expired_deadline_keeps_the_probe(self):
+        endpoint = self.half_open_endpoint()
+
+        async def run():
+            async with AsyncRestClient('api-key', 'api-password', endpoint) as client:
+                await client.transparent_redirect_get_transaction_info('code', Deadline(0))
+
+        with self.assertRaises(RequestTimeoutError) as err:
+            asyncio.run(run())
+
+        self.assertEqual(err.exception._code, 'ST003')
+        self.assertProbeAvailable(endpoint.get_circuit_breaker())
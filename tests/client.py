@@ -0,0 +1,181 @@
+import asyncio
+import json
+import unittest
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+
+try:
+    import eway
+except:
+    from os.path import dirname, join
+    from sys import path
+    path.append(join(dirname(__file__), '..'))
+
+
+from eway.rapid.client import AsyncRestClient, RestClient, RestClientMixin
+from eway.rapid.endpoint import SandboxEndpoint
+from eway.rapid.exception import ResponseError
+from eway.rapid.model import Payment, RequestMethod, TransactionType
+from eway.rapid.payment_method.transparent_redirect import AsyncTransparentRedirect, CreateAccessCodeRequest
+from eway.rapid.retry import RetryPolicy
+
+
+class TestRestClientSession(unittest.TestCase):
+    def make_client(self, **kwargs):
+        return RestClient('api-key', 'api-password', SandboxEndpoint(), **kwargs)
+
+    def test_session_is_reused(self):
+        client = self.make_client()
+
+        self.assertIs(client._transport._get_session(), client._transport._get_session())
+
+    def test_pool_settings(self):
+        client = self.make_client(pool_connections=3, pool_maxsize=42, pool_block=True)
+        adapter = client._transport._get_session().get_adapter(SandboxEndpoint().get_url())
+
+        self.assertEqual(adapter._pool_connections, 3)
+        self.assertEqual(adapter._pool_maxsize, 42)
+        self.assertTrue(adapter._pool_block)
+
+    def test_credentials_are_set_on_session(self):
+        client = self.make_client()
+
+        self.assertEqual(client._transport._get_session().auth, ('api-key', 'api-password'))
+
+    def test_keep_alive_disabled(self):
+        client = self.make_client(keep_alive=False)
+
+        self.assertEqual(client._transport._get_session().headers['Connection'], 'close')
+
+    def test_close_and_reopen(self):
+        client = self.make_client()
+        session = client._transport._get_session()
+
+        client.close()
+        self.assertIsNone(client._transport._session)
+
+        self.assertIsNot(client._transport._get_session(), session)
+
+    def test_context_manager_closes_session(self):
+        with self.make_client() as client:
+            self.assertIsNotNone(client._transport._session)
+
+        self.assertIsNone(client._transport._session)
+
+
+class FakeResponse(object):
+    def __init__(self, status_code, content, content_type='application/json'):
+        self.status_code = status_code
+        self.content = content
+        self.headers = {'Content-Type': content_type} if content_type else {}
+
+    @property
+    def text(self):
+        raise AssertionError('response body must not be decoded')
+
+
+class TestValidateResponse(unittest.TestCase):
+    def validate(self, *args, **kwargs):
+        return RestClientMixin()._validate_response(FakeResponse(*args, **kwargs))
+
+    def assertErrorCode(self, code, *args, **kwargs):
+        with self.assertRaises(ResponseError) as err:
+            self.validate(*args, **kwargs)
+
+        self.assertEqual(err.exception._code, code)
+
+    def test_body_is_returned_untouched(self):
+        body = b' \r\n{"AccessCode": "code"}\n'
+
+        self.assertIs(self.validate(200, body), body)
+        self.assertIs(self.validate(200, body, 'application/json; charset=utf-8'), body)
+        self.assertIs(self.validate(200, body, None), body)
+
+    def test_status_codes(self):
+        self.assertErrorCode('S9993', 401, b'{}')
+        self.assertErrorCode('S9993', 403, b'{}')
+        self.assertErrorCode('S9990', 404, b'{}')
+        self.assertErrorCode('S9996', 503, b'<html>' * 1000, 'text/html')
+
+    def test_empty_body(self):
+        self.assertErrorCode('S9902', 200, b'')
+        self.assertErrorCode('S9902', 200, b' \r\n\t ')
+
+    def test_not_json(self):
+        self.assertErrorCode('S9901', 200, b'<html></html>', 'text/html')
+        self.assertErrorCode('S9901', 200, b'{}', 'text/html; charset=utf-8')
+        self.assertErrorCode('S9901', 200, b'[1, 2]')
+        self.assertErrorCode('S9901', 200, b'{"AccessCode": ', None)
+
+
+@unittest.skipIf(httpx is None, 'httpx is not installed')
+class TestAsyncRestClient(unittest.TestCase):
+    def make_client(self, handler, **kwargs):
+        client = AsyncRestClient('api-key', 'api-password', SandboxEndpoint(), **kwargs)
+        client._create_http = lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        return client
+
+    def test_transparent_redirect(self):
+        def handler(request):
+            if request.method == 'POST':
+                self.assertEqual(request.url.path, '/AccessCodes')
+                self.assertEqual(json.loads(request.content)['Payment']['TotalAmount'], 42)
+                return httpx.Response(200, json={'AccessCode': 'code', 'Payment': {'TotalAmount': 42}})
+
+            self.assertEqual(request.url.path, '/AccessCode/code')
+            return httpx.Response(200, json={'AccessCode': 'code', 'TransactionStatus': True})
+
+        async def run():
+            async with self.make_client(handler) as client:
+                method = AsyncTransparentRedirect(client)
+                response = await method.create_access_code(CreateAccessCodeRequest(
+                    Payment(42), RequestMethod.ProcessPayment, TransactionType.Purchase, 'https://localhost/'
+                ))
+                info = await method.request_transaction_result(response.AccessCode)
+                return response, info
+
+        response, info = asyncio.run(run())
+
+        self.assertEqual(response.Payment.TotalAmount, 42)
+        self.assertEqual(info.AccessCode, 'code')
+        self.assertTrue(info.TransactionStatus)
+
+    def test_server_error(self):
+        async def run():
+            async with self.make_client(lambda request: httpx.Response(503)) as client:
+                await client.transparent_redirect_get_transaction_info('code')
+
+        with self.assertRaises(ResponseError) as err:
+            asyncio.run(run())
+
+        self.assertEqual(err.exception._code, 'S9996')
+
+    def test_retries(self):
+        statuses = [503, 200]
+        policy = RetryPolicy(base_delay=0, max_delay=0)
+
+        async def run():
+            async with self.make_client(lambda request: httpx.Response(statuses.pop(0), json={'AccessCode': 'code'}), retry_policy=policy) as client:
+                return await client.transparent_redirect_get_transaction_info('code')
+
+        self.assertEqual(json.loads(asyncio.run(run()))['AccessCode'], 'code')
+        self.assertEqual(statuses, [])
+
+    def test_connect_error(self):
+        def handler(request):
+            raise httpx.ConnectError('refused', request=request)
+
+        async def run():
+            async with self.make_client(handler) as client:
+                await client.transparent_redirect_create_access_code(CreateAccessCodeRequest(
+                    Payment(42), RequestMethod.ProcessPayment, TransactionType.Purchase, 'https://localhost/'
+                ))
+
+        with self.assertRaises(ResponseError) as err:
+            asyncio.run(run())
+
+        self.assertEqual(err.exception._code, 'S9992')
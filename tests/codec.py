@@ -0,0 +1,74 @@
+import json
+import unittest
+
+
+try:
+    import eway
+except:
+    from os.path import dirname, join
+    from sys import path
+    path.append(join(dirname(__file__), '..'))
+
+
+from eway.rapid import codec
+from eway.rapid.model import Item, Option, Payment, RequestMethod, TransactionType, compact
+from eway.rapid.payment_method.transparent_redirect import CreateAccessCodeRequest
+from eway.rapid.payment_method.transparent_redirect.response import TransactionInfo
+
+
+def available_codecs():
+    codecs = [codec.StdlibJsonCodec()]
+
+    for codec_class in (codec.OrjsonCodec, codec.UjsonCodec):
+        try:
+            codecs.append(codec_class())
+        except ImportError:
+            pass
+
+    return codecs
+
+
+class TestCodecs(unittest.TestCase):
+    def setUp(self):
+        original = codec.get_codec()
+        self.addCleanup(codec.set_codec, original)
+
+    def make_request(self):
+        return CreateAccessCodeRequest(
+            Payment(42, 'AUD', InvoiceDescription=u'Café'), RequestMethod.ProcessPayment, TransactionType.Purchase, 'https://localhost/',
+            Items=[compact(Item)(SKU='SKU1', Quantity=2)], Options=[Option(Value='Option1')]
+        )
+
+    def test_dumps_to_bytes(self):
+        request = self.make_request()
+
+        for json_codec in available_codecs():
+            body = json_codec.dumps(request)
+
+            self.assertIsInstance(body, bytes, json_codec.name)
+            self.assertEqual(json.loads(body.decode('utf-8')), json.loads(request.to_json()), json_codec.name)
+
+    def test_from_json_reads_bytes(self):
+        data = u'{"AccessCode":"code","InvoiceNumber":"Café","Options":[{"Value":"Option1"}]}'.encode('utf-8')
+
+        for json_codec in available_codecs():
+            codec.set_codec(json_codec)
+            info = TransactionInfo.from_json(data)
+
+            self.assertEqual(info.InvoiceNumber, u'Café', json_codec.name)
+            self.assertEqual(info.Options[0].Value, 'Option1', json_codec.name)
+
+    def test_lazy_fields_are_encoded(self):
+        info = TransactionInfo.from_json('{"AccessCode":"code","Verification":{"CVN":0}}', lazy=True)
+
+        for json_codec in available_codecs():
+            self.assertEqual(json.loads(json_codec.dumps(info).decode('utf-8')), {'AccessCode': 'code', 'Verification': {'CVN': 0}}, json_codec.name)
+
+    def test_set_codec(self):
+        with self.assertRaises(TypeError):
+            codec.set_codec(json)
+
+        json_codec = codec.StdlibJsonCodec()
+        codec.set_codec(json_codec)
+
+        self.assertIs(codec.get_codec(), json_codec)
@@ -8,7 +8,7 @@ except:
     path.append(join(dirname(__file__), '..'))
 
 
-from eway.rapid.exception import EwayError, UndocumentedError
+from eway.rapid.exception import EwayError, FraudError, ResponseError, TransactionError, UndocumentedError, ValidationError
 
 
 class TestEwayError(unittest.TestCase):
@@ -26,4 +26,31 @@ class TestEwayError(unittest.TestCase):
     def test_undocumented_unknown_message_returns_none(self):
         err = EwayError.lookup_error_by_message('FooBar')
 
-        self.assertIsNone(err)
\ No newline at end of file
+        self.assertIsNone(err)
+
+    def test_lookup_by_code_finds_every_category(self):
+        for code, error_class in (('S9996', ResponseError), ('V6011', ValidationError), ('D4405', TransactionError), ('F7003', FraudError), ('UE001', UndocumentedError)):
+            self.assertIsInstance(EwayError.lookup_error_by_code(code), error_class)
+
+        self.assertIsNone(EwayError.lookup_error_by_code('X0000'))
+
+    def test_lookup_by_code_passes_response(self):
+        err = EwayError.lookup_error_by_code('F7003', response_struct=42, response_string='{}')
+
+        self.assertEqual(err._response_struct, 42)
+        self.assertEqual(err._response_string, '{}')
+
+    def test_message_is_preencoded(self):
+        self.assertIs(bytes(ResponseError('S9996')), bytes(ResponseError('S9996')))
+        self.assertEqual(str(ResponseError('S9996')), 'S9996 / Rapid gateway server error')
+        self.assertEqual(str(EwayError('S9996', 'Custom message')), 'S9996 / Custom message')
+
+    def test_invalid_code_for_class(self):
+        with self.assertRaises(ValueError):
+            ResponseError('V6011')
+
+    def test_lookup_by_message_keeps_class_precedence(self):
+        err = EwayError.lookup_error_by_message('Invalid TokenCustomerID')
+
+        self.assertIsInstance(err, ValidationError)
+        self.assertEqual(err._code, ValidationError.from_message('Invalid TokenCustomerID')._code)
@@ -0,0 +1,222 @@
+import asyncio
+import socket
+import unittest
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+
+try:
+    import eway
+except:
+    from os.path import dirname, join
+    from sys import path
+    path.append(join(dirname(__file__), '..'))
+
+
+from eway.rapid.circuit_breaker import CircuitBreaker
+from eway.rapid.client import AsyncRestClient, RestClient
+from eway.rapid.endpoint import FailoverEndpoint, GenericEndpoint, ProductionEndpoint, SandboxEndpoint
+from eway.rapid.exception import RequestTimeoutError, ResponseError
+from eway.rapid.retry import RetryPolicy
+from eway.rapid.testing import RapidStub, StubServer, constant_latency
+
+from .retry import NoSleepRetryPolicy, make_request
+
+
+def closed_port_url():
+    listener = socket.socket()
+    listener.bind(('127.0.0.1', 0))
+    url = 'http://127.0.0.1:{}/'.format(listener.getsockname()[1])
+    listener.close()
+
+    return url
+
+
+class TestFailoverEndpoint(unittest.TestCase):
+    def test_sandbox_and_production_are_not_mixed(self):
+        self.assertRaises(ValueError, FailoverEndpoint, [SandboxEndpoint(), ProductionEndpoint()])
+        self.assertRaises(ValueError, FailoverEndpoint, [])
+
+        proxy = GenericEndpoint().set_url('https://proxy/').set_is_sandbox(False)
+        endpoint = FailoverEndpoint([proxy, ProductionEndpoint()])
+
+        self.assertFalse(endpoint.is_sandbox())
+
+        proxy.set_is_sandbox(True)
+        self.assertRaises(ValueError, endpoint.is_sandbox)
+
+    def test_latency_scoring(self):
+        first, second = GenericEndpoint().set_url('https://first/'), GenericEndpoint().set_url('https://second/')
+        endpoint = FailoverEndpoint([first, second], explore_ratio=0)
+
+        self.assertEqual(endpoint.get_endpoints(), [first, second])
+        self.assertEqual(endpoint.get_url(), 'https://first/')
+
+        endpoint.record(first, 0.5)
+        endpoint.record(second, 0.1)
+
+        self.assertEqual(endpoint.get_endpoints(), [second, first])
+        self.assertEqual(endpoint.get_url(), 'https://second/')
+
+    def test_error_scoring(self):
+        first, second = GenericEndpoint().set_url('https://first/'), GenericEndpoint().set_url('https://second/')
+        endpoint = FailoverEndpoint([first, second], explore_ratio=0)
+
+        endpoint.record(first, 0.1)
+        endpoint.record(second, 0.2)
+        endpoint.record(first, 0.01, ResponseError('S9992'))
+
+        self.assertEqual(endpoint.get_endpoints(), [second, first])
+
+        stats = endpoint.get_stats()
+
+        self.assertEqual([item['requests'] for item in stats], [2, 1])
+        self.assertGreater(stats[0]['error_rate'], 0)
+        self.assertEqual(stats[1]['error_rate'], 0)
+
+    def test_errors_not_depending_on_the_route(self):
+        first, second = GenericEndpoint().set_url('https://first/'), GenericEndpoint().set_url('https://second/')
+        endpoint = FailoverEndpoint([first, second], explore_ratio=0)
+
+        endpoint.record(first, 0.01, ResponseError('S9993'))
+
+        self.assertEqual(endpoint.get_stats()[0]['requests'], 0)
+
+    def test_open_circuit_comes_last(self):
+        first, second = GenericEndpoint().set_url('https://first/'), GenericEndpoint().set_url('https://second/')
+        first.set_circuit_breaker(CircuitBreaker(minimum_calls=1, clock=lambda: 0.0))
+        endpoint = FailoverEndpoint([first, second], explore_ratio=0)
+
+        first.get_circuit_breaker().record(0.0, 0.0, True)
+
+        self.assertEqual(endpoint.get_endpoints(), [second, first])
+
+    def test_exploration(self):
+        first, second = GenericEndpoint().set_url('https://first/'), GenericEndpoint().set_url('https://second/')
+        endpoint = FailoverEndpoint([first, second], explore_ratio=1)
+
+        self.assertEqual(endpoint.get_endpoints(), [second, first])
+
+
+class TestRestClientFailover(unittest.TestCase):
+    def serve(self, stub=None):
+        server = StubServer(stub or RapidStub()).start()
+        self.addCleanup(server.stop)
+
+        return server
+
+    def make_client(self, endpoint, **kwargs):
+        client = RestClient('api-key', 'api-password', endpoint, **kwargs)
+        self.addCleanup(client.close)
+
+        return client
+
+    def test_connection_error(self):
+        server = self.serve()
+        down, up = GenericEndpoint().set_url(closed_port_url()), GenericEndpoint().set_url(server.url)
+        endpoint = FailoverEndpoint([down, up], explore_ratio=0)
+        client = self.make_client(endpoint)
+
+        client.transparent_redirect_create_access_code(make_request())
+        client.transparent_redirect_get_transaction_info('code')
+
+        self.assertEqual(server.stub.requests_count, 2)
+        self.assertEqual([item['requests'] for item in endpoint.get_stats()], [1, 2])
+
+    def test_read_timeout_of_create_access_code(self):
+        slow, fast = self.serve(RapidStub(latency=constant_latency(0.5))), self.serve()
+        endpoint = FailoverEndpoint([GenericEndpoint().set_url(slow.url), GenericEndpoint().set_url(fast.url)], explore_ratio=0)
+        client = self.make_client(endpoint, read_timeout=0.05)
+
+        # the access code may have been created already
+        with self.assertRaises(RequestTimeoutError) as err:
+            client.transparent_redirect_create_access_code(make_request())
+
+        self.assertEqual(err.exception._code, 'ST002')
+        self.assertEqual(fast.stub.requests_count, 0)
+
+    def test_all_endpoints_down(self):
+        endpoint = FailoverEndpoint([GenericEndpoint().set_url(closed_port_url()), GenericEndpoint().set_url(closed_port_url())])
+        client = self.make_client(endpoint)
+
+        with self.assertRaises(ResponseError) as err:
+            client.transparent_redirect_get_transaction_info('code')
+
+        self.assertEqual(err.exception._code, 'S9992')
+        self.assertEqual([item['requests'] for item in endpoint.get_stats()], [1, 1])
+
+    def test_open_circuits(self):
+        server = self.serve()
+        first, second = GenericEndpoint().set_url(server.url), GenericEndpoint().set_url(server.url)
+
+        for member in (first, second):
+            member.set_circuit_breaker(CircuitBreaker(minimum_calls=1, clock=lambda: 0.0)).get_circuit_breaker().record(0.0, 0.0, True)
+
+        client = self.make_client(FailoverEndpoint([first, second]))
+
+        with self.assertRaises(ResponseError) as err:
+            client.transparent_redirect_get_transaction_info('code')
+
+        self.assertEqual(err.exception._code, 'S9992')
+        self.assertEqual(server.stub.requests_count, 0)
+
+
+    def test_open_circuit_and_failing_endpoint(self):
+        down, broken = GenericEndpoint().set_url(closed_port_url()), GenericEndpoint().set_url(closed_port_url())
+        broken.set_circuit_breaker(CircuitBreaker(minimum_calls=1, clock=lambda: 0.0)).get_circuit_breaker().record(0.0, 0.0, True)
+
+        policy = NoSleepRetryPolicy(max_attempts=3)
+        client = self.make_client(FailoverEndpoint([down, broken], explore_ratio=0), retry_policy=policy)
+
+        with self.assertRaises(ResponseError) as err:
+            client.transparent_redirect_get_transaction_info('code')
+
+        self.assertEqual(err.exception._code, 'S9992')
+        self.assertEqual(len(policy.delays), 2)  # retried, as the circuit of the first endpoint is closed
+
+
+@unittest.skipIf(httpx is None, 'httpx is not installed')
+class TestAsyncRestClientFailover(unittest.TestCase):
+    def test_connection_error(self):
+        def handler(request):
+            if request.url.host == 'down':
+                raise httpx.ConnectError('connection refused', request=request)
+
+            return httpx.Response(200, json={'AccessCode': 'code'})
+
+        endpoint = FailoverEndpoint([GenericEndpoint().set_url('https://down/'), GenericEndpoint().set_url('https://up/')], explore_ratio=0)
+
+        async def run():
+            async with AsyncRestClient('api-key', 'api-password', endpoint) as client:
+                client._create_http = lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+                return await client.transparent_redirect_create_access_code(make_request())
+
+        self.assertEqual(asyncio.run(run()), b'{"AccessCode":"code"}')
+        self.assertEqual([item['requests'] for item in endpoint.get_stats()], [1, 1])
+
+    def test_open_circuit_and_failing_endpoint(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request.url.host)
+            raise httpx.ConnectError('connection refused', request=request)
+
+        broken = GenericEndpoint().set_url('https://broken/')
+        broken.set_circuit_breaker(CircuitBreaker(minimum_calls=1, clock=lambda: 0.0)).get_circuit_breaker().record(0.0, 0.0, True)
+        endpoint = FailoverEndpoint([GenericEndpoint().set_url('https://down/'), broken], explore_ratio=0)
+
+        async def run():
+            async with AsyncRestClient('api-key', 'api-password', endpoint, retry_policy=RetryPolicy(max_attempts=3, base_delay=0, max_delay=0)) as client:
+                client._create_http = lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+                await client.transparent_redirect_get_transaction_info('code')
+
+        with self.assertRaises(ResponseError) as err:
+            asyncio.run(run())
+
+        self.assertEqual(err.exception._code, 'S9992')
+        self.assertEqual(calls, ['down'] * 3)
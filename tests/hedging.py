@@ -0,0 +1,298 @@
+import asyncio
+import time
+import unittest
+
+from threading import Thread, current_thread
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+
+try:
+    import eway
+except:
+    from os.path import dirname, join
+    from sys import path
+    path.append(join(dirname(__file__), '..'))
+
+
+from eway.rapid.circuit_breaker import CircuitBreaker
+from eway.rapid.client import AsyncRestClient, InProcessTransport, RestClient
+from eway.rapid.endpoint import SandboxEndpoint
+from eway.rapid.exception import ResponseError
+from eway.rapid.hedging import HedgingPolicy
+from eway.rapid.retry import RetryBudget
+from eway.rapid.testing import RapidStub, constant_latency
+
+from .observer import RecordingObserver
+from .retry import make_request
+
+
+def scripted_latency(*delays):
+    'Returns a latency distribution giving the delays passed in order, then no delay'
+    delays = list(delays)
+    return lambda rnd: delays.pop(0) if delays else 0.0
+
+
+def warm_policy(latency=0.01, samples=1, **kwargs):
+    policy = HedgingPolicy(min_samples=1, **kwargs)
+
+    for _ in range(samples):
+        policy.record_latency(latency)
+
+    return policy
+
+
+class TestHedgingPolicy(unittest.TestCase):
+    def test_delay(self):
+        policy = HedgingPolicy(percentile=0.9, min_delay=0.001, min_samples=10)
+
+        for latency in range(1, 10):
+            policy.record_latency(latency / 100.0)
+
+        self.assertIsNone(policy.start())  # not enough samples yet
+
+        policy.record_latency(0.1)
+        self.assertEqual(policy.start(), 0.1)
+
+        policy = warm_policy(0.001, min_delay=0.01)
+        self.assertEqual(policy.start(), 0.01)
+
+    def test_samples(self):
+        policy = HedgingPolicy(min_samples=1, max_samples=2)
+
+        for latency in (1.0, 0.1, 0.2):
+            policy.record_latency(latency)
+
+        self.assertEqual(policy.start(), 0.2)
+        self.assertEqual(policy.get_stats()['samples'], 2)
+
+    def test_budget(self):
+        policy = HedgingPolicy(budget=RetryBudget(ratio=0.5, reserve=0))
+
+        policy.start()
+        self.assertFalse(policy.hedge())
+
+        policy.start()
+        self.assertTrue(policy.hedge())
+        self.assertFalse(policy.hedge())
+
+    def test_stats(self):
+        policy = warm_policy(budget=RetryBudget(reserve=2))
+
+        for _ in range(4):
+            policy.start()
+
+        policy.hedge()
+        policy.record_win(True)
+        policy.hedge()
+        policy.record_win(False)
+
+        self.assertEqual(policy.get_stats(), {
+            'calls': 4, 'hedges': 2, 'hedge_wins': 1, 'hedge_rate': 0.5, 'win_rate': 0.5, 'samples': 1
+        })
+
+    def test_invalid_arguments(self):
+        self.assertRaises(ValueError, HedgingPolicy, percentile=1)
+        self.assertRaises(ValueError, HedgingPolicy, min_delay=-1)
+        self.assertRaises(ValueError, HedgingPolicy, min_samples=10, max_samples=5)
+
+
+class TestRestClientHedging(unittest.TestCase):
+    def make_client(self, stub, policy):
+        client = RestClient('api-key', 'api-password', SandboxEndpoint(), transport=InProcessTransport(stub.handle), hedging_policy=policy)
+        self.addCleanup(client.close)
+
+        return client
+
+    def test_hedge_wins(self):
+        stub, policy = RapidStub(latency=scripted_latency(1.0)), warm_policy(budget=RetryBudget(reserve=1))
+        client = self.make_client(stub, policy)
+
+        started = time.time()
+        client.transparent_redirect_get_transaction_info('code')
+
+        self.assertLess(time.time() - started, 0.5)
+        self.assertEqual(stub.requests_count, 2)
+
+        stats = policy.get_stats()
+        self.assertEqual((stats['hedges'], stats['hedge_wins']), (1, 1))
+
+    def test_fast_response(self):
+        stub, policy = RapidStub(), warm_policy(0.5, budget=RetryBudget(reserve=1))
+        client = self.make_client(stub, policy)
+
+        client.transparent_redirect_get_transaction_info('code')
+
+        self.assertEqual(stub.requests_count, 1)
+        self.assertEqual(policy.get_stats()['hedges'], 0)
+        self.assertEqual(policy.get_stats()['samples'], 2)
+
+    def test_budget_exhausted(self):
+        stub, policy = RapidStub(latency=scripted_latency(0.1)), warm_policy(budget=RetryBudget(reserve=0))
+        client = self.make_client(stub, policy)
+
+        client.transparent_redirect_get_transaction_info('code')
+
+        self.assertEqual(stub.requests_count, 1)
+        self.assertEqual(policy.get_stats()['hedges'], 0)
+
+    def test_create_access_code_is_not_hedged(self):
+        stub, policy = RapidStub(latency=scripted_latency(0.1)), warm_policy(budget=RetryBudget(reserve=1))
+        client = self.make_client(stub, policy)
+
+        client.transparent_redirect_create_access_code(make_request())
+
+        self.assertEqual(stub.requests_count, 1)
+        self.assertEqual(policy.get_stats()['calls'], 0)
+
+    def test_failed_request(self):
+        stub, policy = RapidStub(latency=scripted_latency(0.2), errors={'S9996': 1.0}), warm_policy(budget=RetryBudget(reserve=1))
+        client = self.make_client(stub, policy)
+
+        with self.assertRaises(ResponseError) as err:
+            client.transparent_redirect_get_transaction_info('code')
+
+        self.assertEqual(err.exception._code, 'S9996')
+        self.assertEqual(stub.requests_count, 2)
+        self.assertEqual(policy.get_stats()['hedge_wins'], 0)
+
+    def test_caller_thread(self):
+        threads = []
+
+        def handle(method, path, headers=None, body=b''):
+            threads.append(current_thread())
+            return RapidStub().handle(method, path, headers, body)
+
+        client = RestClient('api-key', 'api-password', SandboxEndpoint(), transport=InProcessTransport(handle),
+                            hedging_policy=warm_policy(budget=RetryBudget(reserve=0)))
+        self.addCleanup(client.close)
+
+        client.transparent_redirect_get_transaction_info('code')  # may not be hedged
+
+        self.assertEqual(threads, [current_thread()])
+
+    def test_concurrent_calls_do_not_queue(self):
+        stub, policy = RapidStub(latency=constant_latency(0.1)), warm_policy(0.1, budget=RetryBudget(reserve=10))
+        client = self.make_client(stub, policy)
+        callers = [Thread(target=client.transparent_redirect_get_transaction_info, args=('code',)) for _ in range(200)]
+
+        started = time.time()
+
+        for caller in callers:
+            caller.start()
+
+        for caller in callers:
+            caller.join()
+
+        self.assertLess(time.time() - started, 0.35)
+
+    def test_first_failure_is_covered_by_the_hedge(self):
+        class Stub(RapidStub):
+            def handle(self, method, path, headers=None, body=b''):
+                if self.requests_count == 0:
+                    self.requests_count += 1
+                    time.sleep(0.05)
+                    return 503, {}, b''
+
+                return super(Stub, self).handle(method, path, headers, body)
+
+        stub, policy = Stub(), warm_policy(budget=RetryBudget(reserve=1))
+        client = self.make_client(stub, policy)
+
+        client.transparent_redirect_get_transaction_info('code')
+
+        self.assertEqual(policy.get_stats()['hedge_wins'], 1)
+
+    def test_first_requests_reuse_threads(self):
+        threads = []
+
+        def handle(method, path, headers=None, body=b''):
+            threads.append(current_thread())
+            return RapidStub().handle(method, path, headers, body)
+
+        client = RestClient('api-key', 'api-password', SandboxEndpoint(), transport=InProcessTransport(handle),
+                            hedging_policy=warm_policy(0.5, budget=RetryBudget(reserve=1)))
+        self.addCleanup(client.close)
+
+        for _ in range(5):
+            client.transparent_redirect_get_transaction_info('code')
+
+        self.assertNotIn(current_thread(), threads)
+        self.assertEqual(len(set(threads)), 1)
+
+    def test_timings_of_the_winning_request(self):
+        stub, policy = RapidStub(latency=scripted_latency(0.3)), warm_policy(budget=RetryBudget(reserve=1))
+        client = self.make_client(stub, policy)
+        observer = RecordingObserver()
+        client.add_observer(observer)
+
+        client.transparent_redirect_get_transaction_info('code')
+        timings = observer.calls[0]
+        phases = dict(timings.phases)
+
+        time.sleep(0.4)  # the first request finishes after the hedge won
+
+        self.assertEqual(policy.get_stats()['hedge_wins'], 1)
+        self.assertEqual(timings.attempts, 1)
+        self.assertEqual(timings.phases, phases)
+        self.assertLess(sum(phases.values()), 0.2)
+
+
+@unittest.skipIf(httpx is None, 'httpx is not installed')
+class TestAsyncRestClientHedging(unittest.TestCase):
+    def run_calls(self, policy, delays, calls=1, endpoint=None):
+        delays = list(delays)
+        requests = []
+
+        async def handler(request):
+            requests.append(request.url.path)
+            delay = delays.pop(0) if delays else 0.0
+
+            if delay:
+                await asyncio.sleep(delay)
+
+            return httpx.Response(200, json={'AccessCode': 'code'})
+
+        async def run():
+            async with AsyncRestClient('api-key', 'api-password', endpoint or SandboxEndpoint(), hedging_policy=policy) as client:
+                client._create_http = lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+                for _ in range(calls):
+                    await client.transparent_redirect_get_transaction_info('code')
+
+        started = time.time()
+        asyncio.run(run())
+
+        return time.time() - started, requests
+
+    def test_hedge_wins(self):
+        policy = warm_policy(budget=RetryBudget(reserve=1))
+        duration, requests = self.run_calls(policy, [1.0])
+
+        self.assertLess(duration, 0.5)
+        self.assertEqual(len(requests), 2)
+        self.assertEqual(policy.get_stats()['hedge_wins'], 1)
+
+    def test_hedge_rate_cap(self):
+        policy = warm_policy(samples=100, budget=RetryBudget(ratio=0.5, reserve=0, capacity=1))
+        duration, requests = self.run_calls(policy, [0.05, 0.05, 0, 0.05, 0.05], calls=4)
+
+        stats = policy.get_stats()
+
+        self.assertEqual((stats['calls'], stats['hedges']), (4, 2))
+        self.assertEqual(stats['hedge_rate'], 0.5)
+        self.assertEqual(len(requests), 6)
+
+    def test_cancelled_request_is_not_a_failure(self):
+        endpoint = SandboxEndpoint().set_circuit_breaker(CircuitBreaker(minimum_calls=1))
+        policy = warm_policy(budget=RetryBudget(reserve=1))
+
+        self.run_calls(policy, [1.0], endpoint=endpoint)
+
+        stats = endpoint.get_circuit_breaker().get_stats()
+
+        self.assertEqual(policy.get_stats()['hedge_wins'], 1)
+        self.assertEqual((stats['state'], stats['calls'], stats['failure_rate']), (CircuitBreaker.CLOSED, 1, 0.0))
@@ -0,0 +1,39 @@
+import ssl
+
+try:
+    import trustme
+except ImportError:
+    trustme = None
+
+
+class Clock(object):
+    '''
+    Clock standing still until the tests move it forward
+    '''
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def ssl_contexts(host='127.0.0.1'):
+    '''
+    Issues a certificate of the host from a throwaway CA
+
+    Arguments:
+        host : str = host the certificate is issued for
+
+    Returns:
+        (ssl.SSLContext, ssl.SSLContext) = the server context holding the certificate and the client context trusting the CA
+    '''
+    ca = trustme.CA()
+
+    server_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    ca.issue_cert(host).configure_cert(server_context)
+
+    client_context = ssl.create_default_context()
+    ca.configure_trust(client_context)
+
+    return server_context, client_context
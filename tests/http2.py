@@ -0,0 +1,188 @@
+import asyncio
+import sys
+import threading
+import unittest
+
+try:
+    from unittest import mock
+except ImportError:
+    mock = None
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import h2
+    HTTP2 = True
+except ImportError:
+    HTTP2 = False  # the fallback is tested in TestHttp2Availability
+
+
+try:
+    import eway
+except:
+    from os.path import dirname, join
+    from sys import path
+    path.append(join(dirname(__file__), '..'))
+
+
+from eway.rapid.client import AsyncRestClient, HttpxTransport, RestClient
+from eway.rapid.client.transport import is_http2_available
+from eway.rapid.endpoint import GenericEndpoint
+from eway.rapid.exception import RequestTimeoutError
+from eway.rapid.payment_method.transparent_redirect import AsyncTransparentRedirect, TransparentRedirect
+from eway.rapid.testing import Http2StubServer, RapidStub, StubServer, constant_latency
+
+from .helpers import ssl_contexts, trustme
+from .observer import RecordingObserver
+from .server import make_request
+
+
+@unittest.skipIf(httpx is None or mock is None, 'httpx is not installed')
+class TestHttp2Availability(unittest.TestCase):
+    def test_missing_h2(self):
+        with mock.patch.dict(sys.modules, {'h2': None}):
+            with self.assertLogs('eway.rapid.client', 'WARNING'):
+                self.assertFalse(is_http2_available())
+
+            self.assertFalse(HttpxTransport(http2=True)._http2)
+
+    def test_installed_h2(self):
+        with mock.patch.dict(sys.modules, {'h2': mock.Mock()}):
+            self.assertTrue(HttpxTransport(http2=True)._http2)
+
+        self.assertFalse(HttpxTransport(http2=False)._http2)
+
+
+@unittest.skipIf(httpx is None, 'httpx is not installed')
+class TestHttpxTransport(unittest.TestCase):
+    def serve(self, stub, **kwargs):
+        server = StubServer(stub).start()
+        self.addCleanup(server.stop)
+
+        client = RestClient('api-key', 'api-password', GenericEndpoint().set_url(server.url), transport=HttpxTransport(http2=HTTP2), **kwargs)
+        self.addCleanup(client.close)
+
+        return server, client
+
+    def test_http1_server(self):
+        server, client = self.serve(RapidStub(credentials=('api-key', 'api-password')))
+        method = TransparentRedirect(client)
+
+        info = method.request_transaction_result(method.create_access_code(make_request()).AccessCode)
+
+        self.assertTrue(info.TransactionStatus)
+        self.assertEqual(server.connections_count, 1)
+
+    def test_read_timeout(self):
+        server, client = self.serve(RapidStub(latency=constant_latency(0.5)), read_timeout=0.05)
+
+        with self.assertRaises(RequestTimeoutError) as err:
+            client.transparent_redirect_get_transaction_info('code')
+
+        self.assertEqual(err.exception._code, 'ST002')
+
+    def test_timings(self):
+        server, client = self.serve(RapidStub())
+        observer = RecordingObserver()
+        client.add_observer(observer)
+
+        client.transparent_redirect_get_transaction_info('code')
+
+        phases = observer.calls[0].phases
+
+        for phase in ('connection_acquire', 'request_send', 'first_byte', 'body_read', 'validate_response'):
+            self.assertIn(phase, phases)
+
+
+@unittest.skipIf(httpx is None, 'httpx is not installed')
+class TestAsyncRestClientHttp2(unittest.TestCase):
+    def test_http1_server(self):
+        async def run(url):
+            async with AsyncRestClient('api-key', 'api-password', GenericEndpoint().set_url(url), http2=HTTP2) as client:
+                method = AsyncTransparentRedirect(client)
+                access_code = (await method.create_access_code(make_request())).AccessCode
+
+                return await asyncio.gather(*[method.request_transaction_result(access_code) for _ in range(5)])
+
+        with StubServer(RapidStub()) as server:
+            infos = asyncio.run(run(server.url))
+
+        self.assertTrue(all(info.TransactionStatus for info in infos))
+
+
+@unittest.skipIf(httpx is None or not HTTP2 or trustme is None, 'httpx, h2 or trustme is not installed')
+class TestHttp2Multiplexing(unittest.TestCase):
+    def setUp(self):
+        self.server_context, self.client_context = ssl_contexts()
+
+    def serve(self):
+        stub = RapidStub(latency=constant_latency(0.05), credentials=('api-key', 'api-password'))
+        server = Http2StubServer(stub, self.server_context).start()
+        self.addCleanup(server.stop)
+
+        return server
+
+    def test_concurrent_requests_share_a_connection(self):
+        server = self.serve()
+        transport = HttpxTransport(http2=True, verify=self.client_context).set_auth('api-key', 'api-password')
+        self.addCleanup(transport.close)
+        responses = []
+
+        def request():
+            responses.append(transport.request('GET', server.url + 'AccessCode/code'))
+
+        threads = [threading.Thread(target=request) for _ in range(10)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual([(response.status_code, response.http_version) for response in responses], [(200, 'HTTP/2')] * 10)
+        self.assertEqual(server.connections_count, 1)
+
+    def test_async_client(self):
+        server = self.serve()
+
+        async def run():
+            async with AsyncRestClient('api-key', 'api-password', GenericEndpoint().set_url(server.url), http2=True, verify=self.client_context) as client:
+                method = AsyncTransparentRedirect(client)
+                access_code = (await method.create_access_code(make_request())).AccessCode
+
+                return await asyncio.gather(*[method.request_transaction_result(access_code) for _ in range(20)])
+
+        infos = asyncio.run(run())
+
+        self.assertTrue(all(info.TransactionStatus for info in infos))
+        self.assertEqual(server.stub.requests_count, 21)
+        self.assertEqual(server.connections_count, 1)
+
+    def test_http1_client(self):
+        server = self.serve()
+        transport = HttpxTransport(http2=False, verify=self.client_context).set_auth('api-key', 'api-password')
+        self.addCleanup(transport.close)
+
+        responses = [transport.request('GET', server.url + 'AccessCode/code') for _ in range(3)]
+
+        self.assertEqual([(response.status_code, response.http_version) for response in responses], [(200, 'HTTP/1.1')] * 3)
+        self.assertEqual(server.connections_count, 1)
+
+    def test_fallback_to_http1_server(self):
+        stub = RapidStub(credentials=('api-key', 'api-password'))
+        server = StubServer(stub, ssl_context=self.server_context).start()
+        self.addCleanup(server.stop)
+
+        transport = HttpxTransport(http2=True, verify=self.client_context)
+        client = RestClient('api-key', 'api-password', GenericEndpoint().set_url(server.url), transport=transport)
+        self.addCleanup(client.close)
+        method = TransparentRedirect(client)
+
+        access_code = method.create_access_code(make_request()).AccessCode
+        response = transport.request('GET', server.url + 'AccessCode/' + access_code)
+
+        self.assertTrue(method.request_transaction_result(access_code).TransactionStatus)
+        self.assertEqual((response.status_code, response.http_version), (200, 'HTTP/1.1'))
@@ -1,16 +1,20 @@
+import json
+import pickle
 import unittest
 from hypothesis import given
 from hypothesis.strategies import text
 
 
 try:
-    from eway.rapid.model import Option, StructFromJsonMixin, RequestMethod, TransactionType
+    from eway.rapid.model import Customer, Option, Payment, StructFromJsonMixin, RequestMethod, TransactionType, compact, json_default
 except:
     from os.path import dirname, join
     from sys import path
     path.append(join(dirname(__file__), '..'))
 
-    from eway.rapid.model import Option, StructFromJsonMixin, RequestMethod, TransactionType
+    from eway.rapid.model import Customer, Option, Payment, StructFromJsonMixin, RequestMethod, TransactionType, compact, json_default
+
+from eway.rapid.payment_method.transparent_redirect.response import TransactionInfo
 
 
 class TestOption(unittest.TestCase):
@@ -29,6 +33,90 @@ class TestOption(unittest.TestCase):
         self.assertEqual(option_from_json.Value, option.Value)
 
 
+class TestStructToJsonMixin(unittest.TestCase):
+    def test_nested_structs(self):
+        customer = Customer(FirstName='Mr', IsActive=True, Reference=None)
+        customer.Comments = [Option(Value=u'\u00fc'), {'nested': Option(Value=1.5)}]
+
+        self.assertEqual(json.loads(customer.to_json()), {
+            'FirstName': 'Mr', 'IsActive': True, 'Reference': None,
+            'Comments': [{'Value': u'\u00fc'}, {'nested': {'Value': 1.5}}]
+        })
+
+    def test_same_struct_twice_is_not_circular(self):
+        option = Option(Value='x')
+        customer = Customer(Comments=[option, option])
+
+        self.assertEqual(customer.to_json(), '{"Comments": [{"Value": "x"}, {"Value": "x"}]}')
+
+    def test_circular_reference(self):
+        option = Option()
+        option.Value = [option]
+
+        with self.assertRaises(RuntimeError):
+            option.to_json()
+
+    def test_default_hook(self):
+        with self.assertRaises(TypeError):
+            Option(Value=object()).to_json()
+
+        self.assertEqual(Option(Value=object).to_json(default=lambda value: value.__name__), '{"Value": "object"}')
+
+    def test_json_default(self):
+        payment = Payment(42, 'AUD')
+
+        self.assertEqual(json.dumps(Customer(Comments=payment), default=json_default), Customer(Comments=payment).to_json())
+
+
+class TestCompact(unittest.TestCase):
+    def test_compact_class_is_cached_subclass(self):
+        self.assertIs(compact(Customer), compact(Customer))
+        self.assertTrue(issubclass(compact(Customer), Customer))
+        self.assertIs(compact(compact(Customer)), compact(Customer))
+
+    def test_attributes(self):
+        customer = compact(Customer)(FirstName='Mr')
+
+        self.assertEqual(customer.FirstName, 'Mr')
+        self.assertIsNone(customer.LastName)
+        self.assertFalse(hasattr(customer, 'Unknown'))
+
+        with self.assertRaises(AttributeError):
+            compact(Customer)(Unknown=1)
+
+    def test_fields_are_kept_in_slots(self):
+        customer = compact(Customer).from_json('{"FirstName": "Mr", "LastName": "Tester"}')
+        customer.Email = 'mrtester@example.com'
+
+        self.assertIn('Email', type(customer).__slots__)
+        self.assertEqual(customer.__dict__, {})
+        self.assertEqual(customer.to_json(), compact(Customer).from_json(customer.to_json()).to_json())
+
+    def test_custom_constructor(self):
+        payment = compact(Payment)(42, 'AUD')
+
+        self.assertEqual(payment.TotalAmount, 42)
+        self.assertEqual(payment.to_json(), Payment(42, 'AUD').to_json())
+
+    def test_nested_structs_are_compact(self):
+        info = compact(TransactionInfo).from_json('{"AccessCode": "code", "Options": [{"Value": "x"}], "Verification": {"CVN": 0}}')
+
+        self.assertIsInstance(info, TransactionInfo)
+        self.assertIs(type(info.Options[0]), compact(Option))
+        self.assertEqual(info.Options[0].Value, 'x')
+        self.assertEqual(info.Verification.CVN, 0)
+
+    def test_pickle(self):
+        customer = pickle.loads(pickle.dumps(compact(Customer)(FirstName='Mr')))
+
+        self.assertIs(type(customer), compact(Customer))
+        self.assertEqual(customer.FirstName, 'Mr')
+
+    def test_enums_cannot_be_compact(self):
+        with self.assertRaises(TypeError):
+            compact(RequestMethod)
+
+
 class TestStructFromJsonMixin(unittest.TestCase):
     class A1(StructFromJsonMixin):
         a = None
@@ -56,6 +144,30 @@ class TestStructFromJsonMixin(unittest.TestCase):
 
         self.assertEqual(len(obj.__dict__), 3)
 
+    def test_a1_compiled_decoder_is_cached(self):
+        self.assertIs(self.A1.compile_decoder(True), self.A1.compile_decoder(True))
+        self.assertIsNot(self.A1.compile_decoder(True), self.A1.compile_decoder(False))
+
+    def test_a1_nested_decoders_and_defaults(self):
+        obj = self.A1.from_json('{"a": {"Value": "x"}, "b": [{"Value": "y"}, {"Value": "z"}]}', a=Option, b=[Option], c=42)
+
+        self.assertIsInstance(obj.a, Option)
+        self.assertEqual(obj.a.Value, 'x')
+        self.assertEqual([option.Value for option in obj.b], ['y', 'z'])
+        self.assertEqual(obj.c, 42)
+
+    def test_a1_missing_nested_field_has_no_default(self):
+        obj = self.A1.from_json('{"a": null}', a=Option, b=[Option])
+
+        self.assertIsNone(obj.a)
+        self.assertNotIn('b', obj.__dict__)
+
+    def test_a1_meta_field(self):
+        with self.assertRaises(AttributeError) as err:
+            self.A1.from_json('{"__class__": 1}', True)
+
+        self.assertEqual(err.exception.args[0], 'Cannot assign meta field of the object: A1.__class__')
+
     def test_request_method(self):
         method = RequestMethod.Authorise.to_json()
         self.assertEqual(method, '"Authorise"')
@@ -69,3 +181,17 @@ class TestStructFromJsonMixin(unittest.TestCase):
 
         ttype = TransactionType.from_json(ttype)
         self.assertEqual(ttype, TransactionType.MOTO)
+
+    def test_enum_from_raw_value(self):
+        self.assertIs(RequestMethod.from_json('TokenPayment'), RequestMethod.TokenPayment)
+        self.assertIs(TransactionType.from_json("'Recurring'"), TransactionType.Recurring)
+
+        with self.assertRaises(ValueError):
+            TransactionType.from_json('"Unknown"')
+
+    def test_enum_fields_are_decoded_into_members(self):
+        obj = self.A1.from_json('{"a": "Authorise", "b": "MOTO", "c": null}', a=RequestMethod, b=TransactionType, c=TransactionType)
+
+        self.assertIs(obj.a, RequestMethod.Authorise)
+        self.assertIs(obj.b, TransactionType.MOTO)
+        self.assertIsNone(obj.c)
@@ -0,0 +1,172 @@
+import asyncio
+import unittest
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+
+try:
+    import eway
+except:
+    from os.path import dirname, join
+    from sys import path
+    path.append(join(dirname(__file__), '..'))
+
+
+from eway.rapid.client import AsyncRestClient, RestClient
+from eway.rapid.client.instrumentation import get_timings
+from eway.rapid.endpoint import GenericEndpoint
+from eway.rapid.exception import ResponseError, ValidationError
+from eway.rapid.observer import Observer
+from eway.rapid.payment_method.transparent_redirect import AsyncTransparentRedirect, TransparentRedirect
+from eway.rapid.testing import RapidStub, StubServer
+
+from .server import make_request
+
+
+class RecordingObserver(Observer):
+    def __init__(self):
+        self.calls = []
+
+    def on_call(self, timings):
+        self.calls.append(timings)
+
+
+class FailingObserver(Observer):
+    def on_call(self, timings):
+        raise RuntimeError('observer failure')
+
+
+NETWORK_PHASES = {'connection_acquire', 'request_send', 'first_byte', 'body_read'}
+
+
+class TestObservers(unittest.TestCase):
+    def serve(self, stub=None):
+        server = StubServer(stub or RapidStub()).start()
+        self.addCleanup(server.stop)
+
+        client = RestClient('api-key', 'api-password', GenericEndpoint().set_url(server.url))
+        self.addCleanup(client.close)
+
+        return server, client
+
+    def test_phases(self):
+        server, client = self.serve()
+        client_observer, method_observer = RecordingObserver(), RecordingObserver()
+        method = TransparentRedirect(client.add_observer(client_observer)).add_observer(method_observer)
+
+        response = method.create_access_code(make_request())
+        method.request_transaction_result(response.AccessCode)
+
+        create, get = client_observer.calls
+
+        self.assertEqual(create.operation, 'transparent_redirect_create_access_code')
+        self.assertEqual(create.endpoint, server.url)
+        self.assertEqual(create.code, '200')
+        self.assertEqual(create.attempts, 1)
+        self.assertEqual(set(create.phases), NETWORK_PHASES | {'to_json', 'validate_response'})
+        self.assertEqual(set(get.phases), NETWORK_PHASES | {'validate_response'})
+        self.assertGreaterEqual(create.duration, sum(create.phases.values()) * 0.99)
+
+        create, get = method_observer.calls
+
+        self.assertEqual(get.operation, 'transparent_redirect_get_transaction_info')
+        self.assertEqual(get.endpoint, server.url)
+        self.assertEqual(get.code, '200')
+        self.assertEqual(get.attempts, 1)
+        self.assertEqual(set(create.phases), NETWORK_PHASES | {'to_json', 'validate_response', 'from_json'})
+        self.assertEqual(set(get.phases), NETWORK_PHASES | {'validate_response', 'from_json'})
+        self.assertGreaterEqual(create.duration, sum(create.phases.values()) * 0.99)
+
+        self.assertIsNone(get_timings())
+
+    def test_error_codes(self):
+        server, client = self.serve(RapidStub(errors={'S9996': 1}))
+        observer = RecordingObserver()
+        client.add_observer(observer)
+
+        with self.assertRaises(ResponseError):
+            TransparentRedirect(client).request_transaction_result('code')
+
+        self.assertEqual(observer.calls[0].code, 'S9996')
+        self.assertIn('first_byte', observer.calls[0].phases)
+
+        server, client = self.serve(RapidStub(errors={'V6021': 1}))
+        method = TransparentRedirect(client).add_observer(observer)
+
+        with self.assertRaises(ValidationError):
+            method.create_access_code(make_request())
+
+        self.assertEqual(observer.calls[1].code, 'V6021')
+        self.assertEqual(set(observer.calls[1].phases), NETWORK_PHASES | {'to_json', 'validate_response', 'from_json', 'trigger_errors'})
+
+    def test_client_phases_without_client_observers(self):
+        server, client = self.serve(RapidStub(errors={'S9996': 1}))
+        observer = RecordingObserver()
+        method = TransparentRedirect(client).add_observer(observer)
+
+        with self.assertRaises(ResponseError):
+            method.request_transaction_result('code')
+
+        self.assertEqual(len(observer.calls), 1)
+        self.assertEqual(observer.calls[0].code, 'S9996')
+        self.assertEqual(observer.calls[0].attempts, 1)
+        self.assertEqual(set(observer.calls[0].phases), NETWORK_PHASES | {'validate_response'})
+
+    def test_failing_observer(self):
+        server, client = self.serve()
+        observer = RecordingObserver()
+        client.add_observer(FailingObserver()).add_observer(observer)
+
+        with self.assertLogs('eway.rapid.observer'):
+            TransparentRedirect(client).create_access_code(make_request())
+
+        self.assertEqual(len(observer.calls), 1)
+
+    def test_remove_observer(self):
+        server, client = self.serve()
+        observer = RecordingObserver()
+        client.add_observer(observer).remove_observer(observer)
+
+        TransparentRedirect(client).create_access_code(make_request())
+
+        self.assertEqual(observer.calls, [])
+        self.assertIsNone(client._start_timings('operation'))
+
+    @unittest.skipIf(httpx is None, 'httpx is not installed')
+    def test_async_phases(self):
+        server = StubServer(RapidStub()).start()
+        self.addCleanup(server.stop)
+        observer = RecordingObserver()
+
+        async def run():
+            async with AsyncRestClient('api-key', 'api-password', GenericEndpoint().set_url(server.url)) as client:
+                method = AsyncTransparentRedirect(client.add_observer(observer))
+                await method.create_access_code(make_request())
+
+        asyncio.run(run())
+
+        self.assertEqual(set(observer.calls[0].phases), NETWORK_PHASES | {'to_json', 'validate_response'})
+        self.assertEqual(observer.calls[0].code, '200')
+
+    @unittest.skipIf(httpx is None, 'httpx is not installed')
+    def test_async_payment_method_phases(self):
+        server = StubServer(RapidStub()).start()
+        self.addCleanup(server.stop)
+        observer = RecordingObserver()
+
+        async def run():
+            async with AsyncRestClient('api-key', 'api-password', GenericEndpoint().set_url(server.url)) as client:
+                method = AsyncTransparentRedirect(client).add_observer(observer)
+                await method.request_transaction_result((await method.create_access_code(make_request())).AccessCode)
+
+        asyncio.run(run())
+
+        create, get = observer.calls
+
+        self.assertEqual(set(create.phases), NETWORK_PHASES | {'to_json', 'validate_response', 'from_json'})
+        self.assertEqual(set(get.phases), NETWORK_PHASES | {'validate_response', 'from_json'})
+        self.assertEqual(get.endpoint, server.url)
+        self.assertEqual((create.code, get.code), ('200', '200'))
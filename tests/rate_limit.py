@@ -0,0 +1,233 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+
+try:
+    import eway
+except:
+    from os.path import dirname, join
+    from sys import path
+    path.append(join(dirname(__file__), '..'))
+
+
+from eway.rapid.client import AsyncRestClient, RestClient
+from eway.rapid.deadline import Deadline
+from eway.rapid.endpoint import SandboxEndpoint
+from eway.rapid.exception import RequestTimeoutError
+from eway.rapid.observer import Observer
+from eway.rapid.rate_limit import FileLockBackend, RateLimiter, TokenBucket
+
+from .helpers import Clock
+from .retry import Response, ScriptedSession, make_request
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_burst(self):
+        clock = Clock()
+        bucket = TokenBucket(rate=10, burst=3, clock=clock)
+
+        self.assertEqual([bucket.reserve() for _ in range(3)], [0.0, 0.0, 0.0])
+        self.assertAlmostEqual(bucket.reserve(), 0.1)
+        self.assertAlmostEqual(bucket.reserve(), 0.2)  # queued behind the previous reservation
+
+    def test_refill(self):
+        clock = Clock()
+        bucket = TokenBucket(rate=10, burst=2, clock=clock)
+
+        bucket.reserve(2)
+        clock.now = 0.1
+        self.assertEqual(bucket.reserve(), 0.0)
+
+        clock.now = 10.0  # refills up to the burst only
+        self.assertEqual(bucket.reserve(2), 0.0)
+        self.assertAlmostEqual(bucket.reserve(), 0.1)
+
+    def test_max_wait(self):
+        clock = Clock()
+        bucket = TokenBucket(rate=10, burst=1, clock=clock)
+
+        bucket.reserve()
+        self.assertIsNone(bucket.reserve(max_wait=0.05))
+        self.assertAlmostEqual(bucket.reserve(max_wait=0.1), 0.1)  # nothing was taken by the refused reservation
+
+    def test_acquire(self):
+        bucket = TokenBucket(rate=1000, burst=1)
+
+        self.assertTrue(bucket.acquire())
+        self.assertTrue(bucket.acquire(timeout=0.5))
+        self.assertFalse(TokenBucket(rate=0.001, burst=1).acquire(2, timeout=0.01))
+
+    def test_acquire_async(self):
+        bucket = TokenBucket(rate=0.001, burst=1)
+
+        async def run():
+            return await bucket.acquire_async(), await bucket.acquire_async(timeout=0.01)
+
+        self.assertEqual(asyncio.run(run()), (True, False))
+
+    def test_threads(self):
+        clock = Clock()
+        bucket = TokenBucket(rate=1, burst=100, clock=clock)
+        waits = []
+
+        def reserve():
+            for _ in range(50):
+                waits.append(bucket.reserve())
+
+        threads = [threading.Thread(target=reserve) for _ in range(4)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(waits), [0.0] * 100 + [float(i) for i in range(1, 101)])
+
+    def test_validation(self):
+        self.assertRaises(ValueError, TokenBucket, 0)
+        self.assertRaises(ValueError, TokenBucket, 1, burst=0)
+
+
+class TestFileLockBackend(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'bucket')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_shared_state(self):
+        clock = Clock()
+        backends = FileLockBackend(self.path), FileLockBackend(self.path)
+        first, second = (TokenBucket(rate=10, burst=2, backend=backend, clock=clock) for backend in backends)
+
+        self.assertEqual(first.reserve(), 0.0)
+        self.assertEqual(second.reserve(), 0.0)
+        self.assertAlmostEqual(first.reserve(), 0.1)
+        self.assertAlmostEqual(second.reserve(), 0.2)
+
+        for backend in backends:
+            backend.close()
+
+    def test_clock_restarted(self):
+        clock = Clock()
+        clock.now = 1000.0
+        backend = FileLockBackend(self.path)
+        bucket = TokenBucket(rate=10, burst=1, backend=backend, clock=clock)
+
+        bucket.reserve()
+        self.assertAlmostEqual(bucket.reserve(), 0.1)
+
+        clock.now = 5.0  # the host rebooted, the state file was kept
+        backend.close()
+        bucket = TokenBucket(rate=10, burst=1, backend=FileLockBackend(self.path), clock=clock)
+
+        self.assertEqual(bucket.reserve(), 0.0)
+        self.assertAlmostEqual(bucket.reserve(), 0.1)
+
+        clock.now = 3605.0
+        self.assertEqual(bucket.reserve(), 0.0)
+
+        bucket._backend.close()
+
+    @unittest.skipUnless(hasattr(os, 'fork'), 'requires fork')
+    def test_processes(self):
+        backend = FileLockBackend(self.path)
+        bucket = TokenBucket(rate=0.001, burst=20, backend=backend)
+        bucket.reserve()  # the file is opened before forking
+
+        pids = []
+
+        for _ in range(3):
+            pid = os.fork()
+
+            if pid == 0:
+                try:
+                    for _ in range(5):
+                        bucket.reserve()
+                finally:
+                    os._exit(0)
+
+            pids.append(pid)
+
+        for pid in pids:
+            os.waitpid(pid, 0)
+
+        level = backend.update(lambda state: (state, state[0]))
+        backend.close()
+
+        self.assertAlmostEqual(level, 4, places=2)
+
+
+class Timings(Observer):
+    def __init__(self):
+        self.calls = []
+
+    def on_call(self, timings):
+        self.calls.append(timings)
+
+
+class TestRestClientRateLimit(unittest.TestCase):
+    def test_separate_limits(self):
+        clock = Clock()
+        limiter = RateLimiter(create_access_code=TokenBucket(rate=1, burst=1, clock=clock))
+        client = RestClient('api-key', 'api-password', SandboxEndpoint(), rate_limiter=limiter)
+        client._transport._session = ScriptedSession(*[Response(200) for _ in range(3)])
+
+        client.transparent_redirect_create_access_code(make_request())
+
+        # queries are not limited
+        client.transparent_redirect_get_transaction_info('code')
+        client.transparent_redirect_get_transaction_info('code')
+
+        with self.assertRaises(RequestTimeoutError) as err:
+            client.transparent_redirect_create_access_code(make_request(), Deadline(0.5, clock))
+
+        self.assertEqual(err.exception._code, 'ST003')
+        self.assertEqual(client._transport._session.calls, ['POST', 'GET', 'GET'])
+
+    def test_wait(self):
+        limiter = RateLimiter(get_transaction_info=TokenBucket(rate=100, burst=1))
+        client = RestClient('api-key', 'api-password', SandboxEndpoint(), rate_limiter=limiter)
+        client._transport._session = ScriptedSession(Response(200), Response(200))
+        observer = Timings()
+        client.add_observer(observer)
+
+        client.transparent_redirect_get_transaction_info('code')
+        client.transparent_redirect_get_transaction_info('code')
+
+        self.assertNotIn('rate_limit_wait', observer.calls[0].phases)
+        self.assertGreater(observer.calls[1].phases['rate_limit_wait'], 0.0)
+
+
+@unittest.skipIf(httpx is None, 'httpx is not installed')
+class TestAsyncRestClientRateLimit(unittest.TestCase):
+    def test_deadline(self):
+        limiter = RateLimiter(get_transaction_info=TokenBucket(rate=0.001, burst=1))
+        sent = []
+
+        def handler(request):
+            sent.append(request.method)
+            return httpx.Response(200, json={'AccessCode': 'code'})
+
+        async def run():
+            async with AsyncRestClient('api-key', 'api-password', SandboxEndpoint(), rate_limiter=limiter) as client:
+                client._create_http = lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler))
+                await client.transparent_redirect_get_transaction_info('code', Deadline(1))
+                await client.transparent_redirect_get_transaction_info('code', Deadline(1))
+
+        with self.assertRaises(RequestTimeoutError) as err:
+            asyncio.run(run())
+
+        self.assertEqual(err.exception._code, 'ST003')
+        self.assertEqual(sent, ['GET'])
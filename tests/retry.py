@@ -0,0 +1,183 @@
+import socket
+import unittest
+
+from requests.exceptions import ConnectionError
+
+
+try:
+    import eway
+except:
+    from os.path import dirname, join
+    from sys import path
+    path.append(join(dirname(__file__), '..'))
+
+
+from eway.rapid.client import RestClient
+from eway.rapid.endpoint import GenericEndpoint, SandboxEndpoint
+from eway.rapid.exception import ResponseError
+from eway.rapid.model import Payment, RequestMethod, TransactionType
+from eway.rapid.payment_method.transparent_redirect import CreateAccessCodeRequest
+from eway.rapid.retry import RetryBudget, RetryPolicy
+
+
+class Response(object):
+    def __init__(self, status_code, content=b'{"AccessCode": "code"}'):
+        self.status_code = status_code
+        self.content = content
+        self.headers = {'Content-Type': 'application/json'}
+
+
+class ScriptedSession(object):
+    '''Session replaying responses and exceptions in order'''
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = []
+
+    def request(self, method, url, **kwargs):
+        self.calls.append(method)
+        outcome = self.outcomes.pop(0)
+
+        if isinstance(outcome, Exception):
+            raise outcome
+
+        return outcome
+
+    def close(self):
+        pass
+
+
+class NoSleepRetryPolicy(RetryPolicy):
+    def __init__(self, *args, **kwargs):
+        super(NoSleepRetryPolicy, self).__init__(*args, **kwargs)
+        self.delays = []
+
+    def sleep(self, delay):
+        self.delays.append(delay)
+
+
+def make_request():
+    return CreateAccessCodeRequest(Payment(42), RequestMethod.ProcessPayment, TransactionType.Purchase, 'https://localhost/')
+
+
+class TestRetryPolicy(unittest.TestCase):
+    def test_backoff_is_bounded(self):
+        policy = RetryPolicy(base_delay=0.1, max_delay=1.0, seed=1)
+        delay = None
+
+        for _ in range(100):
+            previous = delay if delay is not None else 0.1
+            delay = policy.backoff(delay)
+
+            self.assertGreaterEqual(delay, 0.1)
+            self.assertLessEqual(delay, min(1.0, previous * 3))
+
+    def test_retryable_codes(self):
+        policy = RetryPolicy()
+
+        self.assertTrue(policy.should_retry(ResponseError('S9996'), 1, True))
+        self.assertTrue(policy.should_retry(ResponseError('S9992'), 1, True))
+        self.assertFalse(policy.should_retry(ResponseError('S9993'), 1, True))
+        self.assertFalse(policy.should_retry(ResponseError('S9901'), 1, True))
+
+    def test_max_attempts(self):
+        policy = RetryPolicy(max_attempts=3)
+
+        self.assertTrue(policy.should_retry(ResponseError('S9996'), 2, True))
+        self.assertFalse(policy.should_retry(ResponseError('S9996'), 3, True))
+
+    def test_not_idempotent(self):
+        policy = RetryPolicy()
+
+        self.assertFalse(policy.should_retry(ResponseError('S9996'), 1, False))
+        self.assertFalse(policy.should_retry(ResponseError('S9992'), 1, False))
+        self.assertTrue(policy.should_retry(ResponseError('S9992'), 1, False, connect_phase=True))
+
+    def test_budget(self):
+        budget = RetryBudget(ratio=0.5, reserve=1, capacity=2)
+
+        self.assertTrue(budget.withdraw())
+        self.assertFalse(budget.withdraw())
+
+        budget.deposit()
+        self.assertFalse(budget.withdraw())
+
+        budget.deposit()
+        self.assertTrue(budget.withdraw())
+
+        for _ in range(10):
+            budget.deposit()
+
+        self.assertEqual(budget.get_tokens(), 2)
+
+    def test_exhausted_budget_stops_retries(self):
+        policy = RetryPolicy(max_attempts=10, budget=RetryBudget(ratio=0, reserve=2))
+
+        self.assertTrue(policy.should_retry(ResponseError('S9996'), 1, True))
+        self.assertTrue(policy.should_retry(ResponseError('S9996'), 2, True))
+        self.assertFalse(policy.should_retry(ResponseError('S9996'), 3, True))
+
+
+class TestRestClientRetries(unittest.TestCase):
+    def make_client(self, session, policy=None):
+        client = RestClient('api-key', 'api-password', SandboxEndpoint(), retry_policy=policy)
+        client._transport._session = session
+        return client
+
+    def test_no_policy(self):
+        session = ScriptedSession(Response(503), Response(200))
+
+        with self.assertRaises(ResponseError) as err:
+            self.make_client(session).transparent_redirect_get_transaction_info('code')
+
+        self.assertEqual(err.exception._code, 'S9996')
+        self.assertEqual(session.calls, ['GET'])
+
+    def test_get_is_retried(self):
+        policy = NoSleepRetryPolicy(max_attempts=3)
+        session = ScriptedSession(Response(503), ConnectionError('reset'), Response(200))
+
+        body = self.make_client(session, policy).transparent_redirect_get_transaction_info('code')
+
+        self.assertEqual(body, b'{"AccessCode": "code"}')
+        self.assertEqual(session.calls, ['GET'] * 3)
+        self.assertEqual(len(policy.delays), 2)
+
+    def test_attempts_are_limited(self):
+        session = ScriptedSession(Response(503), Response(503), Response(200))
+
+        with self.assertRaises(ResponseError) as err:
+            self.make_client(session, NoSleepRetryPolicy(max_attempts=2)).transparent_redirect_get_transaction_info('code')
+
+        self.assertEqual(err.exception._code, 'S9996')
+        self.assertEqual(len(session.calls), 2)
+
+    def test_post_is_not_retried_after_sending(self):
+        session = ScriptedSession(Response(503), Response(200))
+
+        with self.assertRaises(ResponseError):
+            self.make_client(session, NoSleepRetryPolicy()).transparent_redirect_create_access_code(make_request())
+
+        session = ScriptedSession(ConnectionError('reset'), Response(200))
+
+        with self.assertRaises(ResponseError) as err:
+            self.make_client(session, NoSleepRetryPolicy()).transparent_redirect_create_access_code(make_request())
+
+        self.assertEqual(err.exception._code, 'S9992')
+        self.assertEqual(session.calls, ['POST'])
+
+    def test_post_is_retried_when_not_connected(self):
+        sock = socket.socket()
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+        sock.close()
+
+        policy = NoSleepRetryPolicy(max_attempts=3)
+        client = RestClient('api-key', 'api-password', GenericEndpoint().set_url('http://127.0.0.1:{}/'.format(port)), retry_policy=policy)
+        self.addCleanup(client.close)
+
+        with self.assertRaises(ResponseError) as err:
+            client.transparent_redirect_create_access_code(make_request())
+
+        self.assertEqual(err.exception._code, 'S9992')
+        self.assertEqual(len(policy.delays), 2)
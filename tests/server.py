@@ -0,0 +1,134 @@
+import unittest
+
+from threading import Thread
+
+try:
+    from http.client import HTTPConnection
+except ImportError:
+    from httplib import HTTPConnection
+
+
+try:
+    import eway
+except:
+    from os.path import dirname, join
+    from sys import path
+    path.append(join(dirname(__file__), '..'))
+
+
+from eway.rapid.client import RestClient
+from eway.rapid.endpoint import GenericEndpoint
+from eway.rapid.exception import ResponseError, TransactionError, UndocumentedError, ValidationError
+from eway.rapid.model import Option, Payment, RequestMethod, TransactionType
+from eway.rapid.payment_method.transparent_redirect import CreateAccessCodeRequest, TransparentRedirect
+from eway.rapid.testing import RapidStub, StubServer, constant_latency
+
+
+def make_request(**kwargs):
+    return CreateAccessCodeRequest(Payment(42, 'AUD', InvoiceNumber='INV-1'), RequestMethod.ProcessPayment, TransactionType.Purchase, 'https://localhost/', **kwargs)
+
+
+class TestStubServer(unittest.TestCase):
+    def serve(self, stub):
+        server = StubServer(stub).start()
+        self.addCleanup(server.stop)
+
+        client = RestClient('api-key', 'api-password', GenericEndpoint().set_url(server.url))
+        self.addCleanup(client.close)
+
+        return server, TransparentRedirect(client)
+
+    def test_transparent_redirect(self):
+        server, method = self.serve(RapidStub(latency=constant_latency(0.001)))
+
+        response = method.create_access_code(make_request(Options=[Option(Value='Option1')]))
+
+        self.assertIsNotNone(response.AccessCode)
+        self.assertEqual(response.Payment.TotalAmount, 42)
+        self.assertEqual(response.Customer.IsActive, False)
+
+        info = method.request_transaction_result(response.AccessCode)
+
+        self.assertEqual(info.AccessCode, response.AccessCode)
+        self.assertEqual(info.ResponseMessage, 'A2000')
+        self.assertEqual(info.InvoiceNumber, 'INV-1')
+        self.assertTrue(info.TransactionStatus)
+        self.assertEqual(info.Options[0].Value, 'Option1')
+
+        self.assertEqual(server.stub.requests_count, 2)
+        self.assertEqual(server.connections_count, 1)
+
+    def test_gateway_error(self):
+        server, method = self.serve(RapidStub(errors={'S9996': 1}))
+
+        with self.assertRaises(ResponseError) as err:
+            method.create_access_code(make_request())
+
+        self.assertEqual(err.exception._code, 'S9996')
+
+    def test_validation_error(self):
+        server, method = self.serve(RapidStub(errors={'V6011': 1}))
+
+        with self.assertRaises(ValidationError) as err:
+            method.create_access_code(make_request())
+
+        self.assertEqual(err.exception._code, 'V6011')
+
+    def test_declined_transaction(self):
+        server, method = self.serve(RapidStub(errors={'D4405': 1}))
+
+        info = method.request_transaction_result(method.create_access_code(make_request()).AccessCode)
+
+        self.assertFalse(info.TransactionStatus)
+        self.assertEqual(info.ResponseMessage, 'D4405')
+        self.assertIsInstance(TransactionError.from_code(info.ResponseMessage), TransactionError)
+
+    def test_credentials(self):
+        server, method = self.serve(RapidStub(credentials=('key', 'password')))
+
+        with self.assertRaises(ResponseError) as err:
+            method.create_access_code(make_request())
+
+        self.assertEqual(err.exception._code, 'S9993')
+
+    def test_strict_unknown_access_code(self):
+        server, method = self.serve(RapidStub(strict=True))
+
+        info = method.request_transaction_result('unknown')
+
+        self.assertEqual(info.ResponseMessage, UndocumentedError.from_code('UE001')._code)
+
+    def test_connection_close(self):
+        server = StubServer(RapidStub()).start()
+        self.addCleanup(server.stop)
+
+        host, port = server._server.server_address[:2]
+        connection = HTTPConnection(host, port)
+        self.addCleanup(connection.close)
+
+        connection.request('GET', '/AccessCode/code', headers={'Connection': 'close'})
+        response = connection.getresponse()
+        response.read()
+
+        self.assertEqual(response.getheader('Connection'), 'close')
+
+    def test_concurrent_connections_count(self):
+        server = StubServer(RapidStub(latency=constant_latency(0.01))).start()
+        self.addCleanup(server.stop)
+        host, port = server._server.server_address[:2]
+
+        def request():
+            connection = HTTPConnection(host, port)
+            connection.request('GET', '/AccessCode/code')
+            connection.getresponse().read()
+            connection.close()
+
+        threads = [Thread(target=request) for _ in range(50)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(server.connections_count, 50)
@@ -0,0 +1,230 @@
+import asyncio
+import json
+import threading
+import time
+import unittest
+
+
+try:
+    import eway
+except:
+    from os.path import dirname, join
+    from sys import path
+    path.append(join(dirname(__file__), '..'))
+
+
+from eway.rapid.exception import RequestTimeoutError, ResponseError
+from eway.rapid.payment_method.transparent_redirect import AsyncTransparentRedirect, TransparentRedirect
+from eway.rapid.single_flight import AsyncSingleFlight, SingleFlight
+
+
+class SlowClient(object):
+    '''
+    Client stub answering transaction info requests after a delay, access codes starting with "S" fail with the gateway error
+    '''
+    def __init__(self, delay=0.1):
+        self.delay = delay
+        self.calls = []
+
+    def response(self, access_code):
+        self.calls.append(access_code)
+
+        if access_code.startswith('S'):
+            raise ResponseError(access_code)
+
+        return json.dumps({'AccessCode': access_code, 'TransactionID': 1, 'TransactionStatus': True})
+
+    def transparent_redirect_get_transaction_info(self, access_code):
+        time.sleep(self.delay)
+        return self.response(access_code)
+
+
+class AsyncSlowClient(SlowClient):
+    async def transparent_redirect_get_transaction_info(self, access_code):
+        await asyncio.sleep(self.delay)
+        return self.response(access_code)
+
+
+class DeadlineClient(SlowClient):
+    '''
+    Client stub failing with ST003 when the deadline of the call is shorter than the delay
+    '''
+    def transparent_redirect_get_transaction_info(self, access_code, deadline=None):
+        if deadline is not None and deadline.timeout() < self.delay:
+            time.sleep(deadline.timeout())
+            raise RequestTimeoutError('ST003')
+
+        return super(DeadlineClient, self).transparent_redirect_get_transaction_info(access_code)
+
+
+class AsyncDeadlineClient(SlowClient):
+    async def transparent_redirect_get_transaction_info(self, access_code, deadline=None):
+        if deadline is not None and deadline.timeout() < self.delay:
+            await asyncio.sleep(deadline.timeout())
+            raise RequestTimeoutError('ST003')
+
+        await asyncio.sleep(self.delay)
+        return self.response(access_code)
+
+
+def run_in_threads(func, count):
+    results = [None] * count
+
+    def run(index):
+        try:
+            results[index] = func()
+        except Exception as error:
+            results[index] = error
+
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(count)]
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    return results
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_concurrent_calls_are_coalesced(self):
+        client = SlowClient()
+        single_flight = SingleFlight()
+        method = TransparentRedirect(client, single_flight=single_flight)
+
+        results = run_in_threads(lambda: method.request_transaction_result('code'), 10)
+
+        self.assertEqual(client.calls, ['code'])
+        self.assertTrue(all(info is results[0] for info in results))
+        self.assertEqual(single_flight.coalesced, 9)
+        self.assertEqual(single_flight.in_flight(), 0)
+
+    def test_different_codes_are_not_coalesced(self):
+        client = SlowClient(delay=0.01)
+        method = TransparentRedirect(client, single_flight=SingleFlight())
+
+        run_in_threads(lambda: method.request_transaction_result('code-{}'.format(threading.current_thread().name)), 4)
+
+        self.assertEqual(len(client.calls), 4)
+
+    def test_errors_are_shared(self):
+        client = SlowClient()
+        method = TransparentRedirect(client, single_flight=SingleFlight())
+
+        results = run_in_threads(lambda: method.request_transaction_result('S9996'), 5)
+
+        self.assertEqual(client.calls, ['S9996'])
+        self.assertTrue(all(isinstance(error, ResponseError) for error in results))
+
+    def test_sequential_calls_are_not_coalesced(self):
+        client = SlowClient(delay=0)
+        method = TransparentRedirect(client, single_flight=SingleFlight())
+
+        method.request_transaction_result('code')
+        method.request_transaction_result('code')
+
+        self.assertEqual(client.calls, ['code', 'code'])
+
+    def test_follower_deadline(self):
+        single_flight = SingleFlight()
+        method = TransparentRedirect(SlowClient(delay=0.3), single_flight=single_flight)
+
+        leader = threading.Thread(target=method.request_transaction_result, args=('code',))
+        leader.start()
+        time.sleep(0.05)
+
+        with self.assertRaises(RequestTimeoutError) as err:
+            method.request_transaction_result('code', deadline=0.05)
+
+        self.assertEqual(err.exception._code, 'ST003')
+        leader.join()
+
+    def test_leader_deadline(self):
+        client = DeadlineClient(delay=0.2)
+        method = TransparentRedirect(client, single_flight=SingleFlight())
+        errors = []
+
+        def lead():
+            try:
+                method.request_transaction_result('code', deadline=0.05)
+            except RequestTimeoutError as error:
+                errors.append(error._code)
+
+        leader = threading.Thread(target=lead)
+        leader.start()
+        time.sleep(0.01)
+
+        info = method.request_transaction_result('code')
+        leader.join()
+
+        self.assertEqual(errors, ['ST003'])
+        self.assertEqual(info.AccessCode, 'code')
+        self.assertEqual(client.calls, ['code'])
+
+
+class TestAsyncSingleFlight(unittest.TestCase):
+    def test_concurrent_calls_are_coalesced(self):
+        client = AsyncSlowClient()
+        single_flight = AsyncSingleFlight()
+
+        async def run():
+            method = AsyncTransparentRedirect(client, single_flight=single_flight)
+            return await asyncio.gather(*[method.request_transaction_result('code') for _ in range(10)])
+
+        results = asyncio.run(run())
+
+        self.assertEqual(client.calls, ['code'])
+        self.assertTrue(all(info is results[0] for info in results))
+        self.assertEqual(single_flight.coalesced, 9)
+        self.assertEqual(single_flight.in_flight(), 0)
+
+    def test_cancelled_caller_does_not_cancel_others(self):
+        client = AsyncSlowClient()
+
+        async def run():
+            method = AsyncTransparentRedirect(client, single_flight=AsyncSingleFlight())
+            first = asyncio.ensure_future(method.request_transaction_result('code'))
+            second = asyncio.ensure_future(method.request_transaction_result('code'))
+
+            await asyncio.sleep(0.01)
+            first.cancel()
+
+            return await second
+
+        info = asyncio.run(run())
+
+        self.assertEqual(info.AccessCode, 'code')
+        self.assertEqual(client.calls, ['code'])
+
+    def test_follower_deadline(self):
+        async def run():
+            method = AsyncTransparentRedirect(AsyncSlowClient(delay=0.3), single_flight=AsyncSingleFlight())
+            leader = asyncio.ensure_future(method.request_transaction_result('code'))
+            await asyncio.sleep(0.01)
+
+            try:
+                await method.request_transaction_result('code', deadline=0.05)
+            finally:
+                await leader
+
+        with self.assertRaises(RequestTimeoutError) as err:
+            asyncio.run(run())
+
+        self.assertEqual(err.exception._code, 'ST003')
+
+    def test_leader_deadline(self):
+        client = AsyncDeadlineClient(delay=0.2)
+
+        async def run():
+            method = AsyncTransparentRedirect(client, single_flight=AsyncSingleFlight())
+            leader = asyncio.ensure_future(method.request_transaction_result('code', deadline=0.05))
+            await asyncio.sleep(0.01)
+
+            return await asyncio.gather(leader, method.request_transaction_result('code'), return_exceptions=True)
+
+        error, info = asyncio.run(run())
+
+        self.assertIsInstance(error, RequestTimeoutError)
+        self.assertEqual(info.AccessCode, 'code')
+        self.assertEqual(client.calls, ['code'])
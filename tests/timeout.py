@@ -0,0 +1,203 @@
+import asyncio
+import time
+import unittest
+
+from requests.exceptions import ConnectTimeout
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+
+try:
+    import eway
+except:
+    from os.path import dirname, join
+    from sys import path
+    path.append(join(dirname(__file__), '..'))
+
+
+from eway.rapid.client import AsyncRestClient, HttpxTransport, RestClient, Urllib3Transport
+from eway.rapid.deadline import Deadline
+from eway.rapid.endpoint import GenericEndpoint, SandboxEndpoint
+from eway.rapid.exception import EwayError, RequestTimeoutError
+from eway.rapid.payment_method.transparent_redirect import AsyncTransparentRedirect, TransparentRedirect
+from eway.rapid.retry import RetryPolicy
+from eway.rapid.testing import RapidStub, StubServer, constant_latency
+
+from .helpers import Clock
+from .retry import NoSleepRetryPolicy, Response, ScriptedSession, make_request
+
+
+class TestDeadline(unittest.TestCase):
+    def test_countdown(self):
+        clock = Clock()
+        deadline = Deadline(2, clock)
+
+        self.assertEqual(deadline.timeout(), 2)
+        self.assertEqual(deadline.timeout(0.5), 0.5)
+        deadline.check()
+
+        clock.now = 1.5
+        self.assertEqual(deadline.timeout(10), 0.5)
+
+        clock.now = 2
+        self.assertTrue(deadline.expired())
+        self.assertEqual(deadline.timeout(), 0)
+
+        with self.assertRaises(RequestTimeoutError) as err:
+            deadline.check()
+
+        self.assertEqual(err.exception._code, 'ST003')
+
+    def test_start(self):
+        deadline = Deadline(1)
+
+        self.assertIsNone(Deadline.start(None))
+        self.assertIs(Deadline.start(deadline), deadline)
+        self.assertIsInstance(Deadline.start(1.5), Deadline)
+
+    def test_error_lookup(self):
+        self.assertIsInstance(EwayError.lookup_error_by_code('ST001'), RequestTimeoutError)
+        self.assertIsInstance(EwayError.lookup_error_by_message('Deadline of the call exceeded'), RequestTimeoutError)
+
+
+class TestRestClientTimeouts(unittest.TestCase):
+    def serve(self, stub, drip=None, **kwargs):
+        server = StubServer(stub, drip=drip).start()
+        self.addCleanup(server.stop)
+
+        client = RestClient('api-key', 'api-password', GenericEndpoint().set_url(server.url), **kwargs)
+        self.addCleanup(client.close)
+
+        return TransparentRedirect(client)
+
+    def test_read_timeout(self):
+        method = self.serve(RapidStub(latency=constant_latency(0.5)), read_timeout=0.05)
+
+        with self.assertRaises(RequestTimeoutError) as err:
+            method.request_transaction_result('code')
+
+        self.assertEqual(err.exception._code, 'ST002')
+
+    def test_deadline(self):
+        method = self.serve(RapidStub(latency=constant_latency(0.5)))
+        started = time.time()
+
+        with self.assertRaises(RequestTimeoutError) as err:
+            method.request_transaction_result('code', deadline=0.1)
+
+        self.assertEqual(err.exception._code, 'ST003')
+        self.assertLess(time.time() - started, 0.4)
+
+    def test_deadline_covers_retries(self):
+        method = self.serve(RapidStub(errors={'S9996': 1}), retry_policy=RetryPolicy(max_attempts=100, base_delay=0.02, max_delay=0.05))
+        started = time.time()
+
+        with self.assertRaises(RequestTimeoutError) as err:
+            method.request_transaction_result('code', deadline=0.2)
+
+        self.assertEqual(err.exception._code, 'ST003')
+        self.assertLess(time.time() - started, 0.3)
+
+    def test_deadline_covers_body_read(self):
+        for transport in (None, Urllib3Transport()) + ((HttpxTransport(),) if httpx is not None else ()):
+            method = self.serve(RapidStub(), drip=0.02, transport=transport)
+            started = time.time()
+
+            with self.assertRaises(RequestTimeoutError) as err:
+                method.request_transaction_result('code', deadline=0.2)
+
+            self.assertEqual(err.exception._code, 'ST003')
+            self.assertLess(time.time() - started, 0.4)
+
+    def test_connection_outlives_the_deadline(self):
+        server = StubServer(RapidStub()).start()
+        self.addCleanup(server.stop)
+
+        client = RestClient('api-key', 'api-password', GenericEndpoint().set_url(server.url))
+        self.addCleanup(client.close)
+
+        method = TransparentRedirect(client)
+
+        self.assertEqual(method.request_transaction_result('code', deadline=0.2).AccessCode, 'code')
+        time.sleep(0.3)  # the connection is not shut down once the deadline of the call read through it has passed
+        self.assertEqual(method.request_transaction_result('code', deadline=0.2).AccessCode, 'code')
+        self.assertEqual(server.connections_count, 1)
+
+    def test_deadline_covers_decoding(self):
+        clock = Clock()
+        deadline = Deadline(1, clock)
+        client = RestClient('api-key', 'api-password', SandboxEndpoint())
+        client._transport._session = ScriptedSession(Response(200))
+
+        class Decoder(TransparentRedirect):
+            def _read_transaction_info(self, response_json, timings=None):
+                clock.now = 2
+                return super(Decoder, self)._read_transaction_info(response_json, timings)
+
+        with self.assertRaises(RequestTimeoutError) as err:
+            Decoder(client).request_transaction_result('code', deadline=deadline)
+
+        self.assertEqual(err.exception._code, 'ST003')
+
+    def test_connect_timeout_is_retried(self):
+        policy = NoSleepRetryPolicy()
+        client = RestClient('api-key', 'api-password', SandboxEndpoint(), retry_policy=policy, connect_timeout=0.5)
+        client._transport._session = session = ScriptedSession(ConnectTimeout('timed out'), Response(200))
+
+        TransparentRedirect(client).create_access_code(make_request())
+
+        self.assertEqual(session.calls, ['POST', 'POST'])
+
+    def test_timeouts_are_passed(self):
+        class Session(ScriptedSession):
+            def request(self, method, url, **kwargs):
+                self.timeout = kwargs['timeout']
+                return super(Session, self).request(method, url, **kwargs)
+
+        client = RestClient('api-key', 'api-password', SandboxEndpoint(), connect_timeout=3, read_timeout=30)
+        client._transport._session = session = Session(Response(200), Response(200))
+
+        client.transparent_redirect_get_transaction_info('code')
+        self.assertEqual(session.timeout, (3, 30))
+
+        client.transparent_redirect_get_transaction_info('code', Deadline(5))
+        self.assertEqual(session.timeout[0], 3)
+        self.assertLessEqual(session.timeout[1], 5)
+
+
+@unittest.skipIf(httpx is None, 'httpx is not installed')
+class TestAsyncRestClientTimeouts(unittest.TestCase):
+    def test_deadline(self):
+        async def handler(request):
+            await asyncio.sleep(1)
+            return httpx.Response(200, json={'AccessCode': 'code'})
+
+        async def run():
+            async with AsyncRestClient('api-key', 'api-password', SandboxEndpoint()) as client:
+                client._create_http = lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler))
+                await AsyncTransparentRedirect(client).request_transaction_result('code', deadline=0.05)
+
+        started = time.time()
+
+        with self.assertRaises(RequestTimeoutError) as err:
+            asyncio.run(run())
+
+        self.assertEqual(err.exception._code, 'ST003')
+        self.assertLess(time.time() - started, 0.5)
+
+    def test_read_timeout(self):
+        def handler(request):
+            raise httpx.ReadTimeout('timed out', request=request)
+
+        async def run():
+            async with AsyncRestClient('api-key', 'api-password', SandboxEndpoint()) as client:
+                client._create_http = lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler))
+                await client.transparent_redirect_get_transaction_info('code')
+
+        with self.assertRaises(RequestTimeoutError) as err:
+            asyncio.run(run())
+
+        self.assertEqual(err.exception._code, 'ST002')
@@ -1,4 +1,9 @@
+import asyncio
+import json
+import pickle
 import requests
+import threading
+import time
 
 import unittest
 from hypothesis import given
@@ -15,10 +20,10 @@ except:
 
 
 from eway.rapid.client import RestClient
-from eway.rapid.exception import EwayError
-from eway.rapid.model import Customer, Item, Option, Payment, RequestMethod, ShippingAddress, TransactionType
+from eway.rapid.exception import EwayError, ValidationError
+from eway.rapid.model import BeagleVerification, Customer, Item, Option, Payment, RequestMethod, ShippingAddress, TransactionType, Verification
 from eway.rapid.endpoint import SandboxEndpoint
-from eway.rapid.payment_method.transparent_redirect import TransparentRedirect, CreateAccessCodeRequest, AccessCodeResponse
+from eway.rapid.payment_method.transparent_redirect import AsyncTransparentRedirect, TransparentRedirect, CreateAccessCodeRequest, AccessCodeResponse
 from eway.rapid.payment_method.transparent_redirect.response import TransactionInfo
 
 
@@ -235,4 +240,137 @@ class TestTransactionInfo(unittest.TestCase):
         code = EwayError.lookup_error_by_message(message)._code
 
         self.assertEqual(struct.ResponseMessage, response_message, msg='Message should not overwrite ResponseMessage')
-        self.assertNotEqual(struct.ResponseMessage, code, msg='Message should not overwrite ResponseMessage')
\ No newline at end of file
+        self.assertNotEqual(struct.ResponseMessage, code, msg='Message should not overwrite ResponseMessage')
+
+    def test_lazy_nested_structs(self):
+        data = '{"AccessCode":"code","TransactionStatus":true,"Options":[{"Value":"Option1"}],"Verification":{"CVN":0},"BeagleVerification":null}'
+        eager = TransactionInfo.from_json(data)
+        lazy = TransactionInfo.from_json(data, lazy=True)
+
+        self.assertNotIsInstance(lazy.__dict__['Verification'], Verification)
+        self.assertEqual(lazy.to_json(), eager.to_json())
+
+        self.assertTrue(lazy.TransactionStatus)
+        self.assertIsInstance(lazy.Verification, Verification)
+        self.assertEqual(lazy.Verification.CVN, 0)
+        self.assertIsInstance(lazy.__dict__['Verification'], Verification)
+        self.assertEqual(lazy.Options[0].Value, 'Option1')
+        self.assertIsNone(lazy.BeagleVerification)
+        self.assertEqual(lazy.to_json(), eager.to_json())
+
+    def test_pickle_lazy_nested_structs(self):
+        data = '{"AccessCode":"code","Options":[{"Value":"Option1"}],"Verification":{"CVN":0}}'
+        info = pickle.loads(pickle.dumps(TransactionInfo.from_json(data, lazy=True)))
+
+        self.assertNotIsInstance(info.__dict__['Verification'], Verification)
+        self.assertEqual(info.Verification.CVN, 0)
+        self.assertEqual(info.Options[0].Value, 'Option1')
+        self.assertEqual(info.to_json(), TransactionInfo.from_json(data).to_json())
+
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            self.assertEqual(pickle.loads(pickle.dumps(TransactionInfo.from_json(data, lazy=True), protocol)).Verification.CVN, 0)
+
+    def test_lazy_field_defaults(self):
+        info = TransactionInfo.from_json('{"AccessCode":"code"}', lazy=True)
+
+        self.assertIsNone(info.Options)
+        self.assertIsNone(TransactionInfo.Verification)
+
+        info.Verification = Verification(CVN=1)
+        self.assertEqual(info.Verification.CVN, 1)
+
+
+class EchoClient(object):
+    '''
+    Client stub answering CreateAccessCodeRequests with the invoice number as an access code.
+    Invoice numbers starting with "V" are answered with the according validation error.
+    '''
+    def __init__(self, delay=0):
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def response(self, request):
+        number = request.Payment.InvoiceNumber
+        if number.startswith('V'):
+            return json.dumps({'Errors': number})
+        return json.dumps({'AccessCode': number})
+
+    def transparent_redirect_create_access_code(self, request):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+        time.sleep(self.delay)
+
+        with self.lock:
+            self.in_flight -= 1
+
+        return self.response(request)
+
+
+class AsyncEchoClient(EchoClient):
+    async def transparent_redirect_create_access_code(self, request):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+        await asyncio.sleep(self.delay)
+
+        self.in_flight -= 1
+
+        return self.response(request)
+
+
+def make_requests(numbers):
+    for number in numbers:
+        yield CreateAccessCodeRequest(Payment(42, InvoiceNumber=number), RequestMethod.ProcessPayment, TransactionType.Purchase, 'https://localhost/')
+
+
+class TestCreateAccessCodes(unittest.TestCase):
+    def test_ordered(self):
+        numbers = [str(n) for n in range(50)]
+        client = EchoClient(0.001)
+        results = list(TransparentRedirect(client).create_access_codes(make_requests(numbers), max_concurrency=4, ordered=True))
+
+        self.assertEqual([response.AccessCode for request, response in results], numbers)
+        self.assertEqual([request.Payment.InvoiceNumber for request, response in results], numbers)
+        self.assertLessEqual(client.max_in_flight, 4)
+
+    def test_unordered_with_errors(self):
+        numbers = ['1', 'V6011', '2', '3']
+        results = dict(
+            (request.Payment.InvoiceNumber, response)
+            for request, response in TransparentRedirect(EchoClient()).create_access_codes(make_requests(numbers), max_concurrency=2)
+        )
+
+        self.assertEqual(sorted(results.keys()), sorted(numbers))
+        self.assertIsInstance(results['V6011'], ValidationError)
+        self.assertEqual(results['3'].AccessCode, '3')
+
+    def test_input_is_consumed_lazily(self):
+        consumed = []
+
+        def numbers():
+            for n in range(1000):
+                consumed.append(n)
+                yield str(n)
+
+        results = TransparentRedirect(EchoClient()).create_access_codes(make_requests(numbers()), max_concurrency=3, ordered=True)
+        next(results)
+        results.close()
+
+        self.assertLessEqual(len(consumed), 4)
+
+    def test_async(self):
+        numbers = [str(n) for n in range(20)] + ['V6011']
+        client = AsyncEchoClient(0.001)
+
+        async def run():
+            return [result async for result in AsyncTransparentRedirect(client).create_access_codes(make_requests(numbers), max_concurrency=5)]
+
+        results = asyncio.run(run())
+
+        self.assertEqual(len(results), len(numbers))
+        self.assertEqual(sum(isinstance(response, ValidationError) for request, response in results), 1)
+        self.assertLessEqual(client.max_in_flight, 5)
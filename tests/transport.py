@@ -0,0 +1,150 @@
+import socket
+import unittest
+
+
+try:
+    import eway
+except:
+    from os.path import dirname, join
+    from sys import path
+    path.append(join(dirname(__file__), '..'))
+
+
+from eway.rapid.client import InProcessTransport, RestClient, Urllib3Transport
+from eway.rapid.client.transport import TransportError, TransportTimeout
+from eway.rapid.endpoint import GenericEndpoint, SandboxEndpoint
+from eway.rapid.exception import RequestTimeoutError, ResponseError
+from eway.rapid.payment_method.transparent_redirect import TransparentRedirect
+from eway.rapid.testing import RapidStub, StubServer, constant_latency
+
+from .observer import RecordingObserver
+from .server import make_request
+
+
+class TestInProcessTransport(unittest.TestCase):
+    def test_transparent_redirect(self):
+        stub = RapidStub()
+        client = RestClient('api-key', 'api-password', SandboxEndpoint(), transport=InProcessTransport(stub.handle))
+        method = TransparentRedirect(client)
+
+        response = method.create_access_code(make_request())
+        info = method.request_transaction_result(response.AccessCode)
+
+        self.assertEqual(info.AccessCode, response.AccessCode)
+        self.assertEqual(info.InvoiceNumber, 'INV-1')
+        self.assertTrue(info.TransactionStatus)
+        self.assertEqual(stub.requests_count, 2)
+
+    def test_request(self):
+        requests = []
+
+        def handler(method, path, headers, body):
+            requests.append((method, path, headers, body))
+            return 200, {'Content-Type': 'application/json'}, b'{"AccessCode": "code"}'
+
+        client = RestClient('key', 'password', SandboxEndpoint(), transport=InProcessTransport(handler))
+        client.transparent_redirect_get_transaction_info('code')
+
+        method, path, headers, body = requests[0]
+
+        self.assertEqual((method, path, body), ('GET', '/AccessCode/code', b''))
+        self.assertEqual(headers['Authorization'], 'Basic a2V5OnBhc3N3b3Jk')
+
+    def test_credentials(self):
+        stub = RapidStub(credentials=('key', 'password'))
+        method = TransparentRedirect(RestClient('key', 'password', SandboxEndpoint(), transport=InProcessTransport(stub.handle)))
+        self.assertIsNotNone(method.create_access_code(make_request()).AccessCode)
+
+        method = TransparentRedirect(RestClient('key', 'wrong', SandboxEndpoint(), transport=InProcessTransport(stub.handle)))
+
+        with self.assertRaises(ResponseError) as err:
+            method.create_access_code(make_request())
+
+        self.assertEqual(err.exception._code, 'S9993')
+
+    def test_errors(self):
+        def handler(method, path, headers, body):
+            raise TransportTimeout('timed out')
+
+        client = RestClient('api-key', 'api-password', SandboxEndpoint(), transport=InProcessTransport(handler))
+
+        with self.assertRaises(RequestTimeoutError) as err:
+            client.transparent_redirect_get_transaction_info('code')
+
+        self.assertEqual(err.exception._code, 'ST002')
+
+    def test_timings(self):
+        observer = RecordingObserver()
+        client = RestClient('api-key', 'api-password', SandboxEndpoint(), transport=InProcessTransport(RapidStub().handle))
+        client.add_observer(observer)
+
+        client.transparent_redirect_get_transaction_info('code')
+
+        self.assertEqual(observer.calls[0].attempts, 1)
+        self.assertIn('first_byte', observer.calls[0].phases)
+
+
+class TestUrllib3Transport(unittest.TestCase):
+    def serve(self, stub, **kwargs):
+        server = StubServer(stub).start()
+        self.addCleanup(server.stop)
+
+        client = RestClient('api-key', 'api-password', GenericEndpoint().set_url(server.url), transport=Urllib3Transport(**kwargs), read_timeout=0.05)
+        self.addCleanup(client.close)
+
+        return server, client
+
+    def test_transparent_redirect(self):
+        server, client = self.serve(RapidStub(credentials=('api-key', 'api-password')))
+        method = TransparentRedirect(client)
+
+        info = method.request_transaction_result(method.create_access_code(make_request()).AccessCode)
+
+        self.assertTrue(info.TransactionStatus)
+        self.assertEqual(server.connections_count, 1)
+
+    def test_keep_alive_disabled(self):
+        server, client = self.serve(RapidStub(), keep_alive=False)
+
+        client.transparent_redirect_get_transaction_info('code')
+        client.transparent_redirect_get_transaction_info('code')
+
+        self.assertEqual(server.connections_count, 2)
+
+        # the connections are closed instead of waiting in the pool for the server to close them
+        pool = client._transport._get_pool_manager().connection_from_url(server.url)
+        self.assertTrue(all(conn is None or conn.sock is None for conn in pool.pool.queue))
+
+    def test_read_timeout(self):
+        server, client = self.serve(RapidStub(latency=constant_latency(0.5)))
+
+        with self.assertRaises(RequestTimeoutError) as err:
+            client.transparent_redirect_get_transaction_info('code')
+
+        self.assertEqual(err.exception._code, 'ST002')
+
+    def test_connection_refused(self):
+        listener = socket.socket()
+        listener.bind(('127.0.0.1', 0))
+        port = listener.getsockname()[1]
+        listener.close()
+
+        transport = Urllib3Transport()
+
+        with self.assertRaises(TransportError) as err:
+            transport.request('GET', 'http://127.0.0.1:{}/AccessCode/code'.format(port), timeout=(1, 1))
+
+        self.assertNotIsInstance(err.exception, TransportTimeout)
+        self.assertTrue(err.exception.connect_phase)
+
+    def test_timings(self):
+        server, client = self.serve(RapidStub())
+        observer = RecordingObserver()
+        client.add_observer(observer)
+
+        client.transparent_redirect_get_transaction_info('code')
+
+        phases = observer.calls[0].phases
+
+        for phase in ('connection_acquire', 'request_send', 'first_byte', 'body_read', 'validate_response'):
+            self.assertIn(phase, phases)
@@ -0,0 +1,188 @@
+import socket
+import time
+import unittest
+
+
+try:
+    import eway
+except:
+    from os.path import dirname, join
+    from sys import path
+    path.append(join(dirname(__file__), '..'))
+
+
+from eway.rapid.client import DnsCache, InProcessTransport, RestClient, Urllib3Transport, get_dns_cache, set_dns_cache
+from eway.rapid.endpoint import GenericEndpoint, SandboxEndpoint
+from eway.rapid.testing import RapidStub, StubServer
+
+from .helpers import Clock
+
+
+class Resolver(object):
+    def __init__(self, fail=False, addresses=('127.0.0.1',)):
+        self.calls = []
+        self.fail = fail
+        self.addresses = addresses
+
+    def __call__(self, host, port, family=0, type=0):
+        self.calls.append(host)
+
+        if self.fail:
+            raise socket.gaierror('Name or service not known')
+
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, '', (address, port)) for address in self.addresses]
+
+
+class TestDnsCache(unittest.TestCase):
+    def test_ttl(self):
+        clock, resolver = Clock(), Resolver()
+        cache = DnsCache(ttl=10, clock=clock, resolver=resolver)
+
+        self.assertEqual(cache.resolve('localhost', 80), '127.0.0.1')
+        self.assertEqual(cache.resolve('localhost', 80), '127.0.0.1')
+        self.assertEqual(len(resolver.calls), 1)
+
+        clock.now = 10
+        cache.resolve('localhost', 80)
+        self.assertEqual(len(resolver.calls), 2)
+
+    def test_invalidate(self):
+        resolver = Resolver()
+        cache = DnsCache(resolver=resolver)
+
+        cache.resolve('localhost', 80)
+        cache.invalidate('localhost', 80)
+        cache.resolve('localhost', 80)
+
+        self.assertEqual(len(resolver.calls), 2)
+
+    def test_refresh(self):
+        resolver = Resolver()
+        cache = DnsCache(resolver=resolver)
+
+        cache.resolve('localhost', 80)
+        cache.refresh()
+        self.assertEqual(len(resolver.calls), 2)
+
+        resolver.fail = True
+        cache.refresh()
+
+        self.assertRaises(socket.gaierror, cache.resolve, 'localhost', 80)
+
+    def test_connections(self):
+        resolver = Resolver()
+        set_dns_cache(DnsCache(resolver=resolver))
+        self.addCleanup(set_dns_cache, None)
+
+        with StubServer(RapidStub()) as server:
+            url = server.url.replace('127.0.0.1', 'eway.test')
+
+            with RestClient('api-key', 'api-password', GenericEndpoint().set_url(url), keep_alive=False) as client:
+                client.transparent_redirect_get_transaction_info('code')
+                client.transparent_redirect_get_transaction_info('code')
+
+            self.assertEqual(server.connections_count, 2)
+
+        self.assertEqual(resolver.calls, ['eway.test'])
+
+    def test_addresses_tried_in_turn(self):
+        resolver = Resolver(addresses=('127.0.0.2', '127.0.0.1', '127.0.0.1'))  # nothing listens on the first one
+        set_dns_cache(DnsCache(resolver=resolver))
+        self.addCleanup(set_dns_cache, None)
+
+        self.assertEqual(get_dns_cache().resolve_all('eway.test', 80), ['127.0.0.2', '127.0.0.1'])
+
+        with StubServer(RapidStub()) as server:
+            url = server.url.replace('127.0.0.1', 'eway.test')
+
+            with RestClient('api-key', 'api-password', GenericEndpoint().set_url(url), keep_alive=False) as client:
+                client.transparent_redirect_get_transaction_info('code')
+                client.transparent_redirect_get_transaction_info('code')
+
+        self.assertEqual(resolver.calls, ['eway.test', 'eway.test'])
+
+
+class TestWarmUp(unittest.TestCase):
+    def serve(self, **kwargs):
+        server = StubServer(RapidStub()).start()
+        self.addCleanup(server.stop)
+
+        client = RestClient('api-key', 'api-password', GenericEndpoint().set_url(server.url), **kwargs)
+        self.addCleanup(client.close)
+
+        return server, client
+
+    def test_requests_transport(self):
+        server, client = self.serve()
+
+        self.assertEqual(client.warm_up(3), 3)
+        self.assertEqual(server.connections_count, 3)
+
+        for _ in range(3):
+            client.transparent_redirect_get_transaction_info('code')
+
+        self.assertEqual(server.connections_count, 3)
+
+    def test_urllib3_transport(self):
+        server, client = self.serve(transport=Urllib3Transport())
+
+        self.assertEqual(client.warm_up(2), 2)
+        client.transparent_redirect_get_transaction_info('code')
+
+        self.assertEqual(server.connections_count, 2)
+
+    def test_pool_size(self):
+        server, client = self.serve(pool_maxsize=2)
+
+        self.assertEqual(client.warm_up(5), 2)
+        self.assertEqual(client.warm_up(5), 2)  # the connections are open already
+        self.assertEqual(server.connections_count, 2)
+
+    def test_unreachable_endpoint(self):
+        listener = socket.socket()
+        listener.bind(('127.0.0.1', 0))
+        url = 'http://127.0.0.1:{}/'.format(listener.getsockname()[1])
+        listener.close()
+
+        client = RestClient('api-key', 'api-password', GenericEndpoint().set_url(url), connect_timeout=1)
+
+        with self.assertLogs('eway.rapid.client', 'WARNING'):
+            self.assertEqual(client.warm_up(2), 0)
+
+    def test_refresh(self):
+        class Transport(InProcessTransport):
+            warm_ups = 0
+
+            def warm_up(self, url, connections, timeout=None):
+                self.warm_ups += 1
+                return connections
+
+        transport = Transport(RapidStub().handle)
+        client = RestClient('api-key', 'api-password', SandboxEndpoint(), transport=transport)
+
+        client.warm_up(2, refresh_interval=0.01)
+        time.sleep(0.1)
+        client.close()
+
+        warm_ups = transport.warm_ups
+        time.sleep(0.05)
+
+        self.assertGreater(warm_ups, 2)
+        self.assertEqual(transport.warm_ups, warm_ups)
+
+    def test_failure_is_not_fatal(self):
+        class Transport(InProcessTransport):
+            def warm_up(self, url, connections, timeout=None):
+                raise AttributeError("'HTTPConnectionPool' object has no attribute '_get_conn'")
+
+        client = RestClient('api-key', 'api-password', SandboxEndpoint(), transport=Transport(RapidStub().handle))
+
+        with self.assertLogs('eway.rapid.client', 'WARNING'):
+            self.assertEqual(client.warm_up(2), 0)
+
+        self.assertIn(b'"AccessCode"', client.transparent_redirect_get_transaction_info('code'))
+
+    def test_no_pool(self):
+        client = RestClient('api-key', 'api-password', SandboxEndpoint(), transport=InProcessTransport(RapidStub().handle))
+
+        self.assertEqual(client.warm_up(1), 0)